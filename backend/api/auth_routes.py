@@ -10,10 +10,10 @@ from auth.entra_auth import (
     exchange_code_for_token,
     create_or_update_user_profile
 )
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -103,7 +103,7 @@ async def create_learning_plan(
         # This would typically involve saving to a database
         
         # For now, just return the plan
-        return learning_plan.dict() if hasattr(learning_plan, "dict") else learning_plan
+        return learning_plan.model_dump() if hasattr(learning_plan, "model_dump") else learning_plan
         
     except HTTPException:
         raise
@@ -233,7 +233,7 @@ async def personalized_recommendations(
         )
         
         # Return as dictionaries for JSON serialization
-        return [item.dict() for item in results]
+        return [item.model_dump() for item in results]
         
     except Exception as e:
         logger.error(f"Error getting personalized recommendations: {e}")
@@ -9,6 +9,7 @@ from models.content import Content, ContentType
 from auth.authentication import get_current_user
 from api.endpoints import (
     get_content_endpoint,
+    get_content_columns_endpoint,
     get_recommendations_endpoint,
     search_content_endpoint,
     get_content_by_id_endpoint
@@ -22,6 +23,7 @@ router = APIRouter(prefix="/content", tags=["content"])
 
 # Register content endpoints
 router.add_api_route("/", get_content_endpoint, methods=["GET"], response_model=None)  # Remove response_model to avoid validation
+router.add_api_route("/columns", get_content_columns_endpoint, methods=["GET"], response_model=None)  # Column-oriented listing
 router.add_api_route("/recommendations", get_recommendations_endpoint, methods=["GET"], response_model=None)  # Remove response_model to avoid validation
 router.add_api_route("/search", search_content_endpoint, methods=["GET"], response_model=None)  # Remove response_model to avoid validation
 router.add_api_route("/{content_id}", get_content_by_id_endpoint, methods=["GET"], response_model=None)  # Remove response_model to avoid validation
@@ -14,14 +14,14 @@ import json
 import uuid
 from datetime import datetime
 
-from config.settings import Settings
+from config.settings import get_settings
 from auth.entra_auth import get_current_user
 from services.search_service import get_search_service
 from rag.openai_adapter import get_openai_adapter
 from utils.student_profile_manager import get_student_profile_manager
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Configure logger
 logger = logging.getLogger(__name__)
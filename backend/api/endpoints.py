@@ -13,15 +13,22 @@ from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
 from auth.authentication import get_current_user
 from services.search_service import get_search_service, SearchService, AzureSearchService
 from rag.openai_adapter import get_openai_adapter
-from rag.generator import get_plan_generator
-from config.settings import Settings
+from rag.generator import get_plan_generator, CONTENT_BY_ID_KEY
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Fields returned by the content listing endpoints
+CONTENT_LIST_FIELDS = (
+    "id", "title", "description", "subject", "content_type", "difficulty_level",
+    "grade_level", "topics", "url", "duration_minutes", "keywords", "source"
+)
+CONTENT_LIST_SELECT = ",".join(CONTENT_LIST_FIELDS)
+
 # User endpoints
 async def get_user_endpoint(current_user: Dict = Depends(get_current_user)):
     """Get the current authenticated user's profile."""
@@ -32,14 +39,15 @@ async def get_user_endpoint(current_user: Dict = Depends(get_current_user)):
     
     if not user:
         # Create user if it doesn't exist in our system
+        now = datetime.utcnow().isoformat()
         user_data = {
             "id": current_user["id"],
             "ms_object_id": current_user["id"],
             "username": current_user["username"],
             "email": current_user["email"],
             "full_name": current_user.get("full_name", ""),
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
+            "created_at": now,
+            "updated_at": now
         }
         
         user = await search_service.create_user(user_data)
@@ -93,6 +101,34 @@ async def update_user_profile_endpoint(
     return user
 
 # Content endpoints
+def _build_content_filter_parts(
+    subject: Optional[str],
+    content_type: Optional[str],
+    difficulty: Optional[str],
+    grade_level: Optional[int]
+) -> List[str]:
+    """Build Azure Search filter clauses for the content listing filters."""
+    filter_parts = []
+    if subject:
+        # Check for subject aliases that might be in the database differently
+        if subject == "Math" or subject == "Mathematics":
+            # Try all variations of Mathematics subject
+            filter_parts.append("(subject eq 'Math' or subject eq 'Mathematics' or subject eq 'Maths')")
+        elif subject == "Maths":
+            # This is the actual name in the Azure Search index
+            filter_parts.append("subject eq 'Maths'")
+        else:
+            filter_parts.append(f"subject eq '{subject}'")
+    
+    if content_type:
+        filter_parts.append(f"content_type eq '{content_type.lower()}'")
+    if difficulty:
+        filter_parts.append(f"difficulty_level eq '{difficulty.lower()}'")
+    if grade_level:
+        filter_parts.append(f"grade_level/any(g: g eq {grade_level})")
+    
+    return filter_parts
+
 async def get_content_endpoint(
     subject: Optional[str] = Query(None, description="Filter by subject"),
     content_type: Optional[str] = Query(None, description="Filter by content type"),
@@ -108,25 +144,7 @@ async def get_content_endpoint(
         search_service = await get_search_service()
         
         # Build filter expression
-        filter_parts = []
-        if subject:
-            # Check for subject aliases that might be in the database differently
-            if subject == "Math" or subject == "Mathematics":
-                # Try all variations of Mathematics subject
-                filter_parts.append("(subject eq 'Math' or subject eq 'Mathematics' or subject eq 'Maths')")
-            elif subject == "Maths":
-                # This is the actual name in the Azure Search index
-                filter_parts.append("subject eq 'Maths'")
-            else:
-                filter_parts.append(f"subject eq '{subject}'")
-        
-        if content_type:
-            filter_parts.append(f"content_type eq '{content_type.lower()}'")
-        if difficulty:
-            filter_parts.append(f"difficulty_level eq '{difficulty.lower()}'")
-        if grade_level:
-            filter_parts.append(f"grade_level/any(g: g eq {grade_level})")
-        
+        filter_parts = _build_content_filter_parts(subject, content_type, difficulty, grade_level)
         filter_expression = " and ".join(filter_parts) if filter_parts else None
         
         # Add debugging for the filter expression
@@ -167,7 +185,7 @@ async def get_content_endpoint(
                 filter=None,  # No filter means get everything
                 top=limit, 
                 skip=skip_value,
-                select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+                select=CONTENT_LIST_SELECT
             )
             
             logger.info(f"Direct pagination: fetched page {page} with {len(contents)} items")
@@ -179,7 +197,7 @@ async def get_content_endpoint(
                 filter=filter_expression,
                 top=limit,
                 skip=skip_value,
-                select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+                select=CONTENT_LIST_SELECT
             )
         
         if not contents:
@@ -201,6 +219,45 @@ async def get_content_endpoint(
             detail=f"Error retrieving content: {str(e)}"
         )
 
+async def get_content_columns_endpoint(
+    subject: Optional[str] = Query(None, description="Filter by subject"),
+    content_type: Optional[str] = Query(None, description="Filter by content type"),
+    difficulty: Optional[str] = Query(None, description="Filter by difficulty level"),
+    grade_level: Optional[int] = Query(None, description="Filter by grade level"),
+    page: int = Query(1, ge=1, description="Page number for pagination"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of items per page")
+):
+    """
+    Get content in column-oriented form.
+    
+    Same filters as the content listing, but returns one list per field
+    ({"id": [...], "title": [...], ...}) so field names are not repeated
+    for every item.
+    """
+    try:
+        search_service = await get_search_service()
+        
+        filter_parts = _build_content_filter_parts(subject, content_type, difficulty, grade_level)
+        filter_expression = " and ".join(filter_parts) if filter_parts else None
+        
+        contents = await search_service.search_documents(
+            index_name=settings.CONTENT_INDEX_NAME or "educational-content",
+            query="*",
+            filter=filter_expression,
+            top=limit,
+            skip=(page - 1) * limit,
+            select=CONTENT_LIST_SELECT
+        )
+        
+        return {field: [item.get(field) for item in contents] for field in CONTENT_LIST_FIELDS}
+        
+    except Exception as e:
+        logger.error(f"Error retrieving content columns: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving content: {str(e)}"
+        )
+
 # Mock content functions removed as they're no longer needed
 
 async def get_content_by_id_endpoint(
@@ -226,7 +283,7 @@ async def get_content_by_id_endpoint(
             query="*",
             filter=filter_expression,
             top=1,
-            select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+            select=CONTENT_LIST_SELECT
         )
         
         if not results or len(results) == 0:
@@ -335,7 +392,7 @@ async def get_recommendations_endpoint(
                     query="*",
                     filter=subj_filter,
                     top=items_per_subject, 
-                    select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+                    select=CONTENT_LIST_SELECT
                 )
                 
                 if subject_content:
@@ -364,7 +421,7 @@ async def get_recommendations_endpoint(
                 filter=filter_expression,
                 top=limit,
                 skip=skip_value,
-                select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+                select=CONTENT_LIST_SELECT
             )
         
         if not recommendations:
@@ -441,7 +498,7 @@ async def search_content_endpoint(
                 query=expanded_query,
                 filter=None,  # Remove filter for this search to get more results
                 top=20,
-                select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+                select=CONTENT_LIST_SELECT
             )
             
             if contents and len(contents) > 0:
@@ -469,7 +526,7 @@ async def search_content_endpoint(
             filter=filter_expression,
             top=limit,
             skip=skip_value,
-            select="id,title,description,subject,content_type,difficulty_level,grade_level,topics,url,duration_minutes,keywords,source"
+            select=CONTENT_LIST_SELECT
         )
         
         if not contents:
@@ -588,9 +645,10 @@ async def create_learning_plan_endpoint(
             subject=subject,
             relevant_content=content_items
         )
+        plan_dict.pop(CONTENT_BY_ID_KEY, None)
         
         # Add metadata
-        plan_id = str(uuid.uuid4())
+        plan_id = uuid.uuid4().hex
         now = datetime.utcnow().isoformat()
         
         plan_dict["id"] = plan_id
@@ -675,6 +733,7 @@ async def update_activity_status_endpoint(
             )
         
         # Find and update activity
+        now = datetime.utcnow().isoformat()
         activities = plan.get("activities", [])
         activity_found = False
         
@@ -682,7 +741,7 @@ async def update_activity_status_endpoint(
             if activity.get("id") == activity_id:
                 activities[i]["status"] = status
                 if status == "completed":
-                    activities[i]["completed_at"] = completed_at or datetime.utcnow().isoformat()
+                    activities[i]["completed_at"] = completed_at or now
                 activity_found = True
                 break
         
@@ -708,7 +767,7 @@ async def update_activity_status_endpoint(
         plan["activities"] = activities
         plan["progress_percentage"] = progress_percentage
         plan["status"] = plan_status
-        plan["updated_at"] = datetime.utcnow().isoformat()
+        plan["updated_at"] = now
         
         # Save updated plan
         result = await search_service.plans_index_client.upload_documents(documents=[plan])
@@ -4,17 +4,20 @@ API endpoints for LangChain-based functionality.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, status
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
 import logging
 
 from models.user import User
+from models.content import Content, ContentType, DifficultyLevel
 from services.langchain_service import get_langchain_service
 from auth.authentication import get_current_user
 from utils.vector_store import get_vector_store
-from config.settings import Settings
+from utils.sse import SSE_HEADERS, sse_event
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -22,6 +25,46 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/langchain", tags=["langchain"])
 
+async def _retrieve_plan_content(user: User, subject: str) -> List[Content]:
+    """Retrieve content for a LangChain learning plan, filtered to the subject and nearby grades."""
+    # Get vector store for content retrieval
+    vector_store = await get_vector_store()
+    
+    # Prepare query text for content retrieval
+    query_text = f"Educational content for {subject} for a student in grade {user.grade_level if user.grade_level else 'unknown'}"
+    
+    # Get relevant content for the subject
+    filter_expression = f"subject eq '{subject}'"
+    
+    # Add grade level filter if available
+    if user.grade_level:
+        grade_filters = [
+            f"grade_level/any(g: g eq {user.grade_level})",
+            f"grade_level/any(g: g eq {user.grade_level - 1})",
+            f"grade_level/any(g: g eq {user.grade_level + 1})"
+        ]
+        grade_filter = f"({' or '.join(grade_filters)})"
+        filter_expression = f"{filter_expression} and {grade_filter}"
+    
+    # Get content
+    content_items = await vector_store.vector_search(
+        query_text=query_text,
+        filter_expression=filter_expression,
+        limit=10
+    )
+    
+    # Convert to Content objects
+    contents = []
+    for item in content_items:
+        try:
+            # Convert string enums to proper enum values
+            item["content_type"] = ContentType(item["content_type"])
+            item["difficulty_level"] = DifficultyLevel(item["difficulty_level"])
+            contents.append(Content(**item))
+        except Exception as e:
+            logger.error(f"Error converting content item: {e}")
+    return contents
+
 @router.post("/learning-plan")
 async def create_learning_plan(
     subject: str = Body(..., embed=True),
@@ -41,44 +84,8 @@ async def create_learning_plan(
         # Convert user dict to User model
         user = User(**current_user)
         
-        # Get vector store for content retrieval
-        vector_store = await get_vector_store()
-        
-        # Prepare query text for content retrieval
-        query_text = f"Educational content for {subject} for a student in grade {user.grade_level if user.grade_level else 'unknown'}"
-        
         # Get relevant content for the subject
-        filter_expression = f"subject eq '{subject}'"
-        
-        # Add grade level filter if available
-        if user.grade_level:
-            grade_filters = [
-                f"grade_level/any(g: g eq {user.grade_level})",
-                f"grade_level/any(g: g eq {user.grade_level - 1})",
-                f"grade_level/any(g: g eq {user.grade_level + 1})"
-            ]
-            grade_filter = f"({' or '.join(grade_filters)})"
-            filter_expression = f"{filter_expression} and {grade_filter}"
-        
-        # Get content
-        content_items = await vector_store.vector_search(
-            query_text=query_text,
-            filter_expression=filter_expression,
-            limit=10
-        )
-        
-        # Convert to Content objects
-        from models.content import Content, ContentType, DifficultyLevel
-        
-        contents = []
-        for item in content_items:
-            try:
-                # Convert string enums to proper enum values
-                item["content_type"] = ContentType(item["content_type"])
-                item["difficulty_level"] = DifficultyLevel(item["difficulty_level"])
-                contents.append(Content(**item))
-            except Exception as e:
-                logger.error(f"Error converting content item: {e}")
+        contents = await _retrieve_plan_content(user, subject)
         
         # Get LangChain service
         langchain_service = await get_langchain_service()
@@ -94,7 +101,7 @@ async def create_learning_plan(
         # This would typically involve saving to a database
         
         # For now, return the plan
-        return learning_plan.dict() if hasattr(learning_plan, "dict") else learning_plan
+        return learning_plan.model_dump() if hasattr(learning_plan, "model_dump") else learning_plan
         
     except Exception as e:
         logger.error(f"Error creating learning plan: {e}")
@@ -103,6 +110,58 @@ async def create_learning_plan(
             detail=f"Error creating learning plan: {str(e)}"
         )
 
+@router.post("/learning-plan/stream")
+async def stream_learning_plan(
+    subject: str = Body(..., embed=True),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Stream a personalized learning plan using LangChain as server-sent events.
+    
+    Each activity is sent as an "activity" event as soon as the model has
+    finished writing it, followed by a "done" event with the activity count,
+    or an "error" event if generation fails part way.
+    
+    Args:
+        subject: Subject for the learning plan
+        current_user: Current authenticated user
+        
+    Returns:
+        Event stream of plan activities
+    """
+    try:
+        # Convert user dict to User model
+        user = User(**current_user)
+        
+        # Get relevant content for the subject
+        contents = await _retrieve_plan_content(user, subject)
+        
+        # Get LangChain service
+        langchain_service = await get_langchain_service()
+    except Exception as e:
+        logger.error(f"Error preparing learning plan stream: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating learning plan: {str(e)}"
+        )
+    
+    async def events():
+        count = 0
+        try:
+            async for activity in langchain_service.stream_learning_plan(
+                student=user,
+                subject=subject,
+                relevant_content=contents
+            ):
+                count += 1
+                yield sse_event("activity", activity)
+            yield sse_event("done", {"activities": count})
+        except Exception as e:
+            logger.error(f"Error streaming learning plan: {e}")
+            yield sse_event("error", {"detail": f"Error creating learning plan: {str(e)}"})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/query")
 async def query_assistant(
     query: str = Body(..., embed=True),
@@ -1,17 +1,22 @@
 # backend/api/learning_plan_routes.py
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, status
-from typing import List, Dict, Any, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import uuid
 import logging
 import json
 
-from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
+from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus, LearningPeriod
+from models.user import User, LearningStyle
 from auth.entra_auth import get_current_user
 from services.azure_learning_plan_service import get_learning_plan_service
-from rag.generator import get_plan_generator
+from rag.generator import get_plan_generator, CONTENT_BY_ID_KEY
 from rag.retriever import retrieve_relevant_content
 from services.search_service import get_search_service
+from utils.sse import SSE_HEADERS, sse_event
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -19,10 +24,58 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/learning-plans", tags=["learning-plans"])
 
+def _student_from_current_user(current_user: Dict[str, Any]) -> User:
+    """Build the student profile used for plan generation from the authenticated user."""
+    return User(
+        id=current_user["id"],
+        username=current_user["username"],
+        email=current_user["email"],
+        full_name=current_user.get("full_name", ""),
+        grade_level=current_user.get("grade_level"),
+        subjects_of_interest=current_user.get("subjects_of_interest", []),
+        learning_style=LearningStyle(current_user.get("learning_style")) if current_user.get("learning_style") else None,
+        is_active=True
+    )
+
+def _resolve_learning_period(learning_period: Optional[str]) -> Tuple[LearningPeriod, int, int]:
+    """Parse the requested learning period; returns (period, period days, activity days)."""
+    # Parse learning period from string to enum
+    period = LearningPeriod.ONE_MONTH
+    if learning_period:
+        try:
+            period = LearningPeriod(learning_period)
+        except ValueError:
+            logger.warning(f"Invalid learning period: {learning_period}. Using default.")
+    
+    days = LearningPeriod.to_days(period)
+    # For very long periods, limit the number of days for activities to keep the plan manageable
+    activity_days = min(days, 14)
+    return period, days, activity_days
+
+async def _plan_inputs(user: User, subject: str):
+    """Retrieve relevant content for a plan while fetching the plan generator (created on first use)."""
+    relevant_content, plan_generator = await asyncio.gather(
+        retrieve_relevant_content(
+            student_profile=user,
+            subject=subject,
+            k=15  # Get more content to ensure we have enough for all activities
+        ),
+        get_plan_generator()
+    )
+    
+    # Add fallback content if no content was found
+    if not relevant_content:
+        logger.warning(f"No content found for subject {subject}. Using fallback content.")
+        # Import fallback content function
+        from scripts.add_fallback_content import get_fallback_content
+        relevant_content = get_fallback_content(subject)
+    return relevant_content, plan_generator
+
 @router.get("/")
 async def get_learning_plans(
     subject: Optional[str] = Query(None, description="Filter by subject"),
-    limit: int = Query(50, description="Maximum number of plans to return"),
+    page: int = Query(1, ge=1, description="Page number for pagination"),
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of plans to return"),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -30,6 +83,7 @@ async def get_learning_plans(
     
     Args:
         subject: Optional subject filter
+        page: Page number for pagination
         limit: Maximum number of plans to return
         current_user: Current authenticated user
         
@@ -40,15 +94,16 @@ async def get_learning_plans(
         # Get learning plan service
         learning_plan_service = await get_learning_plan_service()
         
-        # Get learning plans
+        # Get learning plans, paginated server-side by Azure Search
         plans = await learning_plan_service.get_learning_plans(
             user_id=current_user["id"],
             subject=subject,
-            limit=limit
+            limit=limit,
+            skip=(page - 1) * limit
         )
         
         # Convert to JSON-serializable format
-        return [plan.dict() for plan in plans]
+        return [plan.model_dump() for plan in plans]
         
     except Exception as e:
         raise HTTPException(
@@ -75,57 +130,16 @@ async def create_learning_plan(
     """
     try:
         # Create a user model from current user
-        from models.user import User, LearningStyle
-        
-        user = User(
-            id=current_user["id"],
-            username=current_user["username"],
-            email=current_user["email"],
-            full_name=current_user.get("full_name", ""),
-            grade_level=current_user.get("grade_level"),
-            subjects_of_interest=current_user.get("subjects_of_interest", []),
-            learning_style=LearningStyle(current_user.get("learning_style")) if current_user.get("learning_style") else None,
-            is_active=True
-        )
+        user = _student_from_current_user(current_user)
         
         # Set up start and end dates based on learning period
-        from models.learning_plan import LearningPeriod
-        
-        # Parse learning period from string to enum
-        period = None
-        if learning_period:
-            try:
-                period = LearningPeriod(learning_period)
-            except ValueError:
-                logger.warning(f"Invalid learning period: {learning_period}. Using default.")
-                period = LearningPeriod.ONE_MONTH
-        else:
-            period = LearningPeriod.ONE_MONTH
-        
-        # Calculate start and end dates
-        start_date = datetime.utcnow()
-        days = LearningPeriod.to_days(period)
+        period, days, activity_days = _resolve_learning_period(learning_period)
+        now = datetime.utcnow()
+        start_date = now
         end_date = start_date + timedelta(days=days)
         
-        # For very long periods, limit the number of days for activities to keep the plan manageable
-        activity_days = min(days, 14) if days > 14 else days
-        
         # Get relevant content for the learning plan with more items to ensure sufficient content for all activities
-        relevant_content = await retrieve_relevant_content(
-            student_profile=user,
-            subject=subject,
-            k=15  # Get more content to ensure we have enough for all activities
-        )
-        
-        # Add fallback content if no content was found
-        if not relevant_content:
-            logger.warning(f"No content found for subject {subject}. Using fallback content.")
-            # Import fallback content function
-            from scripts.add_fallback_content import get_fallback_content
-            relevant_content = get_fallback_content(subject)
-        
-        # Get plan generator
-        plan_generator = await get_plan_generator()
+        relevant_content, plan_generator = await _plan_inputs(user, subject)
         
         # Generate learning plan using the generate_plan method with activity days
         plan_dict = await plan_generator.generate_plan(
@@ -134,6 +148,7 @@ async def create_learning_plan(
             relevant_content=relevant_content,
             days=activity_days  # Pass the number of days to generate activities for
         )
+        content_by_id = plan_dict.pop(CONTENT_BY_ID_KEY)
         
         # Process activities to ensure each has associated content
         activities = []
@@ -145,10 +160,7 @@ async def create_learning_plan(
             
             # Try to find matching content if the activity has a content_id
             if content_id:
-                matching_content = next(
-                    (content for content in relevant_content if str(content.id) == content_id),
-                    None
-                )
+                matching_content = content_by_id.get(content_id)
                 if matching_content and not content_url:
                     content_url = matching_content.url
             
@@ -201,8 +213,6 @@ async def create_learning_plan(
             activities.append(activity_dict)
         
         # Create learning plan object from the returned dictionary with enhanced activities
-        now = datetime.utcnow()
-        
         # Create metadata with learning period
         metadata = {
             "learning_period": period.value,
@@ -218,7 +228,7 @@ async def create_learning_plan(
         }
         
         learning_plan = LearningPlan(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4().hex,
             student_id=user.id,
             title=plan_dict.get("title", f"{subject} Learning Plan for {period.value.replace('_', ' ').title()}"),
             description=plan_dict.get("description", f"A {period.value.replace('_', ' ')} learning plan for {subject}"),
@@ -246,13 +256,101 @@ async def create_learning_plan(
             )
         
         # Return the created plan
-        return learning_plan.dict()
+        return learning_plan.model_dump()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating learning plan: {str(e)}"
+        )
+
+@router.post("/stream")
+async def stream_learning_plan(
+    subject: str = Body(..., embed=True),
+    learning_period: Optional[str] = Body(None, embed=True),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Create a new personalized learning plan, streaming activities as they are generated.
+    
+    The response is a server-sent event stream: one "activity" event per activity
+    as soon as the model finishes it, then a "plan" event with the saved plan, or
+    an "error" event if generation or saving fails part-way.
+    
+    Args:
+        subject: Subject for the learning plan
+        learning_period: Optional period for the learning plan (one_week, two_weeks, one_month, two_months, school_term)
+        current_user: Current authenticated user
         
+    Returns:
+        Streaming response of server-sent events
+    """
+    try:
+        user = _student_from_current_user(current_user)
+        period, days, activity_days = _resolve_learning_period(learning_period)
+        relevant_content, plan_generator = await _plan_inputs(user, subject)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating learning plan: {str(e)}"
         )
+    
+    async def events() -> AsyncIterator[str]:
+        activities = []
+        try:
+            async for activity_dict in plan_generator.stream_plan_activities(
+                student=user,
+                subject=subject,
+                relevant_content=relevant_content,
+                days=activity_days
+            ):
+                activity_dict.setdefault("order", len(activities) + 1)
+                try:
+                    activity = LearningActivity(**activity_dict)
+                except ValidationError as e:
+                    logger.warning(f"Skipping malformed streamed activity: {e}")
+                    continue
+                activities.append(activity)
+                yield sse_event("activity", activity.model_dump(mode="json"))
+            
+            now = datetime.utcnow()
+            learning_plan = LearningPlan(
+                id=uuid.uuid4().hex,
+                student_id=user.id,
+                title=f"{subject} Learning Plan for {period.value.replace('_', ' ').title()}",
+                description=f"A {period.value.replace('_', ' ')} learning plan for {subject}",
+                subject=subject,
+                topics=[subject],
+                activities=activities,
+                status=ActivityStatus.NOT_STARTED,
+                progress_percentage=0.0,
+                created_at=now,
+                updated_at=now,
+                start_date=now,
+                end_date=now + timedelta(days=days),
+                metadata={
+                    "learning_period": period.value,
+                    "period_days": days,
+                    "activity_days": activity_days
+                },
+                owner_id=current_user["id"]
+            )
+            
+            learning_plan_service = await get_learning_plan_service()
+            if not await learning_plan_service.create_learning_plan(learning_plan):
+                yield sse_event("error", {"detail": "Failed to save learning plan"})
+                return
+            yield sse_event("plan", learning_plan.model_dump(mode="json"))
+            
+        except Exception as e:
+            logger.error(f"Error streaming learning plan: {e}")
+            yield sse_event("error", {"detail": f"Error creating learning plan: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
 
 @router.post("/profile-based")
 async def create_profile_based_learning_plan(
@@ -456,15 +554,22 @@ async def create_profile_based_learning_plan(
             # Create separate plans for each subject
             combined_activities = []
             
-            for subject, minutes in subject_times.items():
-                # Get relevant content for the subject - ask for more content to ensure we have enough
-                relevant_content = await retrieve_relevant_content(
-                    student_profile=user,
-                    subject=subject,
-                    grade_level=student_profile.get("grade_level"),
-                    k=10  # Request more content to ensure we have enough for activities
+            # Get relevant content for every subject at once - ask for more content to ensure we have enough -
+            # along with the plan generator, rather than one subject after another
+            plan_generator, *subject_contents = await asyncio.gather(
+                get_plan_generator(),
+                *(
+                    retrieve_relevant_content(
+                        student_profile=user,
+                        subject=subject,
+                        grade_level=student_profile.get("grade_level"),
+                        k=10  # Request more content to ensure we have enough for activities
+                    )
+                    for subject in subject_times
                 )
-                
+            )
+            
+            for (subject, minutes), relevant_content in zip(subject_times.items(), subject_contents):
                 # Add fallback content if no content was found
                 if not relevant_content:
                     logger.warning(f"No content found for subject {subject}. Using fallback content.")
@@ -472,9 +577,6 @@ async def create_profile_based_learning_plan(
                     from scripts.add_fallback_content import get_fallback_content
                     relevant_content = get_fallback_content(subject)
                 
-                # Get plan generator
-                plan_generator = await get_plan_generator()
-                
                 # Create mini-plan for the subject with days
                 # Note: Using generate_plan (the method that exists in LearningPlanGenerator)
                 # instead of create_learning_plan which doesn't exist
@@ -491,20 +593,21 @@ async def create_profile_based_learning_plan(
                     relevant_content=relevant_content,
                     days=subject_days  # Allocate proportional number of days
                 )
+                content_by_id = plan_dict.pop(CONTENT_BY_ID_KEY)
                 
                 # Create a mini plan manually from the plan dictionary
                 # The generator doesn't have parameters for max_activities,
                 # so we'll limit the activities after generation
                 mini_plan = LearningPlan(
-                    id=str(uuid.uuid4()),
+                    id=uuid.uuid4().hex,
                     student_id=user.id,
                     title=plan_dict.get("title", f"{subject} Learning Plan"),
                     description=plan_dict.get("description", f"Plan for {subject}"),
                     subject=subject,
                     topics=plan_dict.get("topics", [subject]),
                     activities=[],  # Will add only the needed activities
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow(),
+                    created_at=now,
+                    updated_at=now,
                     status=ActivityStatus.NOT_STARTED,
                     progress_percentage=0.0,
                     owner_id=current_user["id"]  # Set the owner_id to the current user
@@ -520,10 +623,7 @@ async def create_profile_based_learning_plan(
                     
                     # Try to find matching content if the activity has a content_id
                     if content_id:
-                        matching_content = next(
-                            (content for content in relevant_content if str(content.id) == content_id),
-                            None
-                        )
+                        matching_content = content_by_id.get(content_id)
                         if matching_content and not content_url:
                             content_url = matching_content.url
                     
@@ -571,7 +671,7 @@ async def create_profile_based_learning_plan(
                     
                     # Create enhanced activity with appropriate duration and content reference
                     activity = LearningActivity(
-                        id=str(uuid.uuid4()),
+                        id=uuid.uuid4().hex,
                         title=activity_dict.get("title", f"Activity {i+1}"),
                         description=activity_dict.get("description", "Complete this activity"),
                         content_id=content_id,
@@ -591,7 +691,7 @@ async def create_profile_based_learning_plan(
                 
                 # Add activities to the combined list
                 for i, activity in enumerate(mini_plan.activities):
-                    activity.id = str(uuid.uuid4())  # Ensure unique IDs
+                    activity.id = uuid.uuid4().hex  # Ensure unique IDs
                     activity.title = f"{subject}: {activity.title}"  # Prefix with subject
                     activity.order = len(combined_activities) + i + 1  # Update order
                     combined_activities.append(activity)
@@ -599,15 +699,15 @@ async def create_profile_based_learning_plan(
             # Create the combined plan
             period_name = period.value.replace('_', ' ').title()
             learning_plan = LearningPlan(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4().hex,
                 student_id=user.id,
                 title=f"Balanced Learning Plan for {user.full_name} - {period_name}",
                 description=f"A personalized {period_name} learning plan with {daily_minutes} minutes of daily balanced study across multiple subjects.",
                 subject="Multiple Subjects",
                 topics=focus_subjects,
                 activities=combined_activities,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=now,
+                updated_at=now,
                 start_date=start_date,
                 end_date=end_date,
                 status=ActivityStatus.NOT_STARTED,
@@ -647,12 +747,16 @@ async def create_profile_based_learning_plan(
             logger.info(f"Retrieving content for student profile: grade_level={student_profile.get('grade_level')}, subject={subject}")
             logger.info(f"Areas for improvement: {areas_for_improvement}")
             
-            # Get relevant content for the subject with enhanced filtering based on student profile
-            relevant_content = await retrieve_relevant_content(
-                student_profile=user,
-                subject=subject,
-                grade_level=student_profile.get("grade_level"),
-                k=15  # Get more content for better selection
+            # Get relevant content for the subject with enhanced filtering based on student profile,
+            # fetching the plan generator (created on first use) at the same time
+            relevant_content, plan_generator = await asyncio.gather(
+                retrieve_relevant_content(
+                    student_profile=user,
+                    subject=subject,
+                    grade_level=student_profile.get("grade_level"),
+                    k=15  # Get more content for better selection
+                ),
+                get_plan_generator()
             )
             
             # Add fallback content if no content was found
@@ -664,9 +768,6 @@ async def create_profile_based_learning_plan(
             
             logger.info(f"Retrieved {len(relevant_content)} relevant content items for learning plan")
             
-            # Get plan generator
-            plan_generator = await get_plan_generator()
-            
             # Generate enhanced plan using improved generate_plan method with days
             plan_dict = await plan_generator.generate_plan(
                 student=user,
@@ -674,6 +775,7 @@ async def create_profile_based_learning_plan(
                 relevant_content=relevant_content,
                 days=activity_days  # Use the full activity days for single subject
             )
+            content_by_id = plan_dict.pop(CONTENT_BY_ID_KEY)
             
             # Convert to LearningPlan object with enhanced activity details
             activities = []
@@ -685,10 +787,7 @@ async def create_profile_based_learning_plan(
                 
                 # Try to find matching content if the activity has a content_id
                 if content_id:
-                    matching_content = next(
-                        (content for content in relevant_content if str(content.id) == content_id),
-                        None
-                    )
+                    matching_content = content_by_id.get(content_id)
                     if matching_content and not content_url:
                         content_url = matching_content.url
                 
@@ -736,7 +835,7 @@ async def create_profile_based_learning_plan(
                 
                 # Create enhanced activity with new fields and ensure it has content
                 activity = LearningActivity(
-                    id=str(uuid.uuid4()),
+                    id=uuid.uuid4().hex,
                     title=activity_dict.get("title", f"Activity {i+1}"),
                     description=activity_dict.get("description", "Complete this activity"),
                     content_id=content_id,
@@ -752,15 +851,15 @@ async def create_profile_based_learning_plan(
             # Create learning plan with the correct data
             period_name = period.value.replace('_', ' ').title()
             learning_plan = LearningPlan(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4().hex,
                 student_id=user.id,
                 title=plan_dict.get("title", f"{subject} Learning Plan - {period_name}"),
                 description=plan_dict.get("description", f"A {period_name} learning plan for {subject}"),
                 subject=subject,
                 topics=plan_dict.get("topics", [subject]),
                 activities=activities,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=now,
+                updated_at=now,
                 start_date=start_date,
                 end_date=end_date,
                 status=ActivityStatus.NOT_STARTED,
@@ -788,7 +887,7 @@ async def create_profile_based_learning_plan(
             )
         
         # Return the created plan
-        return learning_plan.dict()
+        return learning_plan.model_dump()
         
     except HTTPException:
         raise
@@ -831,7 +930,7 @@ async def get_learning_plan(
             )
         
         # Return the plan
-        return plan.dict()
+        return plan.model_dump()
         
     except HTTPException:
         raise
@@ -950,7 +1049,7 @@ async def update_learning_plan(
             )
         
         # Return the updated plan
-        return updated_plan.dict()
+        return updated_plan.model_dump()
         
     except HTTPException:
         raise
@@ -996,7 +1095,7 @@ async def export_learning_plan(
         # Format as requested
         if format.lower() == "json":
             # Return the plan as JSON
-            return plan.dict()
+            return plan.model_dump()
         elif format.lower() == "html":
             # Generate HTML representation
             html_content = await learning_plan_service.generate_html_export(plan)
@@ -1,12 +1,13 @@
 # backend/app.py
 from fastapi import FastAPI, Depends, HTTPException, status, APIRouter
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional, Dict, Any
 import logging
 import os
 
 # Import settings
-from config.settings import Settings
-settings = Settings()
+from config.settings import get_settings
+settings = get_settings()
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +18,7 @@ app = FastAPI(
     title="Personalized Learning Co-pilot API",
     description="API for the Personalized Learning Co-pilot with Entra ID Authentication",
     version="0.2.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Add enhanced CORS handling
@@ -71,6 +73,22 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"Could not initialize Azure LangChain service: {e}")
     
+    # Build the LangChain clients now so the first request skips their setup
+    try:
+        from rag.langchain_manager import get_langchain_manager
+        await get_langchain_manager()
+        logger.info("LangChain manager initialized")
+    except Exception as e:
+        logger.warning(f"Could not initialize LangChain manager: {e}")
+    
+    # Warm up the plan generator so the first plan request skips client setup
+    try:
+        from rag.generator import get_plan_generator
+        await get_plan_generator()
+        logger.info("Learning plan generator initialized")
+    except Exception as e:
+        logger.warning(f"Could not initialize learning plan generator: {e}")
+    
     # Initialize Learning Plan service
     try:
         from services.azure_learning_plan_service import get_learning_plan_service
@@ -83,6 +101,21 @@ async def startup_event():
     logger.info(f"Client ID: {settings.CLIENT_ID}")
     logger.info(f"Tenant ID: {settings.TENANT_ID}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared clients and flush persisted caches on shutdown."""
+    from utils import vector_store as vector_store_module
+    if vector_store_module.vector_store is not None:
+        await vector_store_module.vector_store.close()
+    
+    from rag import generator as generator_module
+    from rag import langchain_manager as langchain_manager_module
+    for owner in (generator_module.plan_generator, langchain_manager_module.langchain_manager):
+        if owner is not None:
+            owner.plan_cache.flush()
+    if langchain_manager_module.langchain_manager is not None:
+        langchain_manager_module.langchain_manager.save_embedding_cache()
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(learning_plan_router)
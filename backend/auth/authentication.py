@@ -8,11 +8,11 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
-from config.settings import Settings
+from config.settings import get_settings
 from auth.entra_auth import get_current_user as entra_get_current_user
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -1,13 +1,14 @@
 from fastapi import Depends, HTTPException, status
 from typing import List, Optional, Dict, Any, Callable
 from enum import Enum
+import hmac
 import logging
 from jose import jwt, JWTError
 from models.user import User
 from auth.authentication import get_current_user, verify_microsoft_token
-from config.settings import Settings
+from config.settings import get_settings
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 # Configure logger
 logger = logging.getLogger(__name__)
 class Role(str, Enum):
@@ -80,6 +81,12 @@ def require_permission(required_permission: Permission):
     Returns:
         Dependency function that checks user permissions
     """
+    # The permission is fixed when the dependency is built, so resolve the
+    # roles that grant it once instead of on every request
+    allowed_roles = frozenset(
+        role for role, permissions in ROLE_PERMISSIONS.items()
+        if role == Role.ADMIN or required_permission in permissions
+    )
     async def permission_dependency(
         current_user: User = Depends(get_current_user),
         authorization: str = Depends(lambda x: x.headers.get("Authorization"))
@@ -92,9 +99,9 @@ def require_permission(required_permission: Permission):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         token = authorization.replace("Bearer ", "")
-        # Check if user has the required permission
-        has_permission = await check_permission(current_user, token, required_permission)
-        if not has_permission:
+        # Check if the user's role grants the required permission
+        user_role = await get_user_role_from_token(token)
+        if user_role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions to perform this action",
@@ -123,17 +130,15 @@ async def check_resource_owner(
     Returns:
         True if user is the owner or admin with override, False otherwise
     """
-    # Convert IDs to strings for comparison
-    owner_id = str(resource_owner_id)
-    user_id = str(current_user.id)
-    # Check if user is the owner
-    is_owner = owner_id == user_id
-    # Admin override if enabled
+    # Admin override if enabled - admins skip the ownership comparison
     if admin_override:
         user_role = await get_user_role_from_token(token)
         if user_role == Role.ADMIN:
             return True
-    return is_owner
+    # Convert IDs to strings and compare in constant time
+    owner_id = str(resource_owner_id)
+    user_id = str(current_user.id)
+    return hmac.compare_digest(owner_id.encode(), user_id.encode())
 def require_resource_owner(get_owner_id: Callable, admin_override: bool = True):
     """
     Dependency for requiring resource ownership.
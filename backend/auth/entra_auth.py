@@ -9,10 +9,10 @@ from datetime import datetime, timedelta
 import aiohttp
 import json
 
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -196,8 +196,11 @@ async def create_or_update_user_profile(user_info: Dict[str, Any]) -> bool:
         index_url = f"{settings.AZURE_SEARCH_ENDPOINT}/indexes/{settings.USERS_INDEX_NAME}/docs/index"
         index_url += f"?api-version=2023-07-01-Preview"
         
-        # Prepare user document
+        # Prepare user document. mergeOrUpload makes this a single atomic
+        # upsert: first-time users are created, existing profiles are merged
+        # in place without a preceding lookup.
         user_doc = {
+            "@search.action": "mergeOrUpload",
             "id": user_info["id"],
             "username": user_info.get("username", ""),
             "email": user_info.get("email", ""),
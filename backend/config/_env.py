@@ -0,0 +1,26 @@
+# backend/config/_env.py
+"""
+One-time loading of the .env file shared by the settings modules.
+"""
+
+import logging
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+def ensure_loaded() -> None:
+    """Load variables from .env into the environment, at most once per process."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        # Try to import dotenv, but handle gracefully if not installed
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            logging.warning("python-dotenv not installed, using environment variables as is")
+        _loaded = True
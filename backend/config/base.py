@@ -0,0 +1,27 @@
+# backend/config/base.py
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from ._env import ensure_loaded
+
+# Load environment variables from .env file (once per process)
+ensure_loaded()
+
+class BaseAppSettings(BaseSettings):
+    """Fields shared by the full and simple settings variants."""
+    # Application Settings
+    APP_NAME: str = "Personalized Learning Co-pilot"
+    API_VERSION: str = "v1"
+    DEBUG: bool = True
+    
+    # Authentication
+    SECRET_KEY: str = "your_secret_key_here"
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    
+    # User agent
+    USER_AGENT: str = "PersonalizedLearningCopilot/1.0"
+    
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore", env_ignore_empty=True)
@@ -1,102 +1,128 @@
 # backend/config/settings.py
-from pydantic import BaseSettings
+from pydantic import AliasChoices, Field, PrivateAttr
+from functools import cached_property, lru_cache
 import os
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
 import logging
 
-# Try to import dotenv, but handle gracefully if not installed
+from .base import BaseAppSettings
+
+# Endpoint derivation helper, imported once rather than on every lookup
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    from backend.utils.cognitive_services import get_service_specific_endpoint
 except ImportError:
-    logging.warning("python-dotenv not installed, using environment variables as is")
+    try:
+        from utils.cognitive_services import get_service_specific_endpoint
+    except ImportError:
+        get_service_specific_endpoint = None
 
-class Settings(BaseSettings):
-    # Application Settings
-    APP_NAME: str = "Personalized Learning Co-pilot"
-    API_VERSION: str = "v1"
-    DEBUG: bool = os.getenv("DEBUG", "True").lower() in ("true", "1", "yes")
-    
-    # Legacy Authentication Settings (for backward compatibility)
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your_secret_key_here")
-    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-    
+class Settings(BaseAppSettings):
     # Entra ID / Microsoft Identity Settings
-    TENANT_ID: str = os.getenv("MS_TENANT_ID", "")
-    CLIENT_ID: str = os.getenv("MS_CLIENT_ID", "")
-    CLIENT_SECRET: str = os.getenv("MS_CLIENT_SECRET", "")
-    REDIRECT_URI: str = os.getenv("MS_REDIRECT_URI", "http://localhost:3000/auth/callback")
+    TENANT_ID: str = Field("", validation_alias=AliasChoices("TENANT_ID", "MS_TENANT_ID"))
+    CLIENT_ID: str = Field("", validation_alias=AliasChoices("CLIENT_ID", "MS_CLIENT_ID"))
+    CLIENT_SECRET: str = Field("", validation_alias=AliasChoices("CLIENT_SECRET", "MS_CLIENT_SECRET"))
+    REDIRECT_URI: str = Field("http://localhost:3000/auth/callback", validation_alias=AliasChoices("REDIRECT_URI", "MS_REDIRECT_URI"))
     
     # API Scopes
-    API_SCOPE: str = os.getenv("API_SCOPE", "api://{CLIENT_ID}/user_impersonation")
+    API_SCOPE: str = "api://{CLIENT_ID}/user_impersonation"
     
     # Frontend URL for CORS and redirects
-    FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
+    FRONTEND_URL: str = "http://localhost:3000"
     
     # Azure AI Search Settings
-    AZURE_SEARCH_ENDPOINT: str = os.getenv("AZURE_SEARCH_ENDPOINT", "")
-    AZURE_SEARCH_KEY: str = os.getenv("AZURE_SEARCH_KEY", "")
-    AZURE_SEARCH_INDEX_NAME: str = os.getenv("AZURE_SEARCH_INDEX_NAME", "educational-content")
+    AZURE_SEARCH_ENDPOINT: str = ""
+    AZURE_SEARCH_KEY: str = ""
+    AZURE_SEARCH_INDEX_NAME: str = "educational-content"
     
     # Azure AI Search Indexes
-    CONTENT_INDEX_NAME: str = os.getenv("AZURE_SEARCH_CONTENT_INDEX", "educational-content")
-    USERS_INDEX_NAME: str = os.getenv("AZURE_SEARCH_USERS_INDEX", "user-profiles")
-    PLANS_INDEX_NAME: str = os.getenv("AZURE_SEARCH_PLANS_INDEX", "learning-plans")
-    REPORTS_INDEX_NAME: str = os.getenv("AZURE_SEARCH_REPORTS_INDEX", "student-reports")
+    CONTENT_INDEX_NAME: str = Field("educational-content", validation_alias=AliasChoices("CONTENT_INDEX_NAME", "AZURE_SEARCH_CONTENT_INDEX"))
+    USERS_INDEX_NAME: str = Field("user-profiles", validation_alias=AliasChoices("USERS_INDEX_NAME", "AZURE_SEARCH_USERS_INDEX"))
+    PLANS_INDEX_NAME: str = Field("learning-plans", validation_alias=AliasChoices("PLANS_INDEX_NAME", "AZURE_SEARCH_PLANS_INDEX"))
+    REPORTS_INDEX_NAME: str = Field("student-reports", validation_alias=AliasChoices("REPORTS_INDEX_NAME", "AZURE_SEARCH_REPORTS_INDEX"))
     
     # Azure OpenAI Settings 
-    AZURE_OPENAI_ENDPOINT: str = os.getenv("AZURE_OPENAI_ENDPOINT", "")
-    AZURE_OPENAI_KEY: str = os.getenv("AZURE_OPENAI_KEY", "")
-    AZURE_OPENAI_API_VERSION: str = os.getenv("AZURE_OPENAI_API_VERSION", "2023-05-15")
-    AZURE_OPENAI_DEPLOYMENT: str = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
-    AZURE_OPENAI_EMBEDDING_DEPLOYMENT: str = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002")
+    AZURE_OPENAI_ENDPOINT: str = ""
+    AZURE_OPENAI_KEY: str = ""
+    AZURE_OPENAI_API_VERSION: str = "2023-05-15"
+    AZURE_OPENAI_DEPLOYMENT: str = "gpt-4"
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT: str = "text-embedding-ada-002"
     
     # OpenAI API Settings (used by some components)
-    OPENAI_API_TYPE: str = os.getenv("OPENAI_API_TYPE", "azure")
-    OPENAI_API_BASE: str = os.getenv("OPENAI_API_BASE", AZURE_OPENAI_ENDPOINT)
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", AZURE_OPENAI_KEY)
-    OPENAI_API_VERSION: str = os.getenv("OPENAI_API_VERSION", AZURE_OPENAI_API_VERSION)
+    OPENAI_API_TYPE: str = "azure"
+    OPENAI_API_BASE: str = ""
+    OPENAI_API_KEY: str = ""
+    OPENAI_API_VERSION: str = ""
+    
+    # Output token ceiling for one generated learning plan, whatever its length in days
+    PLAN_MAX_TOKENS: int = 4096
+    
+    # Chat completion response cache; identical requests within the TTL reuse one response, whatever their temperature
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_TTL_SECONDS: int = 1800
+    
+    # Semantic plan cache: reuse a plan for a similar student profile with the same subject and resources
+    PLAN_CACHE_ENABLED: bool = False
+    PLAN_CACHE_SIMILARITY: float = 0.95
+    PLAN_CACHE_TTL_SECONDS: int = 1800
+    # Directory the plan cache is persisted to across restarts; in memory only when unset
+    PLAN_CACHE_DIR: Optional[str] = None
+    
+    # File the query embedding cache is saved to on shutdown and reloaded from at startup
+    EMBEDDING_CACHE_FILE: Optional[str] = None
+    
+    # Semantic RAG answer cache: reuse the answer to a near-identical question asked without chat history
+    RAG_CACHE_ENABLED: bool = False
+    RAG_CACHE_SIMILARITY: float = 0.95
+    RAG_CACHE_TTL_SECONDS: int = 600
     
     # Azure AI Services - Form Recognizer
-    FORM_RECOGNIZER_ENDPOINT: str = os.getenv("FORM_RECOGNIZER_ENDPOINT", "")
-    FORM_RECOGNIZER_KEY: str = os.getenv("FORM_RECOGNIZER_KEY", "")
+    FORM_RECOGNIZER_ENDPOINT: str = ""
+    FORM_RECOGNIZER_KEY: str = ""
     
     # Azure AI Services - Speech Service
-    SPEECH_KEY: str = os.getenv("SPEECH_KEY", "")
-    SPEECH_REGION: str = os.getenv("SPEECH_REGION", "")
+    SPEECH_KEY: str = ""
+    SPEECH_REGION: str = ""
     
     # Student Report Settings
-    REPORT_CONTAINER_NAME: str = os.getenv("AZURE_STORAGE_REPORT_CONTAINER", "student-reports")
-    AZURE_STORAGE_CONNECTION_STRING: str = os.getenv("AZURE_STORAGE_CONNECTION_STRING", "")
-    ENCRYPTION_KEY: str = os.getenv("ENCRYPTION_KEY", "")
+    REPORT_CONTAINER_NAME: str = Field("student-reports", validation_alias=AliasChoices("REPORT_CONTAINER_NAME", "AZURE_STORAGE_REPORT_CONTAINER"))
+    AZURE_STORAGE_CONNECTION_STRING: str = ""
+    ENCRYPTION_KEY: str = ""
     
     # Azure Key Vault for Secrets (Used for encryption keys)
-    AZURE_KEYVAULT_URL: str = os.getenv("AZURE_KEYVAULT_URL", "")
-    AZURE_KEYVAULT_SECRET_NAME: str = os.getenv("AZURE_KEYVAULT_SECRET_NAME", "student-report-encryption-key")
+    AZURE_KEYVAULT_URL: str = ""
+    AZURE_KEYVAULT_SECRET_NAME: str = "student-report-encryption-key"
+    
+    # Azure Cognitive Services multi-service resource (fallback for OpenAI)
+    AZURE_COGNITIVE_ENDPOINT: str = ""
+    AZURE_COGNITIVE_KEY: str = ""
     
     # Helper methods for OpenAI integration
-    def get_openai_endpoint(self) -> str:
-        """Get the OpenAI endpoint, using Cognitive Services endpoint if OpenAI-specific is not provided."""
+    @cached_property
+    def openai_endpoint(self) -> str:
+        """OpenAI endpoint, using Cognitive Services endpoint if OpenAI-specific is not provided."""
         if self.AZURE_OPENAI_ENDPOINT:
             return self.AZURE_OPENAI_ENDPOINT
-        
-        # If we don't have cognitive_services module, return default endpoint
-        try:
-            from backend.utils.cognitive_services import get_service_specific_endpoint
+        if get_service_specific_endpoint is not None and self.AZURE_COGNITIVE_ENDPOINT:
             return get_service_specific_endpoint(self.AZURE_COGNITIVE_ENDPOINT, "openai", self.AZURE_OPENAI_API_VERSION)
-        except ImportError:
-            return self.AZURE_COGNITIVE_ENDPOINT
+        # If we don't have cognitive_services module, return default endpoint
+        return self.AZURE_COGNITIVE_ENDPOINT
     
-    def get_openai_key(self) -> str:
-        """Get the OpenAI key, using Cognitive Services key if OpenAI-specific is not provided."""
-        if self.AZURE_OPENAI_KEY:
-            return self.AZURE_OPENAI_KEY
-        return self.AZURE_COGNITIVE_KEY
+    @cached_property
+    def openai_key(self) -> str:
+        """OpenAI key, using Cognitive Services key if OpenAI-specific is not provided."""
+        return self.AZURE_OPENAI_KEY or self.AZURE_COGNITIVE_KEY
     
-    # CORS Settings
-    @property
-    def CORS_ORIGINS(self) -> List[str]:
+    # CORS Settings - resolved once at construction; see _build_cors_origins
+    _cors_origins: Tuple[str, ...] = PrivateAttr(default=())
+    
+    def model_post_init(self, __context: Any) -> None:
+        # OpenAI-compatible settings fall back to their Azure OpenAI equivalents
+        self.OPENAI_API_BASE = self.OPENAI_API_BASE or self.AZURE_OPENAI_ENDPOINT
+        self.OPENAI_API_KEY = self.OPENAI_API_KEY or self.AZURE_OPENAI_KEY
+        self.OPENAI_API_VERSION = self.OPENAI_API_VERSION or self.AZURE_OPENAI_API_VERSION
+        self._cors_origins = self._build_cors_origins()
+    
+    def _build_cors_origins(self) -> Tuple[str, ...]:
         default_origins = [
             "http://localhost:3000",  # React frontend
             "http://localhost:8000",  # FastAPI backend (for development)
@@ -113,19 +139,25 @@ class Settings(BaseSettings):
             except Exception as e:
                 logging.warning(f"Error parsing CORS_ORIGINS: {e}")
         
-        # Remove duplicates and empty strings
-        return list(set([origin for origin in default_origins if origin]))
+        # Remove duplicates and empty strings, keeping order
+        return tuple(dict.fromkeys(origin for origin in default_origins if origin))
     
-    # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    @property
+    def CORS_ORIGINS(self) -> Tuple[str, ...]:
+        return self._cors_origins
     
     # Content Scraper Settings
-    SCRAPER_RATE_LIMIT: float = float(os.getenv("SCRAPER_RATE_LIMIT", "1.0"))  # seconds between requests
-    USER_AGENT: str = os.getenv("USER_AGENT", "PersonalizedLearningCopilot/1.0")
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    SCRAPER_RATE_LIMIT: float = 1.0  # seconds between requests
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings instance, built on first use."""
+    return Settings()
 
 # Create settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
+
+# Token settings hoisted to module constants for per-request hot paths
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -1,39 +1,22 @@
-from pydantic import BaseSettings
-import os
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import Tuple
+from .base import BaseAppSettings
 
-# Load environment variables from .env file
-load_dotenv()
+# Fixed CORS origins for the simple configuration
+_CORS_ORIGINS = (
+    "http://localhost:3000",  # React frontend
+    "http://localhost:8000",  # FastAPI backend (for development)
+)
 
-class Settings(BaseSettings):
-    # Application Settings
-    APP_NAME: str = "Personalized Learning Co-pilot"
-    API_VERSION: str = "v1"
-    DEBUG: bool = True
-    
-    # Authentication
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your_secret_key_here")
-    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-    
-    # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    
-    # User agent
-    USER_AGENT: str = "PersonalizedLearningCopilot/1.0"
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-        
+class SimpleSettings(BaseAppSettings):
     # CORS Settings as a property to avoid env parsing issues
     @property
-    def CORS_ORIGINS(self) -> List[str]:
-        return [
-            "http://localhost:3000",  # React frontend
-            "http://localhost:8000",  # FastAPI backend (for development)
-        ]
+    def CORS_ORIGINS(self) -> Tuple[str, ...]:
+        return _CORS_ORIGINS
 
 # Create settings instance
-settings = Settings()
+settings = SimpleSettings()
+
+# Token settings hoisted to module constants for per-request hot paths
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field, HttpUrl, AnyUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, TypeAdapter
 from typing import List, Optional, Dict, Any, Union
 from enum import Enum
-import uuid
+from .types import PackedEmbedding, new_id, pack_embedding  # noqa: F401 - re-exported
 from datetime import datetime
 
 # Content Type Enum - with extra options for flexibility
@@ -22,15 +22,24 @@ class DifficultyLevel(str, Enum):
     ADVANCED = "advanced"
     UNKNOWN = "unknown"
 
+# Extracted-media metadata; known keys are typed, anything else passes through
+class ContentMetadata(BaseModel):
+    content_text: Optional[str] = None
+    transcription: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    content_html: Optional[str] = None
+    
+    model_config = ConfigDict(extra="allow", defer_build=True)
+
 # Content models
 class Content(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     title: Optional[str] = None
     description: Optional[str] = None
     content_type: Optional[Union[ContentType, str]] = None
     subject: Optional[str] = None
     topics: List[str] = []
-    url: Optional[Union[HttpUrl, AnyUrl, str]] = None  # More flexible URL field
+    url: Optional[str] = None  # Validated once at ingest (see validate_http_url), stored as-is
     source: Optional[str] = "ABC Education"
     difficulty_level: Optional[Union[DifficultyLevel, str]] = None
     grade_level: Optional[List[int]] = []
@@ -38,15 +47,47 @@ class Content(BaseModel):
     keywords: Optional[List[str]] = []
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    metadata: Optional[Dict[str, Any]] = {}
+    metadata: Optional[ContentMetadata] = None
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(
+        from_attributes=True,
         # Allow any extra fields that might come from Azure Search
-        extra = "allow"
+        extra="allow",
         # Be more permissive with field values
-        arbitrary_types_allowed = True
+        arbitrary_types_allowed=True,
+        # Build the validator on first use rather than at import
+        defer_build=True,
+    )
+
+def build_embedding_input_text(content: Content) -> str:
+    """Combine the fields that describe a content item into the text to embed."""
+    text = "\n".join((
+        f"Title: {content.title}",
+        f"Subject: {content.subject}",
+        f"Topics: {', '.join(content.topics)}",
+        f"Description: {content.description}",
+        f"Content Type: {content.content_type}",
+        f"Difficulty Level: {content.difficulty_level}",
+        f"Grade Level: {'-'.join(map(str, content.grade_level or []))}",
+    ))
+    
+    # Add keywords if available
+    if content.keywords:
+        text += f"\nKeywords: {', '.join(content.keywords)}"
+    return text
+
+# URL validator used only at the ingest boundary
+_HTTP_URL = TypeAdapter(HttpUrl)
+
+def validate_http_url(value: str) -> str:
+    """Check that value is a well-formed http(s) URL; raises pydantic.ValidationError if not.
+    
+    The original string is returned unchanged, so the ingested value is stored
+    exactly as Content will read it back.
+    """
+    _HTTP_URL.validate_python(value)
+    return value
+
 # Content with embedding model
-class ContentWithEmbedding(Content):
-    embedding: List[float]
-    embedding_model: str = "text-embedding-ada-002"
\ No newline at end of file
+class ContentWithEmbedding(Content, PackedEmbedding):
+    pass
@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from datetime import datetime, timedelta
-import uuid
+from .types import new_id
 
 # Activity Status Enum
 class ActivityStatus(str, Enum):
@@ -34,7 +34,7 @@ class LearningPeriod(str, Enum):
         return 30  # Default to one month
 # Learning Activity model
 class LearningActivity(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     title: str
     description: str
     content_id: Optional[str] = None
@@ -46,9 +46,10 @@ class LearningActivity(BaseModel):
     completed_at: Optional[datetime] = None
     learning_benefit: Optional[str] = None
     metadata: Dict[str, Any] = {}
+    model_config = ConfigDict(defer_build=True)
 # Learning Plan model
 class LearningPlan(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     student_id: str
     title: str
     description: str
@@ -63,8 +64,7 @@ class LearningPlan(BaseModel):
     progress_percentage: float = 0.0
     metadata: Dict[str, Any] = {}
     owner_id: Optional[str] = None  # ID of the teacher who created this plan
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 # Learning Plan Creation model
 class LearningPlanCreate(BaseModel):
     subject: str
@@ -76,8 +76,10 @@ class LearningPlanCreate(BaseModel):
     end_date: Optional[datetime] = None
     learning_period: Optional[LearningPeriod] = LearningPeriod.ONE_MONTH
     metadata: Dict[str, Any] = {}
+    model_config = ConfigDict(defer_build=True)
 # Learning Activity Update
 class LearningActivityUpdate(BaseModel):
     activity_id: str
     status: ActivityStatus
     completed_at: Optional[datetime] = None
+    model_config = ConfigDict(defer_build=True)
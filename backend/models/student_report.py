@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from datetime import datetime
-import uuid
+from .types import PackedEmbedding, new_id
 
 class ReportType(str, Enum):
     PRIMARY = "primary"
@@ -17,9 +17,11 @@ class Subject(BaseModel):
     achievement_level: Optional[str] = None
     areas_for_improvement: List[str] = []
     strengths: List[str] = []
+    
+    model_config = ConfigDict(defer_build=True)
 
 class StudentReport(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     student_id: str  # Links to the user ID
     report_type: ReportType
     school_name: Optional[str] = None
@@ -39,7 +41,8 @@ class StudentReport(BaseModel):
     
     # PII fields - will be encrypted
     encrypted_fields: Dict[str, str] = {}  # For storing encrypted sensitive data
+    
+    model_config = ConfigDict(defer_build=True)
 
-class StudentReportWithEmbedding(StudentReport):
-    embedding: List[float]
-    embedding_model: str = "text-embedding-ada-002"
\ No newline at end of file
+class StudentReportWithEmbedding(StudentReport, PackedEmbedding):
+    pass
@@ -0,0 +1,46 @@
+import uuid
+from typing import Any, List, Sequence
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, field_serializer, field_validator
+
+# Embeddings are stored as little-endian float16
+EMBEDDING_DTYPE = np.dtype("<f2")
+
+# Shared id generator for model default factories
+def new_id() -> str:
+    return uuid.uuid4().hex
+
+def pack_embedding(vector: Sequence[float]) -> bytes:
+    """Normalize an embedding vector and pack it as little-endian float16 bytes."""
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    if norm:
+        arr /= norm
+    return arr.astype(EMBEDDING_DTYPE).tobytes()
+
+# Mixin for models that carry an embedding
+class PackedEmbedding(BaseModel):
+    # Packed float16 vector (see pack_embedding) rather than a list of boxed floats
+    embedding: bytes
+    embedding_dtype: str = "float16"
+    embedding_model: str = "text-embedding-ada-002"
+    
+    model_config = ConfigDict(defer_build=True)
+
+    @field_validator("embedding", mode="before")
+    @classmethod
+    def _pack_embedding(cls, value: Any) -> Any:
+        # Accept raw vectors (e.g. straight from OpenAI or Azure Search)
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return pack_embedding(value)
+        return value
+
+    @field_serializer("embedding")
+    def _serialize_embedding(self, value: bytes) -> List[float]:
+        # Dump a plain vector so model_dump() output stays JSON/index friendly
+        return self.as_array().tolist()
+
+    def as_array(self) -> np.ndarray:
+        """Return the embedding as a read-only float16 numpy view."""
+        return np.frombuffer(self.embedding, dtype=EMBEDDING_DTYPE)
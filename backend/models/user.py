@@ -1,7 +1,10 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints
+from typing import Annotated, List, Optional
 from enum import Enum
 from datetime import datetime
+# Lightweight shape check for stored emails; full EmailStr validation only on signup
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+Email = Annotated[str, StringConstraints(pattern=EMAIL_PATTERN)]
 # Learning Style Enum
 class LearningStyle(str, Enum):
     VISUAL = "visual"
@@ -13,26 +16,29 @@ class LearningStyle(str, Enum):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    model_config = ConfigDict(defer_build=True)
 class TokenData(BaseModel):
     username: Optional[str] = None
+    model_config = ConfigDict(defer_build=True)
 # User models
 class UserBase(BaseModel):
     username: str
-    email: EmailStr
+    email: Email
     full_name: Optional[str] = None
     grade_level: Optional[int] = None
     subjects_of_interest: List[str] = []
     areas_for_improvement: List[str] = []
     learning_style: Optional[LearningStyle] = None
     is_active: bool = True
+    model_config = ConfigDict(defer_build=True)
 class UserCreate(UserBase):
+    email: EmailStr
     password: str
     confirm_password: Optional[str] = None
 class User(UserBase):
     id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 class UserInDB(User):
     hashed_password: str
@@ -0,0 +1,74 @@
+# backend/rag/_json_stream.py
+from typing import Any, Dict, List
+
+import orjson
+
+class ActivityStreamParser:
+    """Incrementally extract completed objects from the top-level "activities" array.
+    
+    Tracks string/escape state and container nesting over the text fed so far, so
+    each activity can be decoded as soon as its closing brace arrives. Text that
+    can no longer be needed is dropped as parsing moves on, so the buffer holds at
+    most the activity (or key) currently being read. Anything outside the
+    top-level object, such as a Markdown code fence, is ignored.
+    """
+    
+    def __init__(self):
+        self._text = ""
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_key = None
+        self._in_activities = False
+        self._activity_start = None
+        self.complete = False
+    
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """Add a chunk of response text; return activities completed by it."""
+        start = len(self._text)
+        text = self._text = self._text + delta
+        completed = []
+        for i in range(start, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = text[self._string_start + 1:i]
+                    self._string_start = None
+            elif char == '"':
+                self._in_string = True
+                if len(self._stack) == 1:
+                    self._string_start = i
+            elif char in "{[":
+                if char == "[" and len(self._stack) == 1 and self._last_key == "activities":
+                    self._in_activities = True
+                elif char == "{" and self._in_activities and len(self._stack) == 2:
+                    self._activity_start = i
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if self._activity_start is not None and len(self._stack) == 2:
+                    completed.append(orjson.loads(text[self._activity_start:i + 1]))
+                    self._activity_start = None
+                elif self._in_activities and len(self._stack) == 1:
+                    self._in_activities = False
+                elif not self._stack:
+                    self.complete = True
+        
+        # Keep only the text a later chunk may still need
+        keep_from = self._activity_start if self._activity_start is not None else self._string_start
+        if keep_from is None:
+            self._text = ""
+        else:
+            self._text = text[keep_from:]
+            if self._activity_start is not None:
+                self._activity_start = 0
+            if self._string_start is not None:
+                self._string_start -= keep_from
+        return completed
@@ -0,0 +1,301 @@
+# backend/rag/_llm_cache.py
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """In-process TTL cache for chat completion responses."""
+
+    def __init__(self, ttl_seconds: int = 1800):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Optional[Dict[str, str]] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """Hash the request parameters that determine the response."""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "response_format": response_format,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            response, stored_at = entry
+            if time.monotonic() - stored_at < self.ttl_seconds:
+                self.hits += 1
+                logger.debug(f"LLM cache hit ({self.hits} hits, {self.misses} misses)")
+                # Hand out a copy so callers cannot mutate the cached response
+                return copy.deepcopy(response)
+            del self._entries[key]
+        self.misses += 1
+        logger.debug(f"LLM cache miss ({self.hits} hits, {self.misses} misses)")
+        return None
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        self._entries[key] = (copy.deepcopy(response), time.monotonic())
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def plan_cache_path(cache_dir: Optional[str], name: str) -> Optional[str]:
+    """Directory for a named persisted cache under cache_dir, or None when cache_dir is unset."""
+    return os.path.join(cache_dir, name) if cache_dir else None
+
+
+def _scope_digest(scope: Hashable) -> bytes:
+    """Stable digest of a cache scope; unlike hash(), it is the same in every process."""
+    def normalize(value: Any) -> Any:
+        if isinstance(value, (set, frozenset)):
+            return sorted(normalize(item) for item in value)
+        if isinstance(value, (tuple, list)):
+            return [normalize(item) for item in value]
+        return value
+    payload = json.dumps(normalize(scope), sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+class SemanticCache:
+    """In-process cache that matches requests by embedding similarity.
+    
+    Entries are grouped by an exact ``scope`` (for plans: subject plus the set of
+    resource ids), so a hit can only return a result built from the same inputs;
+    within a scope the closest stored embedding is used if its cosine similarity
+    reaches ``threshold``. Values are deep-copied in and out.
+    
+    Embeddings live as unit rows of one preallocated float32 matrix, used as a
+    ring buffer of ``max_entries`` slots, so a lookup is a masked matrix-vector
+    product rather than a per-entry Python scan.
+    
+    With a ``path`` the cache survives restarts: the matrix is a memory-mapped
+    file in that directory and every entry is appended to a JSON lines sidecar
+    that is replayed on startup. Values must then be JSON-serializable.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    ENTRIES_FILE = "entries.jsonl"
+    META_FILE = "meta.json"
+    # Bump when the on-disk layout changes; caches with another version are discarded
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: int = 1800,
+        max_entries: int = 1024,
+        path: Optional[str] = None
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries_file = None
+        self._reset()
+        if path:
+            try:
+                self._load()
+            except Exception as e:
+                logger.warning(f"Discarding unreadable semantic cache at {path}: {e}")
+                self._reset()
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, scope: Hashable, embedding: Sequence[float]) -> Optional[Dict[str, Any]]:
+        vector = self._unit(embedding)
+        # An embedding of another dimension (a different embedding model) never matches
+        if self._vectors is not None and vector.shape == self._vectors.shape[1:]:
+            digest = _scope_digest(scope)
+            live = (
+                (self._scope_keys == int.from_bytes(digest[:8], "little", signed=True))
+                & (time.time() - self._stored_at < self.ttl_seconds)
+            )
+            # Key matches are confirmed against the full digest
+            slots = [slot for slot in np.flatnonzero(live) if self._scopes[slot] == digest]
+            if slots:
+                # Stored vectors are unit length, so one product gives every cosine similarity
+                similarities = self._vectors[slots] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    logger.debug(f"Semantic cache hit ({self.hits} hits, {self.misses} misses)")
+                    return copy.deepcopy(self._values[slots[best]])
+        self.misses += 1
+        logger.debug(f"Semantic cache miss ({self.hits} hits, {self.misses} misses)")
+        return None
+
+    def put(self, scope: Hashable, embedding: Sequence[float], value: Dict[str, Any]) -> None:
+        vector = self._unit(embedding)
+        if self._vectors is not None and vector.shape != self._vectors.shape[1:]:
+            # Entries embedded by another model can never match again
+            logger.info(f"Embedding dimension changed to {vector.shape[0]}, clearing semantic cache")
+            self.clear()
+        if self._vectors is None:
+            # Sized on first use, once the embedding dimension is known
+            self._allocate(vector.shape[0])
+        # Overwrites the oldest slot once the buffer is full
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.max_entries
+        self._store(slot, _scope_digest(scope), time.time(), vector, copy.deepcopy(value))
+        if self.path:
+            self._append_entry(slot)
+
+    def flush(self) -> None:
+        """Write pending cache data to disk; a no-op for in-memory caches."""
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        if self._entries_file is not None:
+            self._entries_file.flush()
+            os.fsync(self._entries_file.fileno())
+
+    def clear(self) -> None:
+        self._reset()
+        if self.path:
+            for name in (self.VECTORS_FILE, self.ENTRIES_FILE, self.META_FILE):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+
+    def _reset(self) -> None:
+        if self._entries_file is not None:
+            self._entries_file.close()
+            self._entries_file = None
+        self._vectors: Optional[np.ndarray] = None
+        # First 8 bytes of each scope digest, for vectorized matching
+        self._scope_keys = np.zeros(self.max_entries, dtype=np.int64)
+        # Empty slots never pass the TTL check
+        self._stored_at = np.full(self.max_entries, -np.inf)
+        self._scopes: List[Optional[bytes]] = [None] * self.max_entries
+        self._values: List[Optional[Dict[str, Any]]] = [None] * self.max_entries
+        self._next_slot = 0
+        # Lines written to the sidecar since it was last compacted
+        self._appended = 0
+
+    def _store(self, slot: int, digest: bytes, stored_at: float, vector: np.ndarray, value: Any) -> None:
+        self._vectors[slot] = vector
+        self._scope_keys[slot] = int.from_bytes(digest[:8], "little", signed=True)
+        self._stored_at[slot] = stored_at
+        self._scopes[slot] = digest
+        self._values[slot] = value
+
+    def _allocate(self, dimension: int) -> None:
+        if not self.path:
+            self._vectors = np.zeros((self.max_entries, dimension), dtype=np.float32)
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, self.META_FILE), "w") as f:
+            json.dump(
+                {"version": self.FORMAT_VERSION, "dimension": dimension, "max_entries": self.max_entries},
+                f
+            )
+        self._vectors = np.memmap(
+            os.path.join(self.path, self.VECTORS_FILE),
+            dtype=np.float32,
+            mode="w+",
+            shape=(self.max_entries, dimension)
+        )
+        self._entries_file = open(os.path.join(self.path, self.ENTRIES_FILE), "w")
+        self._appended = 0
+
+    def _entry_line(self, slot: int) -> str:
+        record = {
+            "slot": slot,
+            "scope": self._scopes[slot].hex(),
+            "stored_at": self._stored_at[slot],
+            "value": self._values[slot]
+        }
+        return json.dumps(record) + "\n"
+
+    def _append_entry(self, slot: int) -> None:
+        self._entries_file.write(self._entry_line(slot))
+        self._appended += 1
+        # Replaced entries stay in the sidecar until it is rewritten
+        if self._appended > 2 * self.max_entries:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the sidecar with one line per occupied slot and reopen it for appending."""
+        if self._entries_file is not None:
+            self._entries_file.close()
+        entries_path = os.path.join(self.path, self.ENTRIES_FILE)
+        occupied = [slot for slot in range(self.max_entries) if self._scopes[slot] is not None]
+        # Oldest first, so replaying the file ends on the newest slot
+        occupied.sort(key=lambda slot: self._stored_at[slot])
+        with open(entries_path + ".tmp", "w") as f:
+            f.writelines(self._entry_line(slot) for slot in occupied)
+        os.replace(entries_path + ".tmp", entries_path)
+        self._entries_file = open(entries_path, "a")
+        self._appended = len(occupied)
+
+    def _load(self) -> None:
+        """Reopen a persisted cache, keeping entries that are still within the TTL."""
+        meta_path = os.path.join(self.path, self.META_FILE)
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("version") != self.FORMAT_VERSION or meta.get("max_entries") != self.max_entries:
+            logger.info(f"Semantic cache at {self.path} has a different layout, starting empty")
+            self.clear()
+            return
+        
+        vectors = np.memmap(
+            os.path.join(self.path, self.VECTORS_FILE),
+            dtype=np.float32,
+            mode="r+",
+            shape=(self.max_entries, meta["dimension"])
+        )
+        self._vectors = vectors
+        entries_path = os.path.join(self.path, self.ENTRIES_FILE)
+        now = time.time()
+        latest: Dict[int, Dict[str, Any]] = {}
+        last_slot = None
+        with open(entries_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A write cut short by a crash; everything before it is intact
+                    break
+                latest[record["slot"]] = record
+                last_slot = record["slot"]
+        for slot, record in latest.items():
+            if now - record["stored_at"] < self.ttl_seconds:
+                digest = bytes.fromhex(record["scope"])
+                self._store(slot, digest, record["stored_at"], vectors[slot], record["value"])
+        if last_slot is not None:
+            self._next_slot = (last_slot + 1) % self.max_entries
+        
+        # Drop expired and replaced entries from the sidecar
+        self._compact()
+        logger.info(f"Loaded {self._appended} semantic cache entries from {self.path}")
@@ -10,13 +10,15 @@ import os
 import asyncio
 from typing import List, Dict, Any, Optional
 
+import orjson
+
 # LangChain imports
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langchain_community.vectorstores import AzureSearch
 from langchain_community.retrievers import AzureAISearchRetriever
 from langchain.chains import RetrievalQA, ConversationalRetrievalChain
 from langchain.memory import ConversationBufferMemory
-from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 
@@ -25,14 +27,55 @@ from azure.core.credentials import AzureKeyCredential
 from azure.search.documents.aio import SearchClient
 
 # Internal imports
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Learning plan prompt, filled with str.format (doubled braces are literal JSON)
+_LEARNING_PLAN_PROMPT = """You are an expert educational planner. Create a personalized learning plan for a student with
+the following profile:
+{student_profile}
+
+The plan should focus on the subject: {subject}
+
+Available educational resources:
+{resources}
+
+Create a comprehensive learning plan that includes:
+1. An appropriate title
+2. A brief description
+3. 4-6 learning activities that use the available resources
+4. Each activity should:
+   - Have a title and description
+   - Reference a specific resource ID where applicable
+   - Specify an estimated duration in minutes
+   - Be in a logical sequence
+
+Format your response as JSON with the following structure:
+{{
+    "title": "Learning Plan Title",
+    "description": "Brief description of the learning plan",
+    "subject": "{subject}",
+    "topics": ["topic1", "topic2"...],
+    "activities": [
+        {{
+            "title": "Activity Title",
+            "description": "Activity description",
+            "content_id": "resource_id or null",
+            "duration_minutes": estimated_minutes,
+            "order": sequence_number
+        }},
+        ...
+    ]
+}}
+
+Return ONLY the JSON with no additional text.
+"""
+
 class AzureLangChainIntegration:
     """
     Integration between LangChain, Azure OpenAI, and Azure AI Search.
@@ -391,75 +434,29 @@ class AzureLangChainIntegration:
                 f"Interests: {', '.join(student_profile.get('subjects_of_interest', []))}"
             )
             
-            # Create prompt template for learning plan generation
-            prompt = PromptTemplate.from_template(
-                """
-                You are an expert educational planner. Create a personalized learning plan for a student with
-                the following profile:
-                {student_profile}
-                
-                The plan should focus on the subject: {subject}
-                
-                Available educational resources:
-                {resources}
-                
-                Create a comprehensive learning plan that includes:
-                1. An appropriate title
-                2. A brief description
-                3. 4-6 learning activities that use the available resources
-                4. Each activity should:
-                   - Have a title and description
-                   - Reference a specific resource ID where applicable
-                   - Specify an estimated duration in minutes
-                   - Be in a logical sequence
-                
-                Format your response as JSON with the following structure:
-                {{
-                    "title": "Learning Plan Title",
-                    "description": "Brief description of the learning plan",
-                    "subject": "{subject}",
-                    "topics": ["topic1", "topic2"...],
-                    "activities": [
-                        {{
-                            "title": "Activity Title",
-                            "description": "Activity description",
-                            "content_id": "resource_id or null",
-                            "duration_minutes": estimated_minutes,
-                            "order": sequence_number
-                        }},
-                        ...
-                    ]
-                }}
-                
-                Return ONLY the JSON with no additional text.
-                """
+            # Fill the plan prompt and send it straight to the model
+            prompt = _LEARNING_PLAN_PROMPT.format(
+                student_profile=formatted_profile,
+                subject=subject,
+                resources=formatted_content
             )
-            
-            # Run the prompt through the language model
-            chain = prompt | self.llm | StrOutputParser()
-            
-            result = await chain.ainvoke({
-                "student_profile": formatted_profile,
-                "subject": subject,
-                "resources": formatted_content
-            })
+            response = await self.llm.ainvoke(prompt)
+            result = response.content
             
             # Parse the JSON result
-            import json
-            
             try:
                 # Clean up the response to ensure it's valid JSON
                 json_start = result.find("{")
                 json_end = result.rfind("}")
                 if json_start >= 0 and json_end > json_start:
                     clean_json = result[json_start:json_end+1]
-                    learning_plan = json.loads(clean_json)
+                    learning_plan = orjson.loads(clean_json)
                 else:
-                    learning_plan = json.loads(result)
+                    learning_plan = orjson.loads(result)
                     
                 return learning_plan
                 
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.error(f"Error parsing learning plan JSON: {result}")
                 # Return a basic plan with the raw response
                 return {
@@ -1,21 +1,41 @@
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 import re
+import hashlib
 from datetime import datetime
+from functools import lru_cache
 from azure.ai.formrecognizer import DocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
-from models.content import Content
-from config.settings import Settings
+from models.content import Content, ContentWithEmbedding, build_embedding_input_text, pack_embedding
+from config.settings import get_settings
 from rag.openai_adapter import get_openai_adapter
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Non-content blocks stripped from raw HTML before parsing
+_STRIP_BLOCKS = re.compile(r"<(script|style|nav|footer|header)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+# Whitespace cleanup for extracted HTML text
+_MULTISPACE = re.compile(r"[ \t\r\f\v]+")
+_MULTINL = re.compile(r" ?\n\s*")
+
+# Number of texts sent per embeddings request during bulk processing
+EMBEDDING_BATCH_SIZE = 100
+# Documents fetched per round-trip when streaming content from the database
+CURSOR_BATCH_SIZE = 200
+# Maximum number of embedding batches in flight at once
+EMBEDDING_CONCURRENCY = 4
+
+def embedding_text_hash(text: str) -> str:
+    """Fingerprint of the text an embedding was generated from."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
 class DocumentProcessor:
     """
     Process documents for search indexing, including content extraction
@@ -53,15 +73,34 @@ class DocumentProcessor:
             )
             
             # Create document for indexing
-            content_dict = content.dict()
-            content_dict["embedding"] = embedding
+            content_with_embedding = ContentWithEmbedding(
+                **content.model_dump(),
+                embedding=embedding,
+                embedding_model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+            )
             
-            return content_dict
+            return content_with_embedding.model_dump()
             
         except Exception as e:
             logger.error(f"Error processing content {content.id}: {e}")
             raise
     
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several prepared texts with one API call.
+        Args:
+            texts: Texts from _prepare_text_for_embedding
+        Returns:
+            Embeddings, in the same order as texts
+        """
+        if not self.openai_client:
+            self.openai_client = await get_openai_adapter()
+            
+        return await self.openai_client.create_embeddings(
+            model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            texts=texts
+        )
+    
     def _prepare_text_for_embedding(self, content: Content) -> str:
         """
         Prepare content text for embedding by combining relevant fields.
@@ -70,22 +109,7 @@ class DocumentProcessor:
         Returns:
             Processed text ready for embedding
         """
-        # Combine relevant fields
-        text_parts = [
-            f"Title: {content.title}",
-            f"Subject: {content.subject}",
-            f"Topics: {', '.join(content.topics)}",
-            f"Description: {content.description}",
-            f"Content Type: {content.content_type}",
-            f"Difficulty Level: {content.difficulty_level}",
-            f"Grade Level: {'-'.join(map(str, content.grade_level))}"
-        ]
-        
-        # Add keywords if available
-        if content.keywords:
-            text_parts.append(f"Keywords: {', '.join(content.keywords)}")
-            
-        return "\n".join(text_parts)
+        return build_embedding_input_text(content)
     
     async def extract_content_from_document(self, document_url: str) -> Dict[str, Any]:
         """
@@ -152,66 +176,105 @@ class DocumentProcessor:
         Returns:
             Extracted text
         """
-        soup = BeautifulSoup(html, "html.parser")
+        # Cut script, style and page-chrome blocks in one regex pass so the parser sees less input
+        tree = HTMLParser(_STRIP_BLOCKS.sub("", html))
         
-        # Remove script and style elements
-        for element in soup(["script", "style", "nav", "footer", "header"]):
-            element.decompose()
+        # Remove any leftovers the regex cannot pair up (unclosed or nested tags)
+        for node in tree.css("script, style, nav, footer, header"):
+            node.decompose()
             
         # Get text
-        text = soup.get_text(separator="\n")
+        text = tree.body.text(separator="\n") if tree.body else ""
         
-        # Clean the text
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = "\n".join(chunk for chunk in chunks if chunk)
+        # Clean the text: collapse runs of spaces, trim lines and drop blank ones
+        text = _MULTISPACE.sub(" ", text)
+        text = _MULTINL.sub("\n", text).strip()
         
         return text
 
-# Singleton instance
-document_processor = None
-
-async def get_document_processor():
+@lru_cache(maxsize=1)
+def get_document_processor() -> DocumentProcessor:
     """Get or create the document processor singleton."""
-    global document_processor
-    if document_processor is None:
-        document_processor = DocumentProcessor()
-    return document_processor
+    return DocumentProcessor()
 
 async def process_all_content():
     """Process all content items in the database and add embeddings."""
-    processor = await get_document_processor()
+    # Ships with the Mongo driver the connector below will use; only this function needs it
+    from pymongo import ReplaceOne
+    
+    processor = get_document_processor()
     db = None  # This would be your database connector
     
-    # Get all content
-    contents = await db.contents.find().to_list(length=1000)
-    processed_count = 0
-    error_count = 0
+    # Text fingerprint each stored embedding was built from
+    stored_hashes = {
+        doc["_id"]: doc.get("prep_hash")
+        async for doc in db.contents_with_embeddings.find({}, {"_id": 1, "prep_hash": 1})
+    }
     
-    for content_dict in contents:
-        try:
-            # Skip if already has embedding
-            if "embedding" in content_dict and content_dict["embedding"]:
-                continue
-                
-            # Convert to Content model
-            content = Content(**content_dict)
-            
-            # Process content
-            processed_content = await processor.process_content(content)
-            
-            # Update in database
-            await db.contents.update_one(
-                {"id": content.id},
-                {"$set": {"embedding": processed_content["embedding"]}}
+    # Embed in fixed-size batches: one API call and one bulk write per batch.
+    # The semaphore bounds the batches in flight (rate limits); scheduling also
+    # waits while too many batches are queued, which bounds how much of the
+    # cursor is held in memory.
+    semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+    tasks = []
+    pending = set()
+    
+    async def _process_batch(batch) -> int:
+        async with semaphore:
+            embeddings = await processor.embed_texts([text for _, text, _ in batch])
+            # Write the stored fields straight through, adding the packed embedding
+            docs = [
+                {
+                    **content_dict,
+                    "_id": content_dict["id"],
+                    "prep_hash": prep_hash,
+                    "embedding": pack_embedding(embedding),
+                    "embedding_dtype": "float16",
+                    "embedding_model": settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+                }
+                for (content_dict, _, prep_hash), embedding in zip(batch, embeddings)
+            ]
+            # Replace outdated embeddings in place: a failed embedding call or write
+            # leaves the previous vectors untouched
+            await db.contents_with_embeddings.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+                ordered=False
             )
-            
-            processed_count += 1
-            logger.info(f"Processed content: {content.title}")
-            
-        except Exception as e:
-            error_count += 1
-            logger.error(f"Error processing content: {e}")
+            return len(batch)
+    
+    async def _schedule(batch) -> None:
+        nonlocal pending
+        if len(pending) >= 2 * EMBEDDING_CONCURRENCY:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        task = asyncio.create_task(_process_batch(batch))
+        pending.add(task)
+        tasks.append((len(batch), task))
+    
+    # Stream content from the cursor; only (re-)embed items whose prepared text changed
+    batch = []
+    async for content_dict in db.contents.find({}).batch_size(CURSOR_BATCH_SIZE):
+        # Stored documents were written by this service; skip re-validation
+        text = processor._prepare_text_for_embedding(Content.model_construct(**content_dict))
+        prep_hash = embedding_text_hash(text)
+        if stored_hashes.get(content_dict.get("id")) == prep_hash:
+            continue
+        batch.append((content_dict, text, prep_hash))
+        if len(batch) == EMBEDDING_BATCH_SIZE:
+            await _schedule(batch)
+            batch = []
+    if batch:
+        await _schedule(batch)
+    
+    results = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+    
+    processed_count = 0
+    error_count = 0
+    for (batch_size, _), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            error_count += batch_size
+            logger.error(f"Error processing content batch: {result}")
+        else:
+            processed_count += result
             
     logger.info(f"Completed processing. Processed: {processed_count}, Errors: {error_count}")
     return processed_count, error_count
@@ -224,7 +287,7 @@ async def analyze_document(document_url: str) -> Dict[str, Any]:
     Returns:
         Extracted content and metadata
     """
-    processor = await get_document_processor()
+    processor = get_document_processor()
     
     # Extract content from document
     extracted_content = await processor.extract_content_from_document(document_url)
@@ -2,10 +2,10 @@
 import logging
 from typing import List, Dict, Any, Optional
 from openai import OpenAI, AzureOpenAI
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -18,8 +18,8 @@ class OpenAIAdapter:
     def __init__(self):
         """Initialize the OpenAI client with Azure configuration."""
         # Configure OpenAI with Azure details
-        api_key = settings.get_openai_key()
-        api_base = settings.get_openai_endpoint()
+        api_key = settings.openai_key
+        api_base = settings.openai_endpoint
         api_version = settings.AZURE_OPENAI_API_VERSION
 
         # Initialize the appropriate client based on the API type
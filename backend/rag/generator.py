@@ -1,67 +1,274 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Mapping, Optional, Dict, Any, Tuple
+import asyncio
 import logging
 from datetime import datetime
-import json
+from functools import lru_cache
+from types import MappingProxyType
+import orjson
+from pydantic import TypeAdapter
 from models.user import User
 from models.content import Content
 from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
 from rag.retriever import retrieve_relevant_content
-from config.settings import Settings
+from config.settings import get_settings
 from rag.openai_adapter import get_openai_adapter
+from rag._llm_cache import LLMCache, SemanticCache, plan_cache_path
+from rag._json_stream import ActivityStreamParser
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Static plan-generation instructions. Kept byte-identical across calls and sent
+# ahead of any student-specific text so the model provider can reuse the cached prefix.
+PLAN_SYSTEM_PROMPT = """You are an expert educational AI assistant tasked with creating personalized learning plans based on content in Azure AI Search.
+
+The user message gives a STUDENT PROFILE, the SUBJECT TO FOCUS ON, the LEARNING PERIOD DURATION in days, and the AVAILABLE LEARNING RESOURCES FROM AZURE AI SEARCH.
+Each resource is one JSON object per line with its id, title, type, difficulty, grade levels, duration_minutes, url and a shortened description.
+
+Based on the student profile and available resources, create a highly personalized learning plan that addresses the student's needs over the learning period.
+
+INSTRUCTIONS:
+1. Create a coherent learning journey starting with foundational concepts and progressing to more advanced material
+2. Include a descriptive title and comprehensive plan description
+3. Create a sequence of learning activities distributed across the days of the learning period
+4. Aim for 1-3 activities per day depending on their duration
+5. Total daily activities should take approximately 30-60 minutes to complete
+
+For each activity:
+1. Choose the most appropriate content from the available resources that matches:
+   - The student's grade level
+   - The student's learning style preference
+   - The appropriate difficulty level for the student
+   - Areas where the student needs improvement
+
+2. Each activity should:
+   - Be assigned to a specific day number (from 1 to the number of days in the learning period)
+   - Use the actual duration_minutes from the content (if available)
+   - Provide a clear description of what the student should do
+   - Explain WHY this activity helps address the student's learning needs
+   - Include the content URL for direct access
+   - Set activities in a logical progression of learning
+
+Return the learning plan as a JSON object in the following format:
+{
+    "title": "Learning Plan Title",
+    "description": "Comprehensive description of overall plan",
+    "subject": "<subject to focus on>",
+    "topics": ["topic1", "topic2"],
+    "activities": [
+        {
+            "title": "Activity Title",
+            "description": "Detailed activity description explaining what to do and how it helps the student's learning goals",
+            "content_id": "<ID of content resource>",
+            "duration_minutes": <minutes from content>,
+            "day": <day number>,
+            "order": <order number>,
+            "content_url": "<URL of the content>",
+            "learning_benefit": "Explanation of how this specific activity addresses the student's learning needs"
+        },
+        ...
+    ]
+}
+Return ONLY the JSON object without any additional text."""
+
+# Student-specific user message for plan generation; only these slots vary per call
+PLAN_USER_PROMPT = """STUDENT PROFILE:
+- Name: {student_name}
+- Grade Level: {grade_level}
+- Learning Style: {learning_style}
+- Subjects of Interest: {interests}
+- Areas for Improvement: {improvement_text}
+
+SUBJECT TO FOCUS ON: {subject}
+LEARNING PERIOD DURATION: {days} days
+
+AVAILABLE LEARNING RESOURCES FROM AZURE AI SEARCH:
+{resources_text}"""
+
+# Descriptions beyond this length add prompt tokens without helping activity selection
+RESOURCE_DESCRIPTION_CHARS = 200
+
+# Static learning-path instructions, sent first for the same prefix reuse
+PATH_SYSTEM_PROMPT = """You are an educational AI that creates personalized learning plans.
+
+The user message describes a student (grade level, learning style, subject of interest, other interests) and the available content.
+
+Create a structured 4-week learning plan with:
+1. Weekly goals
+2. Daily activities using the available content
+3. Specific skills the student will develop
+4. Assessment points to check understanding
+
+Format the response as a JSON object with weeks, days, activities, and skills properties."""
+
+# generate_plan returns the resources it was given under this key, as a
+# {str(content.id): Content} dict, so callers can resolve an activity's
+# content_id without scanning the list again. Pop it before persisting or
+# serializing the plan; the values are Content models, not JSON.
+CONTENT_BY_ID_KEY = "_content_by_id"
+
+# Output cap per day of plan; each day has 1-3 activities
+PLAN_MAX_TOKENS_PER_DAY = 800
+
+def plan_max_tokens(days: int) -> int:
+    """Output token cap for a plan of the given length, within the deployment's limit."""
+    return min(PLAN_MAX_TOKENS_PER_DAY * days, settings.PLAN_MAX_TOKENS)
+
+# Retrieved resources passed to the prompt, and the keyword/title overlap above
+# which a resource counts as a near-duplicate of one already chosen
+MAX_PROMPT_RESOURCES = 5
+DUPLICATE_SIMILARITY = 0.8
+
+def _content_terms(content: Content) -> set:
+    terms = {keyword.lower() for keyword in (getattr(content, "keywords", None) or [])}
+    terms.update((content.title or "").lower().split())
+    return terms
+
+def select_diverse_content(
+    contents: List[Content],
+    limit: int = MAX_PROMPT_RESOURCES,
+    threshold: float = DUPLICATE_SIMILARITY
+) -> List[Content]:
+    """Greedily keep the highest-ranked resources, skipping near-duplicates.
+    
+    The retriever does not return embeddings, so similarity is the Jaccard
+    overlap of each resource's keywords and title words.
+    """
+    selected = []
+    selected_terms = []
+    for content in contents:
+        terms = _content_terms(content)
+        if terms and any(
+            len(terms & kept) / len(terms | kept) > threshold for kept in selected_terms
+        ):
+            continue
+        selected.append(content)
+        selected_terms.append(terms)
+        if len(selected) >= limit:
+            break
+    return selected
+
+@lru_cache(maxsize=256)
+def _default_plan_template(subject: str) -> Mapping[str, Any]:
+    return MappingProxyType({
+        "title": f"Learning Plan for {subject}",
+        "description": f"A basic learning plan for {subject}",
+        "subject": subject
+    })
+
+@lru_cache(maxsize=256)
+def _default_path_template(subject: str) -> Mapping[str, Any]:
+    return MappingProxyType({
+        "title": f"Learning Path for {subject}",
+        "description": "An error occurred while generating the learning path."
+    })
+
+def default_plan(subject: str) -> Dict[str, Any]:
+    """Simple fallback plan used when generation fails.
+    
+    The text fields come from a cached per-subject template; callers get their
+    own dict and lists, so mutating the result never affects later fallbacks.
+    """
+    return {**_default_plan_template(subject), "topics": [subject], "activities": []}
+
+def default_learning_path(subject: str) -> Dict[str, Any]:
+    """Fallback learning path used when generation fails."""
+    return {**_default_path_template(subject), "weeks": []}
+
+# Student-specific user message for learning-path generation
+PATH_USER_PROMPT = """STUDENT:
+- Grade Level: {grade_level}
+- Learning Style: {learning_style}
+- Subject of Interest: {subject}
+- Other Interests: {other_interests}
+
+AVAILABLE CONTENT:
+{content_descriptions}"""
+
+# System messages are built once and shared by every request; treat them as read-only
+PLAN_SYSTEM_MESSAGE = {"role": "system", "content": PLAN_SYSTEM_PROMPT}
+PATH_SYSTEM_MESSAGE = {"role": "system", "content": PATH_SYSTEM_PROMPT}
+
+def _learning_style_text(student: User) -> str:
+    """Learning style value for prompts, falling back to mixed."""
+    try:
+        return student.learning_style.value if student.learning_style else "mixed"
+    except Exception as e:
+        logger.warning(f"Error processing learning style: {e}")
+        return "mixed"
+
 class LearningPlanGenerator:
-    def __init__(self):
-        # Will be initialized when needed
-        self.openai_client = None
+    def __init__(self, openai_client):
+        # Obtain instances through get_plan_generator, which supplies the shared adapter
+        self.openai_client = openai_client
+        self.response_cache = LLMCache(ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
+        self.plan_cache = SemanticCache(
+            threshold=settings.PLAN_CACHE_SIMILARITY,
+            ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+            path=plan_cache_path(settings.PLAN_CACHE_DIR, "generator")
+        )
         
-    async def generate_plan(
+    async def _create_chat_completion(
         self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Optional[Dict[str, str]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Call Azure OpenAI, reusing cached responses for identical requests when LLM_CACHE_ENABLED is set."""
+        model = settings.AZURE_OPENAI_DEPLOYMENT
+        # The toggle covers sampled requests too: a repeat of the same prompt within the TTL
+        # gets the earlier plan back instead of a fresh sample
+        use_cache = settings.LLM_CACHE_ENABLED
+        if use_cache:
+            key = LLMCache.make_key(model, messages, temperature, response_format, max_tokens)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = await self.openai_client.create_chat_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format
+        )
+        
+        if use_cache:
+            self.response_cache.set(key, response)
+        return response
+    
+    @staticmethod
+    def _build_plan_prompt(
         student: User,
         subject: str,
         relevant_content: List[Content],
-        days: int = 1  # Default to 1 day, can be expanded based on learning period
-    ) -> Dict[str, Any]:
-        """Generate a learning plan for a student based on relevant content."""
-        # Format content resources for the prompt with enhanced details
-        resources_text = ""
-        for i, content in enumerate(relevant_content):
-            # Extract important content details for matching
-            keywords = ", ".join(content.keywords) if hasattr(content, "keywords") and content.keywords else "Not specified"
-            grade_levels = ", ".join([str(g) for g in content.grade_level]) if hasattr(content, "grade_level") and content.grade_level else "Not specified"
-            duration = content.duration_minutes if hasattr(content, "duration_minutes") and content.duration_minutes else "Not specified"
-            
-            # Format each content resource with detailed information
-            resources_text += f"""
-            Content {i+1}:
-            - ID: {content.id}
-            - Title: {content.title}
-            - Type: {content.content_type}
-            - Difficulty: {content.difficulty_level}
-            - Subject: {content.subject}
-            - Grade Level(s): {grade_levels}
-            - Keywords: {keywords}
-            - Duration: {duration} minutes
-            - Description: {content.description}
-            - URL: {content.url}
-            """
-            
+        days: int
+    ) -> str:
+        """Build the student-specific user message for plan generation."""
+        # One compact JSON line per resource keeps the prompt's token count down
+        resources_text = "\n".join(
+            orjson.dumps({
+                "id": str(content.id),
+                "title": content.title,
+                "type": getattr(content.content_type, "value", content.content_type),
+                "difficulty": getattr(content.difficulty_level, "value", content.difficulty_level),
+                "grade": getattr(content, "grade_level", None) or None,
+                "duration_minutes": getattr(content, "duration_minutes", None),
+                "url": content.url,
+                "description": (content.description or "")[:RESOURCE_DESCRIPTION_CHARS]
+            }).decode()
+            for content in relevant_content
+        )
+        
         # Prepare input for the prompt
         student_name = student.full_name or student.username
         grade_level = str(student.grade_level) if student.grade_level else "Unknown"
         
-        # Handle learning style with fallback to Mixed
-        try:
-            learning_style = student.learning_style.value if student.learning_style else "mixed"
-        except Exception as e:
-            logger.warning(f"Error processing learning style for plan generation: {e}")
-            learning_style = "mixed"
-            
+        learning_style = _learning_style_text(student)
         interests = ", ".join(student.subjects_of_interest) if student.subjects_of_interest else "General learning"
         
         # Get areas for improvement if available in the student profile
@@ -71,156 +278,201 @@ class LearningPlanGenerator:
         
         improvement_text = ", ".join(areas_for_improvement) if areas_for_improvement else "Not specified"
         
-        # Construct the enhanced prompt for multi-day learning plan
-        prompt = f"""
-        You are an expert educational AI assistant tasked with creating personalized learning plans based on content in Azure AI Search.
+        return PLAN_USER_PROMPT.format(
+            student_name=student_name,
+            grade_level=grade_level,
+            learning_style=learning_style,
+            interests=interests,
+            improvement_text=improvement_text,
+            subject=subject,
+            days=days,
+            resources_text=resources_text
+        )
+    
+    @staticmethod
+    def _resolve_content(
+        activity: Dict[str, Any],
+        content_by_id: Dict[str, Content]
+    ) -> Optional[Content]:
+        """Return the resource an activity refers to, clearing references to unknown content."""
+        content_id = activity.get("content_id")
+        if not content_id:
+            return None
+        matched_content = content_by_id.get(content_id) if isinstance(content_id, str) else None
+        if matched_content is None:
+            activity["content_id"] = None
+            activity["content_url"] = None
+        return matched_content
+    
+    @staticmethod
+    def _finalize_activity(
+        activity: Dict[str, Any],
+        subject: str,
+        content_by_id: Dict[str, Content],
+        generated_at: str
+    ) -> Dict[str, Any]:
+        """Validate a generated activity against the resources and fill in defaults."""
+        matched_content = LearningPlanGenerator._resolve_content(activity, content_by_id)
+        if matched_content is not None:
+            # Ensure content_url is set correctly
+            if not activity.get("content_url"):
+                activity["content_url"] = matched_content.url
+        
+            # Use content duration if activity doesn't specify one
+            if activity.get("duration_minutes") is None:
+                activity["duration_minutes"] = getattr(matched_content, "duration_minutes", None)
         
-        STUDENT PROFILE:
-        - Name: {student_name}
-        - Grade Level: {grade_level}
-        - Learning Style: {learning_style}
-        - Subjects of Interest: {interests}
-        - Areas for Improvement: {improvement_text}
+        # Set default status
+        activity["status"] = ActivityStatus.NOT_STARTED
         
-        SUBJECT TO FOCUS ON: {subject}
-        LEARNING PERIOD DURATION: {days} days
+        # Ensure duration_minutes has a reasonable default if not specified
+        if activity.get("duration_minutes") is None:
+            activity["duration_minutes"] = 20  # Default to 20 minutes
         
-        AVAILABLE LEARNING RESOURCES FROM AZURE AI SEARCH:
-        {resources_text}
+        # Add or enhance learning_benefit if not present
+        if not activity.get("learning_benefit"):
+            activity["learning_benefit"] = f"This activity helps build skills in {subject} and supports the student's learning journey."
         
-        Based on the student profile and available resources, create a highly personalized learning plan that addresses the student's needs over a period of {days} days.
+        # Add metadata field to store additional information if needed
+        if "metadata" not in activity:
+            content_info = None
+            content_type = None
+            if matched_content:
+                difficulty_level = getattr(matched_content, "difficulty_level", None)
+                content_type = getattr(matched_content, "content_type", None)
+                content_type = content_type.value if content_type else None
+                # Extract important content information to display in the UI
+                content_info = {
+                    "title": matched_content.title,
+                    "description": matched_content.description,
+                    "subject": matched_content.subject,
+                    "difficulty_level": difficulty_level.value if difficulty_level else None,
+                    "content_type": content_type,
+                    "grade_level": getattr(matched_content, "grade_level", None)
+                }
         
-        INSTRUCTIONS:
-        1. Create a coherent learning journey starting with foundational concepts and progressing to more advanced material
-        2. Include a descriptive title and comprehensive plan description
-        3. Create a sequence of learning activities distributed across {days} days
-        4. Aim for 1-3 activities per day depending on their duration
-        5. Total daily activities should take approximately 30-60 minutes to complete
+            activity["metadata"] = {
+                "generated_at": generated_at,
+                "content_type": content_type,
+                "content_info": content_info
+            }
         
-        For each activity:
-        1. Choose the most appropriate content from the available resources that matches:
-           - The student's grade level
-           - The student's learning style preference
-           - The appropriate difficulty level for the student
-           - Areas where the student needs improvement
+        return activity
+    
+    async def _plan_cache_key(
+        self,
+        student: User,
+        subject: str,
+        relevant_content: List[Content],
+        days: int
+    ) -> Tuple[Tuple, Optional[List[float]]]:
+        """Exact cache scope and profile embedding for the semantic plan cache.
         
-        2. Each activity should:
-           - Be assigned to a specific day number (from 1 to {days})
-           - Use the actual duration_minutes from the content (if available)
-           - Provide a clear description of what the student should do
-           - Explain WHY this activity helps address the student's learning needs
-           - Include the content URL for direct access
-           - Set activities in a logical progression of learning
+        The embedding is None if it could not be computed; the cache is then skipped.
+        """
+        scope = (subject, days, frozenset(str(content.id) for content in relevant_content))
+        profile_text = (
+            f"{student.grade_level}|{_learning_style_text(student)}|"
+            f"{','.join(student.subjects_of_interest or [])}|"
+            f"{','.join(getattr(student, 'areas_for_improvement', None) or [])}"
+        )
+        try:
+            embedding = await self.openai_client.create_embedding(
+                model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                text=profile_text
+            )
+        except Exception as e:
+            logger.warning(f"Skipping plan cache, could not embed student profile: {e}")
+            embedding = None
+        return scope, embedding
+    
+    async def generate_plan(
+        self,
+        student: User,
+        subject: str,
+        relevant_content: List[Content],
+        days: int = 1  # Default to 1 day, can be expanded based on learning period
+    ) -> Dict[str, Any]:
+        """Generate a learning plan for a student based on relevant content.
         
-        Return the learning plan in the following JSON format:
-        ```json
-        {{
-            "title": "Learning Plan Title",
-            "description": "Comprehensive description of overall plan",
-            "subject": "{subject}",
-            "topics": ["topic1", "topic2"],
-            "activities": [
-                {{
-                    "title": "Activity Title",
-                    "description": "Detailed activity description explaining what to do and how it helps the student's learning goals",
-                    "content_id": "<ID of content resource>",
-                    "duration_minutes": <minutes from content>,
-                    "day": <day number>,
-                    "order": <order number>,
-                    "content_url": "<URL of the content>",
-                    "learning_benefit": "Explanation of how this specific activity addresses the student's learning needs"
-                }},
-                ...
-            ]
-        }}
-        ```
-        Return ONLY the JSON response without any additional text.
+        The returned plan carries a CONTENT_BY_ID_KEY index of relevant_content.
         """
+        # Index resources once so each activity is matched with a dict lookup
+        content_by_id = {str(content.id): content for content in relevant_content}
+        
+        cache_scope = cache_embedding = None
+        if settings.PLAN_CACHE_ENABLED:
+            cache_scope, cache_embedding = await self._plan_cache_key(student, subject, relevant_content, days)
+            if cache_embedding is not None:
+                cached_plan = self.plan_cache.get(cache_scope, cache_embedding)
+                if cached_plan is not None:
+                    cached_plan[CONTENT_BY_ID_KEY] = content_by_id
+                    return cached_plan
+        
+        prompt = self._build_plan_prompt(student, subject, relevant_content, days)
         
         # Generate learning plan using Azure OpenAI
         try:
-            # Initialize client if needed
-            if not self.openai_client:
-                self.openai_client = await get_openai_adapter()
-                
-            response = await self.openai_client.create_chat_completion(
-                model=settings.AZURE_OPENAI_DEPLOYMENT,  # Using AZURE_OPENAI_DEPLOYMENT instead of OPENAI_DEPLOYMENT_NAME
+            response = await self._create_chat_completion(
                 messages=[
-                    {"role": "system", "content": "You are an AI educational assistant that creates personalized learning plans."},
+                    PLAN_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                max_tokens=plan_max_tokens(days)
             )
             
             response_content = response["choices"][0]["message"]["content"]
             # Parse the JSON response
-            plan_dict = json.loads(response_content)
+            plan_dict = orjson.loads(response_content)
+            
+            generated_at = datetime.utcnow().isoformat()
             
             # Format activities with proper IDs, status, and enhanced fields
             for activity in plan_dict.get("activities", []):
-                # Handle content_id validation
-                if "content_id" in activity and activity["content_id"]:
-                    try:
-                        # Check if the content ID exists in our resources
-                        matched_content = next((content for content in relevant_content if str(content.id) == activity["content_id"]), None)
-                        if not matched_content:
-                            activity["content_id"] = None
-                            activity["content_url"] = None
-                        else:
-                            # Ensure content_url is set correctly
-                            if "content_url" not in activity or not activity["content_url"]:
-                                activity["content_url"] = matched_content.url
-                            
-                            # Use content duration if activity doesn't specify one
-                            if ("duration_minutes" not in activity or activity["duration_minutes"] is None) and hasattr(matched_content, "duration_minutes"):
-                                activity["duration_minutes"] = matched_content.duration_minutes
-                    except:
-                        activity["content_id"] = None
-                        
-                # Set default status
-                activity["status"] = ActivityStatus.NOT_STARTED
-                
-                # Ensure duration_minutes has a reasonable default if not specified
-                if "duration_minutes" not in activity or activity["duration_minutes"] is None:
-                    activity["duration_minutes"] = 20  # Default to 20 minutes
-                
-                # Add or enhance learning_benefit if not present
-                if "learning_benefit" not in activity or not activity["learning_benefit"]:
-                    activity["learning_benefit"] = f"This activity helps build skills in {subject} and supports the student's learning journey."
-                
-                # Add metadata field to store additional information if needed
-                if "metadata" not in activity:
-                    content_info = None
-                    if matched_content:
-                        # Extract important content information to display in the UI
-                        content_info = {
-                            "title": matched_content.title,
-                            "description": matched_content.description,
-                            "subject": matched_content.subject,
-                            "difficulty_level": matched_content.difficulty_level.value if hasattr(matched_content, "difficulty_level") else None,
-                            "content_type": matched_content.content_type.value if hasattr(matched_content, "content_type") else None,
-                            "grade_level": matched_content.grade_level if hasattr(matched_content, "grade_level") else None
-                        }
-                    
-                    activity["metadata"] = {
-                        "generated_at": datetime.utcnow().isoformat(),
-                        "content_type": matched_content.content_type.value if matched_content else None,
-                        "content_info": content_info
-                    }
-                
-            return plan_dict
+                self._finalize_activity(activity, subject, content_by_id, generated_at)
+            
+            if cache_embedding is not None:
+                self.plan_cache.put(cache_scope, cache_embedding, plan_dict)
             
         except Exception as e:
             logger.error(f"Failed to generate learning plan: {e}")
             # Return a simple default plan
-            return {
-                "title": f"Learning Plan for {subject}",
-                "description": f"A basic learning plan for {subject}",
-                "subject": subject,
-                "topics": [subject],
-                "activities": []
-            }
+            plan_dict = default_plan(subject)
+        
+        plan_dict[CONTENT_BY_ID_KEY] = content_by_id
+        return plan_dict
+    
+    async def stream_plan_activities(
+        self,
+        student: User,
+        subject: str,
+        relevant_content: List[Content],
+        days: int = 1
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a learning plan, yielding each activity as soon as it is generated.
+        
+        Activities are post-processed exactly as in generate_plan. Responses are
+        not cached, and errors propagate to the caller.
+        """
+        prompt = self._build_plan_prompt(student, subject, relevant_content, days)
+        content_by_id = {str(content.id): content for content in relevant_content}
+        generated_at = datetime.utcnow().isoformat()
+        parser = ActivityStreamParser()
+        
+        async for delta in self.openai_client.stream_chat_completion(
+            model=settings.AZURE_OPENAI_DEPLOYMENT,
+            messages=[
+                PLAN_SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            response_format={"type": "json_object"},
+            max_tokens=plan_max_tokens(days)
+        ):
+            for activity in parser.feed(delta):
+                yield self._finalize_activity(activity, subject, content_by_id, generated_at)
     
     async def generate_personalized_learning_path(
         self,
@@ -235,66 +487,44 @@ class LearningPlanGenerator:
             for item in recommended_content[:10]
         ])
         
-        # Handle learning style with fallback
-        try:
-            learning_style_text = user_profile.learning_style.value if user_profile.learning_style else "mixed"
-        except Exception as e:
-            logger.warning(f"Error processing learning style for path generation: {e}")
-            learning_style_text = "mixed"
-            
-        # Generate learning path using Azure OpenAI
-        prompt = f"""
-        Create a personalized learning path for a grade {user_profile.grade_level} student 
-        with {learning_style_text} learning style who is interested in {subject}.
-        
-        The student's other interests include: {', '.join(user_profile.subjects_of_interest) if user_profile.subjects_of_interest else 'general learning'}
-        
-        Available content:
-        {content_descriptions}
-        
-        Create a structured 4-week learning plan with:
-        1. Weekly goals
-        2. Daily activities using the available content
-        3. Specific skills the student will develop
-        4. Assessment points to check understanding
-        
-        Format the response as a JSON object with weeks, days, activities, and skills properties.
-        """
+        learning_style_text = _learning_style_text(user_profile)
+        other_interests = ', '.join(user_profile.subjects_of_interest) if user_profile.subjects_of_interest else 'general learning'
+        prompt = PATH_USER_PROMPT.format(
+            grade_level=user_profile.grade_level,
+            learning_style=learning_style_text,
+            subject=subject,
+            other_interests=other_interests,
+            content_descriptions=content_descriptions
+        )
         
         try:
-            # Initialize client if needed
-            if not self.openai_client:
-                self.openai_client = await get_openai_adapter()
-                
-            response = await self.openai_client.create_chat_completion(
-                model=settings.AZURE_OPENAI_DEPLOYMENT,  # Using AZURE_OPENAI_DEPLOYMENT instead of OPENAI_DEPLOYMENT_NAME
+            response = await self._create_chat_completion(
                 messages=[
-                    {"role": "system", "content": "You are an educational AI that creates personalized learning plans."},
+                    PATH_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.7
             )
             
-            learning_path = json.loads(response["choices"][0]["message"]["content"])
+            learning_path = orjson.loads(response["choices"][0]["message"]["content"])
             return learning_path
             
         except Exception as e:
             logger.error(f"Failed to generate learning path: {e}")
-            return {
-                "title": f"Learning Path for {subject}",
-                "description": f"An error occurred while generating the learning path.",
-                "weeks": []
-            }
+            return default_learning_path(subject)
 
 # Singleton instance
 plan_generator = None
+_plan_generator_lock = asyncio.Lock()
 
 async def get_plan_generator():
     """Get or create the plan generator singleton."""
     global plan_generator
     if plan_generator is None:
-        plan_generator = LearningPlanGenerator()
+        async with _plan_generator_lock:
+            if plan_generator is None:
+                plan_generator = LearningPlanGenerator(await get_openai_adapter())
     return plan_generator
 
 async def generate_learning_plan(
@@ -302,15 +532,17 @@ async def generate_learning_plan(
     subject: str
 ) -> LearningPlan:
     """Generate a learning plan for a student."""
-    # Retrieve relevant content
-    relevant_content = await retrieve_relevant_content(
-        student_profile=student,
-        subject=subject,
-        k=10  # Get more content to have a variety of options
+    # Retrieve relevant content while the plan generator is fetched (created on first use)
+    relevant_content, generator = await asyncio.gather(
+        retrieve_relevant_content(
+            student_profile=student,
+            subject=subject,
+            k=10  # Get more content to have a variety of options
+        ),
+        get_plan_generator()
     )
-    
-    # Get plan generator
-    generator = await get_plan_generator()
+    # Keep a few distinct resources so the prompt does not repeat near-duplicates
+    relevant_content = select_diverse_content(relevant_content)
     
     # Generate plan
     plan_dict = await generator.generate_plan(
@@ -319,16 +551,20 @@ async def generate_learning_plan(
         relevant_content=relevant_content
     )
     
-    # Create learning plan object
-    learning_plan = LearningPlan(
+    return _to_learning_plan(student, plan_dict)
+
+# Validates a whole list of generated activities in one call
+_ACTIVITY_LIST = TypeAdapter(List[LearningActivity])
+
+def _to_learning_plan(student: User, plan_dict: Dict[str, Any]) -> LearningPlan:
+    """Build a LearningPlan object from a generated plan dictionary."""
+    return LearningPlan(
         student_id=student.id,
         title=plan_dict["title"],
         description=plan_dict["description"],
         subject=plan_dict["subject"],
         topics=plan_dict["topics"],
-        activities=[LearningActivity(**activity) for activity in plan_dict["activities"]],
+        activities=_ACTIVITY_LIST.validate_python(plan_dict["activities"]),
         status=ActivityStatus.NOT_STARTED,
         progress_percentage=0.0
     )
-    
-    return learning_plan
\ No newline at end of file
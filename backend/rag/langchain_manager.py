@@ -5,8 +5,13 @@ This module provides a simplified interface to LangChain components
 with Azure OpenAI integration and handles all vector operations.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any, Optional, Union
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional
 import os
 import sys
 
@@ -16,24 +21,155 @@ backend_dir = os.path.dirname(current_dir)
 project_root = os.path.dirname(backend_dir)
 sys.path.insert(0, project_root)  # Add project root to path
 
+import numpy as np
+import orjson
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langchain_community.vectorstores import AzureSearch
-from langchain.chains import ConversationalRetrievalChain, LLMChain
+from langchain_community.vectorstores.azuresearch import FIELDS_CONTENT, FIELDS_CONTENT_VECTOR, FIELDS_METADATA
+from langchain.chains import ConversationalRetrievalChain
 from langchain.memory import ConversationBufferMemory
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.documents import Document
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from azure.search.documents.models import VectorizedQuery
 
-from backend.config.settings import Settings
+from backend.config.settings import get_settings
+from backend.rag.openai_adapter import get_http_client
+from backend.rag._llm_cache import SemanticCache, plan_cache_path
+from backend.rag._json_stream import ActivityStreamParser
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Number of query embeddings kept in the per-manager LRU cache
+EMBEDDING_CACHE_SIZE = 4096
+# Cached embeddings are stored at half precision (3 KB per 1536-d vector); the rounding
+# is far below what changes a similarity ranking
+EMBEDDING_CACHE_DTYPE = np.float16
+
+# Number of RAG answers kept for reuse by similar questions
+RAG_CACHE_SIZE = 256
+# All standalone questions share one cache scope
+RAG_CACHE_SCOPE = "rag"
+
+# Conversation turns passed to the RAG chain; each turn is a question and its answer
+RAG_HISTORY_TURNS = 8
+
+# Azure AI Search accepts at most 1000 documents and 16 MB per indexing request;
+# batches stay below both, leaving headroom for request overhead
+UPLOAD_BATCH_DOCS = 1000
+UPLOAD_BATCH_BYTES = 14 * 1024 * 1024
+# Approximate JSON size of one 1536-dimension embedding
+EMBEDDING_JSON_BYTES = 1536 * 20
+# Concurrent upload requests, to stay clear of throttling
+UPLOAD_CONCURRENCY = 8
+
+def _upload_batches(documents: List[Document]) -> List[List[Document]]:
+    """Split documents into batches that fit a single Azure AI Search indexing request."""
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for doc in documents:
+        doc_bytes = len(doc.page_content.encode()) + len(repr(doc.metadata)) + EMBEDDING_JSON_BYTES
+        if batch and (len(batch) >= UPLOAD_BATCH_DOCS or batch_bytes + doc_bytes > UPLOAD_BATCH_BYTES):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(doc)
+        batch_bytes += doc_bytes
+    if batch:
+        batches.append(batch)
+    return batches
+
+# Index field holding content embeddings (the vector store's vector_field_name)
+VECTOR_FIELD = "embedding"
+
+# Prompt pieces for generate_personalized_learning_plan; only the slots vary per call
+_RESOURCE_TEMPLATE = """Content {number}:
+- ID: {id}
+- Title: {title}
+- Type: {content_type}
+- Difficulty: {difficulty}
+- Description: {description}
+"""
+
+_PLAN_PROMPT_TEMPLATE = """Create a personalized learning plan for the following student:
+
+Student Profile:
+- Name: {name}
+- Grade Level: {grade_level}
+- Learning Style: {learning_style}
+- Interests: {interests}
+
+The learning plan should focus on: {subject}
+
+Available resources:
+{resources_text}
+
+The learning plan should include:
+1. A title
+2. A brief description
+3. 4-5 learning activities that use the available resources
+4. Each activity should include a title, description, duration, and reference to a resource ID if applicable
+
+Format the response as JSON with the following structure:
+{{
+    "title": "Learning Plan Title",
+    "description": "Brief description of the plan",
+    "subject": "{subject}",
+    "activities": [
+        {{
+            "title": "Activity Title",
+            "description": "Activity description",
+            "content_id": "reference to resource ID or null",
+            "duration_minutes": time in minutes,
+            "order": order number
+        }}
+    ]
+}}
+"""
+
+# Shared by every plan request; treat as read-only
+_PLAN_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert educational assistant that creates personalized learning plans."
+}
+
+def _embedding_cache_key(text: str) -> bytes:
+    """Cache key for a query embedding; includes the model so a redeploy can't serve stale vectors."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT}|{settings.AZURE_OPENAI_API_VERSION}|".encode())
+    digest.update(text.encode())
+    return digest.digest()
+
+@lru_cache(maxsize=8)
+def _get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """Return a shared splitter for the given chunking configuration."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+class _VectorStoreEmbeddings(Embeddings):
+    """Embeddings handed to the vector store.
+    
+    Being an ``Embeddings`` object (not a bare function) makes AzureSearch embed
+    added texts with one batched ``embed_documents`` call instead of one request
+    per text; query embeddings go through the manager's cache.
+    """
+    
+    def __init__(self, manager: "LangChainManager"):
+        self._manager = manager
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._manager.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self._manager._embed_query_cached(text)
+
 class LangChainManager:
     """
     Manager for LangChain components using Azure OpenAI.
@@ -43,14 +179,53 @@ class LangChainManager:
     def __init__(self):
         """Initialize the LangChain manager with configured settings."""
         self.llm = None
+        self.plan_llm = None
         self.embeddings = None
         self.vector_store = None
         self.retriever = None
         self.conversation_chain = None
         self.conversation_memory = None
+        self._initialized = False
+        # The initialization in progress, shared by every caller that arrives while it runs
+        self._init_task: Optional[asyncio.Task] = None
+        # Query embeddings by text digest as EMBEDDING_CACHE_DTYPE arrays, most recently used last
+        self._embed_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # In-flight embedding requests, so concurrent identical queries share one call
+        self._embed_pending: Dict[bytes, asyncio.Task] = {}
+        self.plan_cache = SemanticCache(
+            threshold=settings.PLAN_CACHE_SIMILARITY,
+            ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+            path=plan_cache_path(settings.PLAN_CACHE_DIR, "langchain")
+        )
+        self.rag_cache = SemanticCache(
+            threshold=settings.RAG_CACHE_SIMILARITY,
+            ttl_seconds=settings.RAG_CACHE_TTL_SECONDS,
+            max_entries=RAG_CACHE_SIZE
+        )
+    
+    async def initialize(self):
+        """Initialize LangChain components once; later calls return immediately.
+        
+        Concurrent callers share one attempt; if it fails, the next call tries again.
+        """
+        if self._initialized:
+            return
+        if self._init_task is None:
+            self._init_task = asyncio.ensure_future(self._initialize_components())
+        await asyncio.shield(self._init_task)
+    
+    async def _initialize_components(self):
+        try:
+            # Client construction probes the search index and embedding endpoint over HTTP
+            await asyncio.to_thread(self._build_components)
+            if settings.EMBEDDING_CACHE_FILE:
+                await asyncio.to_thread(self._load_embedding_cache, settings.EMBEDDING_CACHE_FILE)
+            self._initialized = True
+        finally:
+            self._init_task = None
     
-    def initialize(self):
-        """Initialize LangChain components."""
+    def _build_components(self):
+        """Construct the LangChain components (blocking)."""
         try:
             # Initialize Azure OpenAI LLM
             self.llm = AzureChatOpenAI(
@@ -62,12 +237,19 @@ class LangChainManager:
                 streaming=True
             )
             
+            # Plan generation uses JSON mode, bounded by the same ceiling as LearningPlanGenerator
+            self.plan_llm = self.llm.bind(
+                response_format={"type": "json_object"},
+                max_tokens=settings.PLAN_MAX_TOKENS
+            )
+            
             # Initialize Azure OpenAI Embeddings
             self.embeddings = AzureOpenAIEmbeddings(
                 openai_api_version=settings.AZURE_OPENAI_API_VERSION,
                 azure_deployment=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
                 azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
                 api_key=settings.AZURE_OPENAI_KEY,
+                http_client=get_http_client(),
             )
             
             # Initialize conversation memory
@@ -82,7 +264,7 @@ class LangChainManager:
                     azure_search_endpoint=settings.AZURE_SEARCH_ENDPOINT,
                     azure_search_key=settings.AZURE_SEARCH_KEY,
                     index_name=settings.AZURE_SEARCH_INDEX_NAME,
-                    embedding_function=self.embeddings.embed_query,
+                    embedding_function=_VectorStoreEmbeddings(self),
                     vector_field_name="embedding",  # Explicitly set vector field name
                     text_field_name="page_content",  # Use page_content instead of "content"
                     fields_mapping={
@@ -128,7 +310,7 @@ class LangChainManager:
             Generated text
         """
         if not self.llm:
-            self.initialize()
+            await self.initialize()
             
         try:
             # Setup chat messages
@@ -156,17 +338,84 @@ class LangChainManager:
             List of embedding values
         """
         if not self.embeddings:
-            self.initialize()
-            
+            await self.initialize()
+        
+        key = _embedding_cache_key(text)
+        cached = self._cached_embedding(key)
+        if cached is not None:
+            return cached
+        
+        # Concurrent calls for the same text share one request
+        pending = self._embed_pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_embedding(key, text))
+            self._embed_pending[key] = pending
+        return await asyncio.shield(pending)
+    
+    async def _fetch_embedding(self, key: bytes, text: str) -> List[float]:
         try:
             # Generate embedding
             embedding = await self.embeddings.aembed_query(text)
+            self._store_embedding(key, embedding)
             return embedding
             
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             # Return an empty embedding of the correct dimension
             return [0.0] * 1536  # Default dimension for text-embedding-ada-002
+        
+        finally:
+            del self._embed_pending[key]
+    
+    def _cached_embedding(self, key: bytes) -> Optional[List[float]]:
+        embedding = self._embed_cache.get(key)
+        if embedding is None:
+            return None
+        self._embed_cache.move_to_end(key)
+        return embedding.tolist()
+    
+    def _store_embedding(self, key: bytes, embedding: List[float]) -> None:
+        self._embed_cache[key] = np.asarray(embedding, dtype=EMBEDDING_CACHE_DTYPE)
+        if len(self._embed_cache) > EMBEDDING_CACHE_SIZE:
+            self._embed_cache.popitem(last=False)
+    
+    def _load_embedding_cache(self, path: str) -> None:
+        """Warm the query embedding cache from a file written by save_embedding_cache (blocking)."""
+        if not os.path.exists(path):
+            return
+        try:
+            with np.load(path) as saved:
+                keys, vectors = saved["keys"], saved["vectors"].astype(EMBEDDING_CACHE_DTYPE)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding cache {path}: {e}")
+            return
+        # Saved least recently used first, so the LRU order carries over
+        for key, vector in zip(keys[-EMBEDDING_CACHE_SIZE:], vectors[-EMBEDDING_CACHE_SIZE:]):
+            self._embed_cache[key.tobytes()] = vector
+        logger.info(f"Loaded {len(self._embed_cache)} cached query embeddings from {path}")
+    
+    def save_embedding_cache(self, path: Optional[str] = None) -> None:
+        """Write the query embedding cache to disk so the next process starts warm (blocking)."""
+        path = path or settings.EMBEDDING_CACHE_FILE
+        if not path or not self._embed_cache:
+            return
+        # Keys already include the deployment, so vectors from another model are never matched
+        keys = np.frombuffer(b"".join(self._embed_cache.keys()), dtype=np.uint8).reshape(-1, 16)
+        vectors = np.stack(list(self._embed_cache.values()))
+        # Written beside the target and renamed, so a crash never leaves a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=keys, vectors=vectors)
+        os.replace(tmp_path, path)
+    
+    def _embed_query_cached(self, text: str) -> List[float]:
+        """Synchronous embedding function for the vector store, sharing the query cache."""
+        key = _embedding_cache_key(text)
+        embedding = self._cached_embedding(key)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            self._store_embedding(key, embedding)
+        return embedding
     
     async def generate_rag_response(
         self,
@@ -184,7 +433,7 @@ class LangChainManager:
             Dictionary with response and source documents
         """
         if not self.conversation_chain:
-            self.initialize()
+            await self.initialize()
             if not self.conversation_chain:
                 # Fall back to regular completion if RAG is not available
                 response = await self.generate_completion(query)
@@ -193,18 +442,29 @@ class LangChainManager:
                     "source_documents": []
                 }
                 
+        # Reuse the answer to a near-identical standalone question; follow-ups depend on the history
+        cache_embedding = None
+        if settings.RAG_CACHE_ENABLED and not chat_history:
+            cache_embedding = await self.generate_embedding(query)
+            if not any(cache_embedding):
+                cache_embedding = None
+            else:
+                cached_response = self.rag_cache.get(RAG_CACHE_SCOPE, cache_embedding)
+                if cached_response is not None:
+                    return cached_response
+                
         try:
-            # Format chat history if provided
-            formatted_history = []
-            if chat_history:
-                for message in chat_history:
-                    if message.get("role") == "user":
-                        formatted_history.append((message.get("content", ""), ""))
-                    elif message.get("role") == "assistant":
-                        if formatted_history:
-                            formatted_history[-1] = (formatted_history[-1][0], message.get("content", ""))
-                        else:
-                            formatted_history.append(("", message.get("content", "")))
+            # Format the recent chat history as (question, answer) turns; older turns are dropped
+            turns = deque(maxlen=RAG_HISTORY_TURNS)
+            for message in (chat_history or [])[-2 * RAG_HISTORY_TURNS:]:
+                if message.get("role") == "user":
+                    turns.append([message.get("content", ""), ""])
+                elif message.get("role") == "assistant":
+                    if turns:
+                        turns[-1][1] = message.get("content", "")
+                    else:
+                        turns.append(["", message.get("content", "")])
+            formatted_history = [tuple(turn) for turn in turns]
             
             # Generate RAG response
             response = await self.conversation_chain.ainvoke({
@@ -215,10 +475,13 @@ class LangChainManager:
             # Extract source documents
             source_documents = response.get("source_documents", [])
             
-            return {
+            result = {
                 "answer": response.get("answer", ""),
                 "source_documents": source_documents
             }
+            if cache_embedding is not None:
+                self.rag_cache.put(RAG_CACHE_SCOPE, cache_embedding, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error generating RAG response: {e}")
@@ -229,6 +492,10 @@ class LangChainManager:
                 "source_documents": []
             }
     
+    def clear_rag_cache(self) -> None:
+        """Forget cached RAG answers, e.g. after the indexed content changes."""
+        self.rag_cache.clear()
+    
     async def add_documents(self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> bool:
         """
         Add documents to the vector store.
@@ -241,7 +508,7 @@ class LangChainManager:
             Success status
         """
         if not self.vector_store:
-            self.initialize()
+            await self.initialize()
             if not self.vector_store:
                 logger.error("Vector store not initialized")
                 return False
@@ -259,19 +526,36 @@ class LangChainManager:
                 doc = Document(page_content=text, metadata=metadata)
                 documents.append(doc)
             
-            # Add documents to vector store with the correct field mapping
-            # Explicitly specify the text_field to ensure we're using the right field name
-            self.vector_store.add_documents(
-                documents,
-                vector_field_name="embedding",
-                text_field_name="page_content"  # Make sure this matches your Azure Search schema
-            )
-            return True
+            return await self._upload_documents(documents)
             
         except Exception as e:
             logger.error(f"Error adding documents to vector store: {e}")
             return False
     
+    async def _upload_documents(self, documents: List[Document]) -> bool:
+        """Embed and upload documents in size-bounded batches, several at a time."""
+        batches = _upload_batches(documents)
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+        
+        async def upload(batch: List[Document]) -> None:
+            async with semaphore:
+                # Add documents to vector store with the correct field mapping; the store
+                # embeds and uploads synchronously, so each batch runs in a worker thread
+                # Explicitly specify the text_field to ensure we're using the right field name
+                await asyncio.to_thread(
+                    self.vector_store.add_documents,
+                    batch,
+                    vector_field_name="embedding",
+                    text_field_name="page_content"  # Make sure this matches your Azure Search schema
+                )
+        
+        results = await asyncio.gather(*(upload(batch) for batch in batches), return_exceptions=True)
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            logger.error(f"{len(failures)} of {len(batches)} document batches failed to upload: {failures[0]}")
+            return False
+        return True
+    
     async def search_documents(self, query: str, filter: Optional[str] = None, k: int = 5) -> List[Document]:
         """
         Search for documents using a query string.
@@ -285,24 +569,70 @@ class LangChainManager:
             List of matching documents
         """
         if not self.vector_store:
-            self.initialize()
+            await self.initialize()
             if not self.vector_store:
                 logger.error("Vector store not initialized")
                 return []
             
+        # Nothing to match on
+        if not query and not filter:
+            return []
+            
         try:
-            # Search for documents
-            search_kwargs = {"k": k}
-            if filter:
-                search_kwargs["filter"] = filter
-                
-            documents = self.vector_store.similarity_search(query, **search_kwargs)
-            return documents
+            # Filter-only searches need no query embedding
+            if not query:
+                return await asyncio.to_thread(self._search_by_filter, filter, k)
+            
+            embedding = await self.generate_embedding(query)
+            if not any(embedding):
+                # The embedding request failed; a zero vector would rank arbitrarily
+                return []
+            
+            return await asyncio.to_thread(self._search_by_vector, embedding, filter, k)
             
         except Exception as e:
             logger.error(f"Error searching documents: {e}")
             return []
     
+    def _search_by_vector(self, embedding: List[float], filter: Optional[str], k: int) -> List[Document]:
+        """Return the k nearest documents to an embedding, filtered in the same request (blocking).
+        
+        Queried directly rather than through AzureSearch.similarity_search, which
+        always targets its default vector field and offers no per-query tuning.
+        """
+        results = self.vector_store.client.search(
+            search_text=None,
+            vector_queries=[VectorizedQuery(vector=embedding, k_nearest_neighbors=k, fields=VECTOR_FIELD)],
+            filter=filter,
+            top=k
+        )
+        return [self._to_document(result) for result in results]
+    
+    def _search_by_filter(self, filter: str, k: int) -> List[Document]:
+        """Return documents matching a filter expression, without vector ranking (blocking)."""
+        results = self.vector_store.client.search(search_text="*", filter=filter, top=k)
+        return [self._to_document(result) for result in results]
+    
+    @staticmethod
+    def _to_document(result: Dict[str, Any]) -> Document:
+        """Build a Document from a search result, mapped as AzureSearch maps its own results."""
+        page_content = result.pop(FIELDS_CONTENT, "")
+        if FIELDS_METADATA in result:
+            metadata = json.loads(result[FIELDS_METADATA])
+        else:
+            metadata = {
+                key: value for key, value in result.items()
+                if key not in (FIELDS_CONTENT_VECTOR, VECTOR_FIELD)
+            }
+        return Document(page_content=page_content, metadata=metadata)
+    
+    @staticmethod
+    def _load_and_split(document_path: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+        """Read a UTF-8 text document and split it into chunks (blocking)."""
+        with open(document_path, encoding="utf-8") as f:
+            document = Document(page_content=f.read(), metadata={"source": document_path})
+        return _get_text_splitter(chunk_size, chunk_overlap).split_documents([document])
+    
     async def process_document(self, document_path: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> bool:
         """
         Process a document and add it to the vector store.
@@ -316,35 +646,84 @@ class LangChainManager:
             Success status
         """
         if not self.vector_store:
-            self.initialize()
+            await self.initialize()
             if not self.vector_store:
                 logger.error("Vector store not initialized")
                 return False
             
         try:
-            from langchain_community.document_loaders import TextLoader
-            
-            # Load document
-            loader = TextLoader(document_path)
-            documents = loader.load()
-            
-            # Split text
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
-            )
-            
-            chunks = text_splitter.split_documents(documents)
+            # Read and split off the event loop; both block
+            chunks = await asyncio.to_thread(self._load_and_split, document_path, chunk_size, chunk_overlap)
             
-            # Add to vector store
-            self.vector_store.add_documents(documents=chunks)
-            
-            return True
+            # Add to vector store in concurrent batches rather than one long blocking call
+            return await self._upload_documents(chunks)
             
         except Exception as e:
             logger.error(f"Error processing document: {e}")
             return False
     
+    @staticmethod
+    def _learning_plan_messages(
+        student_profile: Dict[str, Any],
+        subject: str,
+        available_content: List[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for learning plan generation."""
+        # Format content resources for the prompt
+        resources_text = "\n".join(
+            _RESOURCE_TEMPLATE.format(
+                number=i,
+                id=content.get('id', 'unknown'),
+                title=content.get('title', 'Untitled'),
+                content_type=content.get('content_type', 'unknown'),
+                difficulty=content.get('difficulty_level', 'unknown'),
+                description=content.get('description', 'No description')
+            )
+            for i, content in enumerate(available_content, start=1)
+        )
+        
+        # Construct the prompt
+        prompt_template = _PLAN_PROMPT_TEMPLATE.format(
+            name=student_profile.get('full_name', student_profile.get('username', 'Student')),
+            grade_level=student_profile.get('grade_level', 'Unknown'),
+            learning_style=student_profile.get('learning_style', 'Mixed'),
+            interests=', '.join(student_profile.get('subjects_of_interest', [])),
+            subject=subject,
+            resources_text=resources_text
+        )
+        
+        return [_PLAN_SYSTEM_MESSAGE, {"role": "user", "content": prompt_template}]
+    
+    async def stream_personalized_learning_plan(
+        self,
+        student_profile: Dict[str, Any],
+        subject: str,
+        available_content: List[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a personalized learning plan, yielding each activity once the model
+        has finished generating it.
+        
+        Args:
+            student_profile: Student information
+            subject: Subject for the learning plan
+            available_content: Available content resources
+            
+        Yields:
+            Activity dictionaries, in plan order
+        """
+        if not self.llm:
+            await self.initialize()
+        
+        messages = self._learning_plan_messages(student_profile, subject, available_content)
+        parser = ActivityStreamParser()
+        async for chunk in self.plan_llm.astream(messages):
+            for activity in parser.feed(chunk.content):
+                yield activity
+        
+        if not parser.complete:
+            logger.warning(f"Learning plan stream for {subject} ended before the JSON object was complete")
+    
     async def generate_personalized_learning_plan(
         self,
         student_profile: Dict[str, Any],
@@ -363,90 +742,40 @@ class LangChainManager:
             Personalized learning plan
         """
         if not self.llm:
-            self.initialize()
+            await self.initialize()
+        
+        # Reuse a plan built from the same subject and resources for a similar profile
+        cache_scope = cache_embedding = None
+        if settings.PLAN_CACHE_ENABLED:
+            cache_scope = (subject, frozenset(str(content.get('id')) for content in available_content))
+            profile_text = (
+                f"{student_profile.get('grade_level')}|{student_profile.get('learning_style')}|"
+                f"{','.join(student_profile.get('subjects_of_interest', []))}"
+            )
+            try:
+                cache_embedding = await self.embeddings.aembed_query(profile_text)
+            except Exception as e:
+                logger.warning(f"Skipping plan cache, could not embed student profile: {e}")
+            if cache_embedding is not None:
+                cached_plan = self.plan_cache.get(cache_scope, cache_embedding)
+                if cached_plan is not None:
+                    return cached_plan
             
         try:
-            # Format content resources for the prompt
-            resources_text = ""
-            for i, content in enumerate(available_content):
-                resources_text += f"""
-                Content {i+1}:
-                - ID: {content.get('id', 'unknown')}
-                - Title: {content.get('title', 'Untitled')}
-                - Type: {content.get('content_type', 'unknown')}
-                - Difficulty: {content.get('difficulty_level', 'unknown')}
-                - Description: {content.get('description', 'No description')}
-                """
-                
-            # Construct the prompt
-            profile_text = f"""
-            Student Profile:
-            - Name: {student_profile.get('full_name', student_profile.get('username', 'Student'))}
-            - Grade Level: {student_profile.get('grade_level', 'Unknown')}
-            - Learning Style: {student_profile.get('learning_style', 'Mixed')}
-            - Interests: {', '.join(student_profile.get('subjects_of_interest', []))}
-            """
-            
-            prompt_template = f"""
-            Create a personalized learning plan for the following student:
-            
-            {profile_text}
-            
-            The learning plan should focus on: {subject}
-            
-            Available resources:
-            {resources_text}
-            
-            The learning plan should include:
-            1. A title
-            2. A brief description
-            3. 4-5 learning activities that use the available resources
-            4. Each activity should include a title, description, duration, and reference to a resource ID if applicable
-            
-            Format the response as JSON with the following structure:
-            {{
-                "title": "Learning Plan Title",
-                "description": "Brief description of the plan",
-                "subject": "{subject}",
-                "activities": [
-                    {{
-                        "title": "Activity Title",
-                        "description": "Activity description",
-                        "content_id": "reference to resource ID or null",
-                        "duration_minutes": time in minutes,
-                        "order": order number
-                    }}
-                ]
-            }}
-            """
-            
-            # Create prompt template
-            messages = [
-                {"role": "system", "content": "You are an expert educational assistant that creates personalized learning plans."},
-                {"role": "user", "content": prompt_template}
-            ]
+            messages = self._learning_plan_messages(student_profile, subject, available_content)
             
             # Generate learning plan
-            response = await self.llm.ainvoke(messages)
+            response = await self.plan_llm.ainvoke(messages)
             
-            # Parse the JSON result
-            import json
+            # Parse the JSON result; JSON mode returns a bare object
             try:
-                # Extract JSON if it's within a code block
                 result = response.content
-                if "```json" in result:
-                    json_start = result.find("```json") + 7
-                    json_end = result.find("```", json_start)
-                    result = result[json_start:json_end].strip()
-                elif "```" in result:
-                    json_start = result.find("```") + 3
-                    json_end = result.find("```", json_start)
-                    result = result[json_start:json_end].strip()
-                    
-                learning_plan = json.loads(result)
+                learning_plan = orjson.loads(result)
+                if cache_embedding is not None:
+                    self.plan_cache.put(cache_scope, cache_embedding, learning_plan)
                 return learning_plan
                 
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.error(f"Error parsing learning plan JSON: {result}")
                 # Return the raw text as a fallback
                 return {
@@ -469,10 +798,10 @@ class LangChainManager:
 # Singleton instance
 langchain_manager = None
 
-def get_langchain_manager():
+async def get_langchain_manager():
     """Get or create the LangChain manager singleton."""
     global langchain_manager
     if langchain_manager is None:
         langchain_manager = LangChainManager()
-        langchain_manager.initialize()
+    await langchain_manager.initialize()
     return langchain_manager
\ No newline at end of file
@@ -7,11 +7,11 @@ from models.user import User
 from models.content import Content
 from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
 from rag.retriever import retrieve_relevant_content
-from config.settings import Settings
+from config.settings import get_settings
 from rag.openai_adapter import get_openai_adapter
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -180,16 +180,11 @@ class LearningPlanner:
             plan_dict = json.loads(response["choices"][0]["message"]["content"])
             
             # Format activities with proper IDs and status
+            valid_ids = {str(content.id) for content in relevant_content}
             for activity in plan_dict.get("activities", []):
-                # Ensure content_id is valid
-                if "content_id" in activity and activity["content_id"]:
-                    try:
-                        # Check if the content ID exists in our resources
-                        content_exists = any(str(content.id) == activity["content_id"] for content in relevant_content)
-                        if not content_exists:
-                            activity["content_id"] = None
-                    except:
-                        activity["content_id"] = None
+                # Ensure content_id refers to one of our resources
+                if activity.get("content_id") and activity["content_id"] not in valid_ids:
+                    activity["content_id"] = None
                 
                 # Set default status
                 activity["status"] = ActivityStatus.NOT_STARTED
@@ -410,14 +405,13 @@ class LearningPlanner:
             learning_path["created_at"] = datetime.utcnow().isoformat()
             
             # Validate content IDs
+            valid_ids = {str(content.id) for content in relevant_content}
             for week in learning_path.get("weeks", []):
                 for day in week.get("days", []):
                     for activity in day.get("activities", []):
-                        if "content_id" in activity and activity["content_id"]:
-                            # Check if content ID exists in our resources
-                            content_exists = any(str(content.id) == activity["content_id"] for content in relevant_content)
-                            if not content_exists:
-                                activity["content_id"] = None
+                        # Check if content ID exists in our resources
+                        if activity.get("content_id") and activity["content_id"] not in valid_ids:
+                            activity["content_id"] = None
             
             return learning_path
             
@@ -1,6 +1,9 @@
 # backend/rag/openai_adapter.py
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional
+import httpx
 import os
 import sys
 
@@ -11,10 +14,10 @@ project_root = os.path.dirname(backend_dir)
 sys.path.insert(0, project_root)  # Add project root to path
 
 # Now use absolute imports
-from backend.config.settings import Settings
+from backend.config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -24,6 +27,16 @@ try:
 except ImportError:
     logger.warning("OpenAI package not installed. Please run: pip install openai>=1.0.0")
 
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Shared pooled HTTP client for OpenAI calls (keep-alive connections, HTTP/2)."""
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        # Fail fast on connecting, but give long chat completions the OpenAI SDK's default read time
+        timeout=httpx.Timeout(30.0, read=600.0)
+    )
+
 class OpenAIAdapter:
     """
     Adapter class for Azure OpenAI API using the v1.x OpenAI package.
@@ -32,8 +45,8 @@ class OpenAIAdapter:
     def __init__(self):
         """Initialize the OpenAI client with Azure configuration."""
         # Configure OpenAI with Azure details
-        api_key = settings.get_openai_key()
-        api_base = settings.get_openai_endpoint()
+        api_key = settings.openai_key
+        api_base = settings.openai_endpoint
         api_version = settings.AZURE_OPENAI_API_VERSION
 
         # Initialize the appropriate client based on the API type
@@ -41,13 +54,15 @@ class OpenAIAdapter:
             self.client = AzureOpenAI(
                 api_key=api_key,
                 api_version=api_version,
-                azure_endpoint=api_base
+                azure_endpoint=api_base,
+                http_client=get_http_client()
             )
         else:
             self.client = AzureOpenAI(
                 api_key=api_key,
                 api_version=api_version,
-                azure_endpoint=api_base
+                azure_endpoint=api_base,
+                http_client=get_http_client()
             )
     
     async def create_chat_completion(
@@ -85,8 +100,8 @@ class OpenAIAdapter:
             if response_format is not None:
                 params["response_format"] = response_format
                 
-            # Make the API call
-            response = self.client.chat.completions.create(**params)
+            # The client is synchronous; run it in a thread so concurrent requests overlap
+            response = await asyncio.to_thread(self.client.chat.completions.create, **params)
             
             # Convert response to dictionary format for backward compatibility
             # This allows existing code to continue working without major changes
@@ -117,6 +132,50 @@ class OpenAIAdapter:
             logger.error(f"Error creating chat completion: {e}")
             raise
     
+    async def stream_chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from Azure OpenAI.
+        Args:
+            Same as create_chat_completion
+        Yields:
+            Content deltas of the first choice as they arrive
+        """
+        params = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True
+        }
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        if response_format is not None:
+            params["response_format"] = response_format
+        
+        try:
+            # The client is synchronous; pull each chunk in a thread so the event loop stays free
+            stream = await asyncio.to_thread(self.client.chat.completions.create, **params)
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(next, stream, None)
+                    if chunk is None:
+                        break
+                    # Azure sends an initial chunk with no choices (content filter results)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+                
+        except Exception as e:
+            logger.error(f"Error streaming chat completion: {e}")
+            raise
+    
     async def create_embedding(
         self,
         model: str,
@@ -131,9 +190,10 @@ class OpenAIAdapter:
             List of embedding values
         """
         try:
-            # Make the API call
-            response = self.client.embeddings.create(
-                model=model,  # Use the deployment name 
+            # The client is synchronous; run it in a thread so the event loop stays free
+            response = await asyncio.to_thread(
+                self.client.embeddings.create,
+                model=model,  # Use the deployment name
                 input=text
             )
             
@@ -143,6 +203,34 @@ class OpenAIAdapter:
         except Exception as e:
             logger.error(f"Error creating embedding: {e}")
             raise
+    
+    async def create_embeddings(
+        self,
+        model: str,
+        texts: List[str]
+    ) -> List[List[float]]:
+        """
+        Create embeddings for several texts in a single API call.
+        Args:
+            model: The deployment name in Azure OpenAI
+            texts: Texts to embed
+        Returns:
+            List of embeddings, in the same order as texts
+        """
+        try:
+            # The client is synchronous; run it in a thread so concurrent batches overlap
+            response = await asyncio.to_thread(
+                self.client.embeddings.create,
+                model=model,
+                input=texts
+            )
+            
+            # The API may return items out of order; sort by index
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+                
+        except Exception as e:
+            logger.error(f"Error creating embeddings for {len(texts)} texts: {e}")
+            raise
 
 # Singleton instance
 openai_adapter = None
@@ -15,12 +15,17 @@ def main():
     parser.add_argument("--port", type=int, default=8000, help="Port to bind")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     parser.add_argument("--app", type=str, default="app:app", help="Application import path")
+    parser.add_argument("--loop", type=str, default="auto", choices=["auto", "asyncio", "uvloop"],
+                        help="Event loop implementation (auto picks uvloop when installed)")
+    parser.add_argument("--http", type=str, default="auto", choices=["auto", "h11", "httptools"],
+                        help="HTTP protocol implementation (auto picks httptools when installed)")
     args = parser.parse_args()
 
     # Print startup info
     print(f"Starting Personalized Learning Co-pilot API on {args.host}:{args.port}")
     print(f"Application: {args.app}")
     print(f"Auto-reload: {'Enabled' if args.reload else 'Disabled'}")
+    print(f"Event loop: {args.loop}, HTTP: {args.http}")
     
     # Check for debug mode
     debug_mode = os.environ.get("DEBUG", "").lower() in ("true", "1", "yes")
@@ -33,6 +38,8 @@ def main():
         host=args.host,
         port=args.port,
         reload=args.reload,
+        loop=args.loop,
+        http=args.http,
         log_level="debug" if debug_mode else "info"
     )
 
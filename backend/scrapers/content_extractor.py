@@ -23,10 +23,10 @@ try:
     
     # Import models and settings
     from models.content import Content, ContentType, DifficultyLevel
-    from config.settings import Settings
+    from config.settings import get_settings
     
     # Initialize settings
-    settings = Settings()
+    settings = get_settings()
 except ImportError:
     # Fallback ContentType enum for testing
     class ContentType:
@@ -923,8 +923,13 @@ class EducationContentExtractor:
                                 content, 
                                 owner_id=system_owner_id
                             )
-                            processed_items.append(processed_content)
-                            logger.info(f"Successfully processed and indexed: {resource['title'][:30]}{'...' if len(resource['title']) > 30 else ''}")
+                            if processed_content is None:
+                                # Rejected before indexing (invalid URL); keep the extracted content
+                                logger.warning(f"Content not indexed: {resource['title'][:30]}{'...' if len(resource['title']) > 30 else ''}")
+                                processed_items.append(content)
+                            else:
+                                processed_items.append(processed_content)
+                                logger.info(f"Successfully processed and indexed: {resource['title'][:30]}{'...' if len(resource['title']) > 30 else ''}")
                         except Exception as e:
                             logger.error(f"Error processing and indexing content: {e}")
                             # Still add the extracted content
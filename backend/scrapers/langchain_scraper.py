@@ -31,10 +31,10 @@ from playwright.async_api import async_playwright, Page, Browser
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import settings
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +48,17 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Shared text splitter - pure configuration, so build it once per process
+_TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=1000,
+    chunk_overlap=200
+)
+
+# Azure OpenAI accepts at most 2048 inputs per embeddings request
+EMBED_BATCH_SIZE = 2048
+# Concurrent embeddings requests, to stay clear of throttling
+EMBED_CONCURRENCY = 4
+
 # Predefined list of subjects with their URLs (same as the original scraper)
 SUBJECT_LINKS = [
     {"name": "Arts", "url": "https://www.abc.net.au/education/subjects-and-topics/arts"},
@@ -116,7 +127,8 @@ class LangChainScraperManager:
                 azure_deployment=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
                 openai_api_version=settings.AZURE_OPENAI_API_VERSION,
                 azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-                api_key=settings.AZURE_OPENAI_KEY
+                api_key=settings.AZURE_OPENAI_KEY,
+                chunk_size=EMBED_BATCH_SIZE
             )
             
             self.azure_llm = AzureChatOpenAI(
@@ -570,12 +582,7 @@ class LangChainScraperManager:
             text_content = "\n\n".join([doc.page_content for doc in documents])
             
             # Split text into chunks for processing
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            
-            chunks = await asyncio.to_thread(text_splitter.split_text, text_content)
+            chunks = await asyncio.to_thread(_TEXT_SPLITTER.split_text, text_content)
             
             # Create metadata for the content
             metadata = {
@@ -617,11 +624,13 @@ class LangChainScraperManager:
                     ) for chunk in chunks
                 ]
                 
-                # Create a FAISS vector store
+                # Embed all chunks in as few requests as possible, then build the FAISS store
+                vectors = await self._batch_embed([doc.page_content for doc in docs])
                 vector_store = await asyncio.to_thread(
-                    FAISS.from_documents,
-                    docs,
-                    self.azure_embeddings
+                    FAISS.from_embeddings,
+                    zip((doc.page_content for doc in docs), vectors),
+                    self.azure_embeddings,
+                    metadatas=[doc.metadata for doc in docs]
                 )
                 
                 # Save vector store for this content
@@ -665,6 +674,19 @@ class LangChainScraperManager:
             logger.error(f"Error processing resource content: {e}")
             return None
     
+    async def _batch_embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with one request per EMBED_BATCH_SIZE inputs, a few requests at a time."""
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        
+        async def embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.azure_embeddings.aembed_documents(batch)
+        
+        results = await asyncio.gather(*(
+            embed(texts[i:i + EMBED_BATCH_SIZE]) for i in range(0, len(texts), EMBED_BATCH_SIZE)
+        ))
+        return [vector for batch_vectors in results for vector in batch_vectors]
+    
     async def _get_page_html_with_playwright(self, url):
         """Get page HTML using Playwright."""
         try:
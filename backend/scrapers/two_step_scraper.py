@@ -17,7 +17,7 @@ sys.path.insert(0, project_root)  # Add project root first
 
 # Now we can properly import from the backend package
 from backend.utils.vector_store import get_vector_store
-from backend.config.settings import Settings
+from backend.config.settings import get_settings
 from backend.rag.openai_adapter import get_openai_adapter
 from backend.scrapers.edu_resource_indexer import run_indexer
 from backend.scrapers.content_extractor import run_extractor
@@ -28,6 +28,12 @@ try:
     from langchain_text_splitters import RecursiveCharacterTextSplitter
     from langchain_community.embeddings import AzureOpenAIEmbeddings
     from langchain_community.vectorstores import AzureSearch
+    
+    # Shared text splitter - pure configuration, so build it once per process
+    _TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=100
+    )
 except ImportError:
     print("Warning: LangChain imports failed. Make sure to install required packages.")
 
@@ -44,7 +50,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 class EnhancedScraperManager:
     """Enhanced scraper with Azure OpenAI and Azure Search integration."""
@@ -117,11 +123,7 @@ class EnhancedScraperManager:
                 return metadata
             
             # Split text into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=100
-            )
-            chunks = await asyncio.to_thread(text_splitter.split_documents, documents)
+            chunks = await asyncio.to_thread(_TEXT_SPLITTER.split_documents, documents)
             
             # Combine all text content
             full_text = "\n\n".join([doc.page_content for doc in chunks])
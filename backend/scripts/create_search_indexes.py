@@ -156,11 +156,15 @@ USER_FIELDS = [
 PLAN_FIELDS = [
     {"name": "id", "type": "Edm.String", "key": True, "filterable": True},
     {"name": "student_id", "type": "Edm.String", "filterable": True},
+    # Plans are listed per owner and subject (owner_id eq ... and subject eq ...)
+    {"name": "owner_id", "type": "Edm.String", "filterable": True},
     {"name": "title", "type": "Edm.String", "searchable": True},
     {"name": "description", "type": "Edm.String", "searchable": True},
     {"name": "subject", "type": "Edm.String", "filterable": True, "facetable": True},
     {"name": "topics", "type": "Collection(Edm.String)", "filterable": True, "facetable": True},
-    # Activities complex collection
+    # Activities are stored as a JSON string by AzureLearningPlanService
+    {"name": "activities_json", "type": "Edm.String"},
+    {"name": "metadata", "type": "Edm.String"},
     {"name": "status", "type": "Edm.String", "filterable": True, "facetable": True},
     {"name": "progress_percentage", "type": "Edm.Double", "filterable": True, "sortable": True},
     {"name": "created_at", "type": "Edm.DateTimeOffset", "filterable": True, "sortable": True},
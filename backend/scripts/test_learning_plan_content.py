@@ -15,7 +15,7 @@ from pprint import pprint
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from models.user import User, LearningStyle
-from rag.generator import get_plan_generator
+from rag.generator import get_plan_generator, CONTENT_BY_ID_KEY
 from rag.retriever import retrieve_relevant_content
 
 # Setup logging
@@ -62,6 +62,7 @@ async def test_learning_plan_content():
             subject=subject,
             relevant_content=relevant_content
         )
+        content_by_id = plan_dict.pop(CONTENT_BY_ID_KEY)
         
         # Process activities
         activities = []
@@ -73,10 +74,7 @@ async def test_learning_plan_content():
             
             # Try to find matching content if the activity has a content_id
             if content_id:
-                matching_content = next(
-                    (content for content in relevant_content if str(content.id) == content_id),
-                    None
-                )
+                matching_content = content_by_id.get(content_id)
                 if matching_content and not content_url:
                     content_url = matching_content.url
             
@@ -110,14 +110,14 @@ class AzureLangChainService:
             
             # Process activities
             activities = []
+            valid_ids = {str(content.id) for content in relevant_content}
             for activity_dict in plan_dict.get("activities", []):
                 activity_id = activity_dict.get("id", str(uuid.uuid4()))
                 content_id = activity_dict.get("content_id")
                 
                 # Validate content_id exists in relevant_content
-                if content_id:
-                    if not any(str(content.id) == content_id for content in relevant_content):
-                        content_id = None
+                if content_id and content_id not in valid_ids:
+                    content_id = None
                 
                 # Create activity
                 activity = LearningActivity(
@@ -8,14 +8,21 @@ import aiohttp
 
 from models.user import User
 from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Fields needed to rebuild a LearningPlan; skips page_content/embedding on reads
+PLAN_SELECT_FIELDS = ",".join([
+    "id", "student_id", "owner_id", "title", "description", "subject", "topics",
+    "activities_json", "status", "progress_percentage", "metadata",
+    "created_at", "updated_at", "start_date", "end_date",
+])
+
 class AzureLearningPlanService:
     """
     Service for managing learning plans using Azure AI Search.
@@ -31,7 +38,8 @@ class AzureLearningPlanService:
         self, 
         user_id: str,
         subject: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        skip: int = 0
     ) -> List[LearningPlan]:
         """
         Get learning plans for a user.
@@ -40,6 +48,7 @@ class AzureLearningPlanService:
             user_id: User ID
             subject: Optional subject filter
             limit: Maximum number of results
+            skip: Number of results to skip (for pagination)
             
         Returns:
             List of learning plans
@@ -61,8 +70,10 @@ class AzureLearningPlanService:
             # Build search body
             search_body = {
                 "filter": filter_expr,
+                "select": PLAN_SELECT_FIELDS,
                 "orderby": "created_at desc",
-                "top": limit
+                "top": limit,
+                "skip": skip
             }
             
             # Execute search
@@ -83,6 +94,7 @@ class AzureLearningPlanService:
                     result = await response.json()
                     
                     # Convert to LearningPlan objects
+                    now = datetime.utcnow()
                     plans = []
                     for item in result.get("value", []):
                         try:
@@ -92,17 +104,7 @@ class AzureLearningPlanService:
                                 try:
                                     activities_data = json.loads(item["activities_json"])
                                     for activity_dict in activities_data:
-                                        activity = LearningActivity(
-                                            id=activity_dict.get("id", str(uuid.uuid4())),
-                                            title=activity_dict.get("title", "Activity"),
-                                            description=activity_dict.get("description", ""),
-                                            content_id=activity_dict.get("content_id"),
-                                            duration_minutes=activity_dict.get("duration_minutes", 30),
-                                            order=activity_dict.get("order", 1),
-                                            status=ActivityStatus(activity_dict.get("status", "not_started")),
-                                            completed_at=activity_dict.get("completed_at")
-                                        )
-                                        activities.append(activity)
+                                        activities.append(self._activity_from_stored(activity_dict))
                                 except json.JSONDecodeError:
                                     logger.error(f"Error parsing activities_json: {item.get('activities_json')}")
                             # Fallback to activities field for backward compatibility
@@ -116,17 +118,7 @@ class AzureLearningPlanService:
                                 
                                 # Convert each activity to LearningActivity
                                 for activity_dict in item.get("activities", []):
-                                    activity = LearningActivity(
-                                        id=activity_dict.get("id", str(uuid.uuid4())),
-                                        title=activity_dict.get("title", "Activity"),
-                                        description=activity_dict.get("description", ""),
-                                        content_id=activity_dict.get("content_id"),
-                                        duration_minutes=activity_dict.get("duration_minutes", 30),
-                                        order=activity_dict.get("order", 1),
-                                        status=ActivityStatus(activity_dict.get("status", "not_started")),
-                                        completed_at=activity_dict.get("completed_at")
-                                    )
-                                    activities.append(activity)
+                                    activities.append(self._activity_from_stored(activity_dict))
                             
                             # Parse metadata if it exists
                             metadata = {}
@@ -141,7 +133,7 @@ class AzureLearningPlanService:
                             
                             # Create LearningPlan
                             plan = LearningPlan(
-                                id=item.get("id", str(uuid.uuid4())),
+                                id=item.get("id") or uuid.uuid4().hex,
                                 student_id=item.get("student_id", user_id),
                                 title=item.get("title", "Learning Plan"),
                                 description=item.get("description", ""),
@@ -150,8 +142,8 @@ class AzureLearningPlanService:
                                 activities=activities,
                                 status=ActivityStatus(item.get("status", "not_started")),
                                 progress_percentage=item.get("progress_percentage", 0.0),
-                                created_at=datetime.fromisoformat(item.get("created_at").replace('Z', '+00:00')) if item.get("created_at") else datetime.utcnow(),
-                                updated_at=datetime.fromisoformat(item.get("updated_at").replace('Z', '+00:00')) if item.get("updated_at") else datetime.utcnow(),
+                                created_at=datetime.fromisoformat(item.get("created_at").replace('Z', '+00:00')) if item.get("created_at") else now,
+                                updated_at=datetime.fromisoformat(item.get("updated_at").replace('Z', '+00:00')) if item.get("updated_at") else now,
                                 start_date=datetime.fromisoformat(item.get("start_date").replace('Z', '+00:00')) if item.get("start_date") else None,
                                 end_date=datetime.fromisoformat(item.get("end_date").replace('Z', '+00:00')) if item.get("end_date") else None,
                                 metadata=metadata
@@ -185,8 +177,8 @@ class AzureLearningPlanService:
             index_url = f"{self.search_endpoint}/indexes/{self.index_name}/docs/index"
             index_url += f"?api-version=2023-07-01-Preview"
             
-            # Convert plan to dict
-            plan_dict = plan.dict()
+            # Convert plan to dict (activities are dumped once, as part of the plan)
+            plan_dict = plan.model_dump()
             
             # Format dates properly for Azure Search
             for date_field in ["created_at", "updated_at", "start_date", "end_date"]:
@@ -196,9 +188,9 @@ class AzureLearningPlanService:
             
             # Convert activities to JSON string for storage in Azure Search
             # Azure Search doesn't handle nested objects in the same way as other fields
+            # Popping them also keeps the nested field out of the Azure Search document
             activities_json = []
-            for activity in plan.activities:
-                activity_dict = activity.dict()
+            for activity_dict in plan_dict.pop("activities", []):
                 # Format completed_at date if present
                 if activity_dict.get("completed_at"):
                     if isinstance(activity_dict["completed_at"], datetime):
@@ -209,11 +201,6 @@ class AzureLearningPlanService:
                 # Store activities as a JSON string instead of a nested object
                 plan_dict["activities_json"] = json.dumps(activities_json)
                 
-                # Remove the original activities field to avoid the Azure Search error
-                if "activities" in plan_dict:
-                    logger.info("Removing activities field from plan_dict")
-                    del plan_dict["activities"]
-                
                 # Convert metadata to string if it's a dict
                 if "metadata" in plan_dict and isinstance(plan_dict["metadata"], dict):
                     plan_dict["metadata"] = json.dumps(plan_dict["metadata"])
@@ -308,6 +295,7 @@ class AzureLearningPlanService:
             # Build search body
             search_body = {
                 "filter": filter_expr,
+                "select": PLAN_SELECT_FIELDS,
                 "top": 1
             }
             
@@ -334,6 +322,7 @@ class AzureLearningPlanService:
                     
                     # Get plan data
                     item = result["value"][0]
+                    now = datetime.utcnow()
                     
                     # Get activities from activities_json field if present
                     activities = []
@@ -341,17 +330,7 @@ class AzureLearningPlanService:
                         try:
                             activities_data = json.loads(item["activities_json"])
                             for activity_dict in activities_data:
-                                activity = LearningActivity(
-                                    id=activity_dict.get("id", str(uuid.uuid4())),
-                                    title=activity_dict.get("title", "Activity"),
-                                    description=activity_dict.get("description", ""),
-                                    content_id=activity_dict.get("content_id"),
-                                    duration_minutes=activity_dict.get("duration_minutes", 30),
-                                    order=activity_dict.get("order", 1),
-                                    status=ActivityStatus(activity_dict.get("status", "not_started")),
-                                    completed_at=activity_dict.get("completed_at")
-                                )
-                                activities.append(activity)
+                                activities.append(self._activity_from_stored(activity_dict))
                         except json.JSONDecodeError:
                             logger.error(f"Error parsing activities_json: {item.get('activities_json')}")
                     # Fallback to activities field for backward compatibility
@@ -365,17 +344,7 @@ class AzureLearningPlanService:
                         
                         # Convert each activity to LearningActivity
                         for activity_dict in item.get("activities", []):
-                            activity = LearningActivity(
-                                id=activity_dict.get("id", str(uuid.uuid4())),
-                                title=activity_dict.get("title", "Activity"),
-                                description=activity_dict.get("description", ""),
-                                content_id=activity_dict.get("content_id"),
-                                duration_minutes=activity_dict.get("duration_minutes", 30),
-                                order=activity_dict.get("order", 1),
-                                status=ActivityStatus(activity_dict.get("status", "not_started")),
-                                completed_at=activity_dict.get("completed_at")
-                            )
-                            activities.append(activity)
+                            activities.append(self._activity_from_stored(activity_dict))
                     
                     # Parse metadata if it exists
                     metadata = {}
@@ -390,7 +359,7 @@ class AzureLearningPlanService:
                     
                     # Create LearningPlan
                     plan = LearningPlan(
-                        id=item.get("id", str(uuid.uuid4())),
+                        id=item.get("id") or uuid.uuid4().hex,
                         student_id=item.get("student_id", user_id),
                         title=item.get("title", "Learning Plan"),
                         description=item.get("description", ""),
@@ -399,8 +368,8 @@ class AzureLearningPlanService:
                         activities=activities,
                         status=ActivityStatus(item.get("status", "not_started")),
                         progress_percentage=item.get("progress_percentage", 0.0),
-                        created_at=datetime.fromisoformat(item.get("created_at").replace('Z', '+00:00')) if item.get("created_at") else datetime.utcnow(),
-                        updated_at=datetime.fromisoformat(item.get("updated_at").replace('Z', '+00:00')) if item.get("updated_at") else datetime.utcnow(),
+                        created_at=datetime.fromisoformat(item.get("created_at").replace('Z', '+00:00')) if item.get("created_at") else now,
+                        updated_at=datetime.fromisoformat(item.get("updated_at").replace('Z', '+00:00')) if item.get("updated_at") else now,
                         start_date=datetime.fromisoformat(item.get("start_date").replace('Z', '+00:00')) if item.get("start_date") else None,
                         end_date=datetime.fromisoformat(item.get("end_date").replace('Z', '+00:00')) if item.get("end_date") else None,
                         metadata=metadata
@@ -435,101 +404,176 @@ class AzureLearningPlanService:
         """
         logger.info(f"Updating activity status in service: plan_id={plan_id}, activity_id={activity_id}, status={status}, user_id={user_id}")
         
+        if not (self.search_endpoint and self.search_key):
+            logger.warning("Azure Search not configured")
+            return None
+        
         try:
-            # Get the plan
-            plan = await self.get_learning_plan(plan_id, user_id)
-            if not plan:
+            # Fetch only the stored activities rather than the whole plan
+            search_url = f"{self.search_endpoint}/indexes/{self.index_name}/docs/search"
+            search_url += f"?api-version=2023-07-01-Preview"
+            search_body = {
+                "filter": f"id eq '{plan_id}' and owner_id eq '{user_id}'",
+                "select": "id,activities_json",
+                "top": 1
+            }
+            
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    search_url,
+                    json=search_body,
+                    headers={
+                        "Content-Type": "application/json",
+                        "api-key": self.search_key
+                    }
+                ) as response:
+                    if response.status != 200:
+                        logger.error(f"Azure Search error: {response.status} - {await response.text()}")
+                        return None
+                    result = await response.json()
+            
+            if not result.get("value"):
                 logger.warning(f"Plan not found: {plan_id} for user {user_id}")
                 return None
-                
-            logger.info(f"Plan found with {len(plan.activities)} activities")
+            
+            activities = json.loads(result["value"][0].get("activities_json") or "[]")
+            logger.info(f"Plan found with {len(activities)} activities")
         except Exception as e:
             logger.exception(f"Error getting learning plan: {e}")
             return None
         
-        # Find and update the activity
+        # Find and update the activity, counting completed activities in the same pass
+        now = datetime.utcnow()
         activity_found = False
-        try:
-            for i, activity in enumerate(plan.activities):
-                logger.info(f"Checking activity {activity.id} against {activity_id}")
-                if activity.id == activity_id:
-                    logger.info(f"Found matching activity, updating status to {status}")
-                    plan.activities[i].status = status
-                    if status == ActivityStatus.COMPLETED:
-                        plan.activities[i].completed_at = completed_at or datetime.utcnow()
-                    activity_found = True
-                    break
-            
-            if not activity_found:
-                logger.warning(f"Activity not found: {activity_id} in plan {plan_id}")
-                return None
-            
-            # Update plan status and progress
-            self._update_plan_progress(plan)
-            
-            # Update timestamp
-            plan.updated_at = datetime.utcnow()
-            
-            # Save updated plan
-            try:
-                logger.info(f"Saving updated plan with {len(plan.activities)} activities")
-                logger.info(f"Plan details before save: id={plan.id}, status={plan.status}, activities={len(plan.activities)}")
-                
-                try:
-                    # Convert to dict first to catch any serialization issues
-                    plan_dict = plan.dict()
-                    logger.info(f"Plan converted to dict successfully with {len(plan_dict['activities'])} activities")
-                except Exception as dict_err:
-                    logger.exception(f"Error converting plan to dict: {dict_err}")
-                    return None
-                
-                success = await self.update_learning_plan(plan)
-                
-                if not success:
-                    logger.error("Failed to save updated plan")
-                    return None
-                
-                logger.info(f"Plan updated successfully, new progress: {plan.progress_percentage}%")
-                return {
-                    "success": True,
-                    "message": "Activity status updated",
-                    "progress_percentage": plan.progress_percentage,
-                    "plan_status": plan.status  # ActivityStatus inherits from str, so this works
-                }
-            except Exception as e:
-                logger.exception(f"Error updating plan: {e}")
-                return None
-        except Exception as e:
-            logger.exception(f"Error updating activity: {e}")
+        completed_activities = 0
+        for activity in activities:
+            if not activity_found and activity.get("id") == activity_id:
+                logger.info(f"Found matching activity, updating status to {status}")
+                activity["status"] = status.value
+                if status == ActivityStatus.COMPLETED:
+                    activity["completed_at"] = (completed_at or now).isoformat() + "Z"
+                activity_found = True
+            if activity.get("status") == ActivityStatus.COMPLETED:
+                completed_activities += 1
+        
+        if not activity_found:
+            logger.warning(f"Activity not found: {activity_id} in plan {plan_id}")
+            return None
+        
+        # Update plan status and progress
+        progress_percentage, plan_status = self._compute_plan_progress(len(activities), completed_activities)
+        
+        # Merge only the changed fields into the stored plan document
+        success = await self._merge_plan_fields(plan_id, {
+            "activities_json": json.dumps(activities),
+            "status": plan_status.value,
+            "progress_percentage": progress_percentage,
+            "updated_at": now.isoformat() + "Z"
+        })
+        
+        if not success:
+            logger.error("Failed to save updated plan")
             return None
+        
+        logger.info(f"Plan updated successfully, new progress: {progress_percentage}%")
+        return {
+            "success": True,
+            "message": "Activity status updated",
+            "progress_percentage": progress_percentage,
+            "plan_status": plan_status  # ActivityStatus inherits from str, so this works
+        }
     
-    def _update_plan_progress(self, plan: LearningPlan):
+    async def _merge_plan_fields(self, plan_id: str, fields: Dict[str, Any]) -> bool:
         """
-        Update plan progress percentage and status.
+        Partially update a stored learning plan using a merge action.
         
         Args:
-            plan: Learning plan to update
+            plan_id: Learning plan ID
+            fields: Field values to overwrite; other fields are left untouched
+            
+        Returns:
+            Success status
+        """
+        index_url = f"{self.search_endpoint}/indexes/{self.index_name}/docs/index"
+        index_url += f"?api-version=2023-07-01-Preview"
+        
+        request_body = {
+            "value": [{"@search.action": "merge", "id": plan_id, **fields}]
+        }
+        
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    index_url,
+                    json=request_body,
+                    headers={
+                        "Content-Type": "application/json",
+                        "api-key": self.search_key
+                    }
+                ) as response:
+                    if response.status != 200 and response.status != 201:
+                        logger.error(f"Azure Search error: {response.status} - {await response.text()}")
+                        return False
+                    result = await response.json()
+        except Exception as e:
+            logger.exception(f"Network error when updating Azure Search index: {e}")
+            return False
+        
+        # Check for errors
+        for item in result.get("value", []):
+            if not item.get("status", False):
+                logger.error(f"Error updating learning plan: {item.get('errorMessage')}")
+                return False
+        
+        return True
+    
+    @staticmethod
+    def _activity_from_stored(activity_dict: Dict[str, Any]) -> LearningActivity:
         """
-        if not plan.activities:
-            plan.progress_percentage = 0
-            plan.status = ActivityStatus.NOT_STARTED
-            return
+        Build a LearningActivity from an activity this service stored itself.
         
-        # Count completed activities
-        total_activities = len(plan.activities)
-        completed_activities = sum(1 for a in plan.activities if a.status == ActivityStatus.COMPLETED)
+        The stored data is trusted, so the per-field validation is skipped and
+        only the two non-trivial conversions (status enum, completion date) are done.
+        """
+        completed_at = activity_dict.get("completed_at")
+        if isinstance(completed_at, str):
+            completed_at = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
+        return LearningActivity.model_construct(
+            id=activity_dict.get("id") or uuid.uuid4().hex,
+            title=activity_dict.get("title", "Activity"),
+            description=activity_dict.get("description", ""),
+            content_id=activity_dict.get("content_id"),
+            duration_minutes=activity_dict.get("duration_minutes", 30),
+            order=activity_dict.get("order", 1),
+            status=ActivityStatus(activity_dict.get("status", "not_started")),
+            completed_at=completed_at
+        )
+    
+    @staticmethod
+    def _compute_plan_progress(total_activities: int, completed_activities: int):
+        """
+        Compute plan progress percentage and status from activity counts.
+        
+        Args:
+            total_activities: Number of activities in the plan
+            completed_activities: Number of completed activities
+            
+        Returns:
+            Tuple of (progress percentage, plan status)
+        """
+        if total_activities == 0:
+            return 0, ActivityStatus.NOT_STARTED
         
         # Calculate progress percentage
-        plan.progress_percentage = (completed_activities / total_activities) * 100 if total_activities > 0 else 0
+        progress_percentage = (completed_activities / total_activities) * 100
         
-        # Update plan status
+        # Determine plan status
         if completed_activities == total_activities:
-            plan.status = ActivityStatus.COMPLETED
+            return progress_percentage, ActivityStatus.COMPLETED
         elif completed_activities > 0:
-            plan.status = ActivityStatus.IN_PROGRESS
-        else:
-            plan.status = ActivityStatus.NOT_STARTED
-            
+            return progress_percentage, ActivityStatus.IN_PROGRESS
+        return progress_percentage, ActivityStatus.NOT_STARTED
+    
     async def delete_learning_plan(self, plan_id: str, user_id: str) -> bool:
         """
         Delete a learning plan.
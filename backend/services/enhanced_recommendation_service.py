@@ -9,11 +9,11 @@ from azure.search.documents.models import Vector
 
 from models.user import User
 from models.content import Content, ContentType, DifficultyLevel
-from config.settings import Settings
+from config.settings import get_settings
 from rag.openai_adapter import get_openai_adapter
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -431,7 +431,7 @@ async def get_recommendation_service():
             # Bonus for having transcription for video/audio content
             if content.content_type.value in ["video", "audio"] and hasattr(content, "metadata"):
                 metadata = getattr(content, "metadata", {})
-                if metadata and metadata.get("transcription"):
+                if metadata and metadata.transcription:
                     base_score += 0.2
             
             # Bonus for duration appropriate for the user's grade level
@@ -5,7 +5,7 @@ This module provides high-level LangChain functionality for the application.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import os
 import sys
 import json
@@ -32,9 +32,9 @@ class LangChainService:
     Service for LangChain operations in the Personalized Learning Co-pilot.
     """
     
-    def __init__(self):
+    def __init__(self, langchain_manager):
         """Initialize the LangChain service."""
-        self.langchain_manager = get_langchain_manager()
+        self.langchain_manager = langchain_manager
     
     async def generate_learning_plan(
         self,
@@ -54,29 +54,7 @@ class LangChainService:
             Generated learning plan
         """
         try:
-            # Convert Content objects to dictionaries for plan generation
-            content_dicts = [
-                {
-                    "id": content.id,
-                    "title": content.title,
-                    "description": content.description,
-                    "content_type": content.content_type,
-                    "difficulty_level": content.difficulty_level,
-                    "url": content.url,
-                    "duration_minutes": content.duration_minutes
-                }
-                for content in relevant_content
-            ]
-            
-            # Convert student to dictionary
-            student_dict = {
-                "id": student.id,
-                "username": student.username,
-                "full_name": student.full_name,
-                "grade_level": student.grade_level,
-                "learning_style": student.learning_style,
-                "subjects_of_interest": student.subjects_of_interest
-            }
+            student_dict, content_dicts = self._plan_inputs(student, relevant_content)
             
             # Use the LangChain manager to generate the plan
             learning_plan = await self.langchain_manager.generate_personalized_learning_plan(
@@ -97,6 +75,57 @@ class LangChainService:
                 "activities": []
             }
     
+    async def stream_learning_plan(
+        self,
+        student: User,
+        subject: str,
+        relevant_content: List[Content]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a personalized learning plan for a student, one activity at a time.
+        
+        Args:
+            student: The student
+            subject: Subject for the learning plan
+            relevant_content: List of relevant content
+            
+        Yields:
+            Activity dictionaries as soon as each one is generated; errors propagate
+        """
+        student_dict, content_dicts = self._plan_inputs(student, relevant_content)
+        async for activity in self.langchain_manager.stream_personalized_learning_plan(
+            student_profile=student_dict,
+            subject=subject,
+            available_content=content_dicts
+        ):
+            yield activity
+    
+    @staticmethod
+    def _plan_inputs(student: User, relevant_content: List[Content]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Convert the student and content to the dictionaries the LangChain manager expects."""
+        content_dicts = [
+            {
+                "id": content.id,
+                "title": content.title,
+                "description": content.description,
+                "content_type": content.content_type,
+                "difficulty_level": content.difficulty_level,
+                "url": content.url,
+                "duration_minutes": content.duration_minutes
+            }
+            for content in relevant_content
+        ]
+        
+        student_dict = {
+            "id": student.id,
+            "username": student.username,
+            "full_name": student.full_name,
+            "grade_level": student.grade_level,
+            "learning_style": student.learning_style,
+            "subjects_of_interest": student.subjects_of_interest
+        }
+        return student_dict, content_dicts
+    
     async def generate_personalized_response(
         self,
         query: str,
@@ -256,7 +285,7 @@ class LangChainService:
             
             for content in contents:
                 # Create dictionary from content object
-                content_dict = content.dict()
+                content_dict = content.model_dump()
                 
                 # Extract text for embedding
                 text = (
@@ -365,5 +394,5 @@ async def get_langchain_service():
     """Get or create the LangChain service singleton."""
     global langchain_service
     if langchain_service is None:
-        langchain_service = LangChainService()
+        langchain_service = LangChainService(await get_langchain_manager())
     return langchain_service
\ No newline at end of file
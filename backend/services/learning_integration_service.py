@@ -18,10 +18,10 @@ from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
 from services.recommendation_service import get_recommendation_service
 from rag.learning_planner import get_learning_planner
 from rag.retriever import retrieve_relevant_content
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import uuid
 import json
+import re
 
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.openai import OpenAIClient  # Updated for version < 1.0.0
@@ -10,14 +11,26 @@ from azure.ai.openai import OpenAIClient  # Updated for version < 1.0.0
 from models.user import User
 from models.content import Content
 from models.learning_plan import LearningPlan, LearningActivity, ActivityStatus
-from config.settings import Settings
+from config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Patterns for _parse_generated_plan, compiled once rather than looked up on every match
+_TITLE_RE = re.compile(r"title:?\s*\"?([^\"]+)\"?", re.IGNORECASE)
+_DESCRIPTION_RE = re.compile(r"description:?\s*\"?([^\"]+)\"?", re.IGNORECASE)
+_SUBJECT_RE = re.compile(r"subject:?\s*\"?([^\"]+)\"?", re.IGNORECASE)
+_TOPICS_RE = re.compile(r"topics:?\s*\[(.*?)\]", re.IGNORECASE | re.DOTALL)
+_QUOTED_RE = re.compile(r"\"([^\"]+)\"")
+_ACTIVITIES_RE = re.compile(r"activities:?\s*\[(.*?)\]", re.IGNORECASE | re.DOTALL)
+_BRACED_RE = re.compile(r"\{(.*?)\}", re.DOTALL)
+_CONTENT_ID_RE = re.compile(r"content_id:?\s*\"?([^\"]+)\"?", re.IGNORECASE)
+_DURATION_RE = re.compile(r"duration_minutes:?\s*(\d+)", re.IGNORECASE)
+_ORDER_RE = re.compile(r"order:?\s*(\d+)", re.IGNORECASE)
+
 class LearningPlanService:
     """Service for generating and managing learning plans using Azure OpenAI."""
     
@@ -105,10 +118,8 @@ class LearningPlanService:
     
     def _format_content_for_prompt(self, content_items: List[Content]) -> str:
         """Format content items for inclusion in the prompt."""
-        formatted_content = ""
-        
-        for i, content in enumerate(content_items):
-            formatted_content += f"""
+        return "".join(
+            f"""
             Content {i+1}:
             - ID: {content.id}
             - Title: {content.title}
@@ -118,8 +129,8 @@ class LearningPlanService:
             - URL: {content.url}
             
             """
-        
-        return formatted_content
+            for i, content in enumerate(content_items)
+        )
     
     def _create_learning_plan_prompt(self, user: User, subject: str, content_descriptions: str) -> str:
         """Create the prompt for learning plan generation."""
@@ -189,32 +200,32 @@ class LearningPlanService:
         }
         
         # Extract title
-        title_match = re.search(r"title:?\s*\"?([^\"]+)\"?", generated_text, re.IGNORECASE)
+        title_match = _TITLE_RE.search(generated_text)
         if title_match:
             plan_dict["title"] = title_match.group(1).strip()
         
         # Extract description
-        desc_match = re.search(r"description:?\s*\"?([^\"]+)\"?", generated_text, re.IGNORECASE)
+        desc_match = _DESCRIPTION_RE.search(generated_text)
         if desc_match:
             plan_dict["description"] = desc_match.group(1).strip()
         
         # Extract subject
-        subject_match = re.search(r"subject:?\s*\"?([^\"]+)\"?", generated_text, re.IGNORECASE)
+        subject_match = _SUBJECT_RE.search(generated_text)
         if subject_match:
             plan_dict["subject"] = subject_match.group(1).strip()
         
         # Extract topics
-        topics_match = re.search(r"topics:?\s*\[(.*?)\]", generated_text, re.IGNORECASE | re.DOTALL)
+        topics_match = _TOPICS_RE.search(generated_text)
         if topics_match:
             topics_text = topics_match.group(1)
-            topics = re.findall(r"\"([^\"]+)\"", topics_text)
+            topics = _QUOTED_RE.findall(topics_text)
             plan_dict["topics"] = topics
         
         # Extract activities
-        activities_section = re.search(r"activities:?\s*\[(.*?)\]", generated_text, re.IGNORECASE | re.DOTALL)
+        activities_section = _ACTIVITIES_RE.search(generated_text)
         if activities_section:
             activities_text = activities_section.group(1)
-            activity_blocks = re.findall(r"\{(.*?)\}", activities_text, re.DOTALL)
+            activity_blocks = _BRACED_RE.findall(activities_text)
             
             for i, activity_block in enumerate(activity_blocks):
                 activity = {
@@ -226,23 +237,23 @@ class LearningPlanService:
                 }
                 
                 # Extract activity details
-                title_match = re.search(r"title:?\s*\"?([^\"]+)\"?", activity_block, re.IGNORECASE)
+                title_match = _TITLE_RE.search(activity_block)
                 if title_match:
                     activity["title"] = title_match.group(1).strip()
                 
-                desc_match = re.search(r"description:?\s*\"?([^\"]+)\"?", activity_block, re.IGNORECASE)
+                desc_match = _DESCRIPTION_RE.search(activity_block)
                 if desc_match:
                     activity["description"] = desc_match.group(1).strip()
                 
-                content_id_match = re.search(r"content_id:?\s*\"?([^\"]+)\"?", activity_block, re.IGNORECASE)
+                content_id_match = _CONTENT_ID_RE.search(activity_block)
                 if content_id_match:
                     activity["content_id"] = content_id_match.group(1).strip()
                 
-                duration_match = re.search(r"duration_minutes:?\s*(\d+)", activity_block, re.IGNORECASE)
+                duration_match = _DURATION_RE.search(activity_block)
                 if duration_match:
                     activity["duration_minutes"] = int(duration_match.group(1))
                 
-                order_match = re.search(r"order:?\s*(\d+)", activity_block, re.IGNORECASE)
+                order_match = _ORDER_RE.search(activity_block)
                 if order_match:
                     activity["order"] = int(order_match.group(1))
                 
@@ -267,14 +278,12 @@ class LearningPlanService:
         
         # Create activities
         activities = []
+        valid_ids = {str(content.id) for content in content_items}
         for i, activity_dict in enumerate(plan_dict.get("activities", [])):
-            # Validate content_id
+            # Validate content_id against our resources
             content_id = activity_dict.get("content_id")
-            if content_id:
-                # Check if the content ID exists in our resources
-                content_exists = any(str(content.id) == content_id for content in content_items)
-                if not content_exists:
-                    content_id = None
+            if content_id and content_id not in valid_ids:
+                content_id = None
             
             activity = LearningActivity(
                 id=str(uuid.uuid4()),
@@ -379,21 +388,23 @@ class LearningPlanService:
         if not plan or (user_id and plan.student_id != user_id):
             return None
         
-        # Find and update the activity
+        # Find and update the activity, counting completed activities in the same pass
         activity_found = False
-        for i, activity in enumerate(plan.activities):
-            if activity.id == activity_id:
-                plan.activities[i].status = status
+        completed_activities = 0
+        for activity in plan.activities:
+            if not activity_found and activity.id == activity_id:
+                activity.status = status
                 if status == ActivityStatus.COMPLETED:
-                    plan.activities[i].completed_at = completed_at or datetime.utcnow()
+                    activity.completed_at = completed_at or datetime.utcnow()
                 activity_found = True
-                break
+            if activity.status == ActivityStatus.COMPLETED:
+                completed_activities += 1
         
         if not activity_found:
             return None
         
         # Update plan status and progress
-        self._update_plan_progress(plan)
+        self._update_plan_progress(plan, completed_activities)
         
         # Update timestamp
         plan.updated_at = datetime.utcnow()
@@ -408,7 +419,7 @@ class LearningPlanService:
             "plan_status": plan.status
         }
     
-    def _update_plan_progress(self, plan: LearningPlan):
+    def _update_plan_progress(self, plan: LearningPlan, completed_activities: Optional[int] = None):
         """Update plan progress percentage and status."""
         if not plan.activities:
             plan.progress_percentage = 0
@@ -417,7 +428,8 @@ class LearningPlanService:
         
         # Count completed activities
         total_activities = len(plan.activities)
-        completed_activities = sum(1 for a in plan.activities if a.status == ActivityStatus.COMPLETED)
+        if completed_activities is None:
+            completed_activities = sum(1 for a in plan.activities if a.status == ActivityStatus.COMPLETED)
         
         # Calculate progress percentage
         plan.progress_percentage = (completed_activities / total_activities) * 100
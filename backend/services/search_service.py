@@ -9,11 +9,11 @@ import logging
 import traceback
 from datetime import datetime
 
-from config.settings import Settings
+from config.settings import get_settings
 from rag.openai_adapter import get_openai_adapter
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -69,7 +69,6 @@ class SearchService:
             return False
             
         import aiohttp
-        import json
         
         try:
             # Use the REST API to check if the index exists
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# backend/tests/test_json_stream.py
+
+"""
+Unit tests for the incremental learning plan activity parser.
+"""
+
+import os
+import sys
+import json
+import random
+import unittest
+
+# Add the project root to the path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.insert(0, backend_dir)
+
+from rag._json_stream import ActivityStreamParser
+
+ACTIVITIES = [
+    {
+        "title": "Fractions {warm-up}",
+        "description": "Quote: \"halves\" and a backslash \\ then [brackets] and }",
+        "day": 1,
+        "resources": [{"id": "r1", "tags": ["a", "b"]}]
+    },
+    {
+        "title": "Unicode é中 and escaped \\\" quote",
+        "description": "Nested {\"json\": [1, 2]} text",
+        "day": 2,
+        "resources": []
+    },
+    {"title": "Empty", "description": "", "day": 3, "resources": [{}]}
+]
+
+PLAN = {
+    "title": "Plan with \"activities\" in it",
+    "description": "Braces } { and brackets ] [ inside a string",
+    "activities": ACTIVITIES,
+    "notes": {"activities": [{"not": "an activity"}]}
+}
+
+def _feed_all(parser, chunks):
+    """Feed chunks in order and collect every completed activity."""
+    activities = []
+    for chunk in chunks:
+        activities.extend(parser.feed(chunk))
+    return activities
+
+def _random_chunks(text, rng, max_size=7):
+    """Split text at random positions into chunks of 1..max_size characters."""
+    chunks = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, max_size)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+class ActivityStreamParserTest(unittest.TestCase):
+    """Test ActivityStreamParser against whole and chunked responses."""
+
+    def setUp(self):
+        self.text = json.dumps(PLAN)
+
+    def test_whole_response(self):
+        parser = ActivityStreamParser()
+        self.assertEqual(parser.feed(self.text), ACTIVITIES)
+        self.assertTrue(parser.complete)
+
+    def test_single_character_chunks(self):
+        parser = ActivityStreamParser()
+        self.assertEqual(_feed_all(parser, list(self.text)), ACTIVITIES)
+        self.assertTrue(parser.complete)
+
+    def test_random_chunk_splits(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            parser = ActivityStreamParser()
+            chunks = _random_chunks(self.text, rng)
+            self.assertEqual(_feed_all(parser, chunks), ACTIVITIES)
+            self.assertTrue(parser.complete)
+
+    def test_fenced_response(self):
+        text = "Here is the plan:\n```json\n" + json.dumps(PLAN, indent=2) + "\n```\n"
+        rng = random.Random(99)
+        for _ in range(50):
+            parser = ActivityStreamParser()
+            self.assertEqual(_feed_all(parser, _random_chunks(text, rng)), ACTIVITIES)
+            self.assertTrue(parser.complete)
+
+    def test_activity_emitted_when_closed(self):
+        parser = ActivityStreamParser()
+        first = json.dumps(ACTIVITIES[0])
+        self.assertEqual(parser.feed('{"activities": [' + first[:-1]), [])
+        self.assertEqual(parser.feed("}, "), [ACTIVITIES[0]])
+        self.assertFalse(parser.complete)
+
+    def test_incomplete_response(self):
+        first = json.dumps(ACTIVITIES[0])
+        cut = self.text.index(first) + len(first) + 10
+        parser = ActivityStreamParser()
+        self.assertEqual(parser.feed(self.text[:cut]), ACTIVITIES[:1])
+        self.assertFalse(parser.complete)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# backend/tests/test_llm_cache.py
+
+"""
+Unit tests for the semantic plan/answer cache.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the project root to the path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.insert(0, backend_dir)
+
+from rag._llm_cache import SemanticCache
+
+SCOPE = ("Mathematics", frozenset({"r1", "r2"}))
+OTHER_SCOPE = ("Science", frozenset({"r1", "r2"}))
+
+class SemanticCacheTest(unittest.TestCase):
+    """Test in-memory and persisted SemanticCache behaviour."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "plans")
+        self.now = 1_000_000.0
+        patcher = mock.patch("rag._llm_cache.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_hit_within_threshold_and_scope(self):
+        cache = SemanticCache(threshold=0.95)
+        cache.put(SCOPE, [1.0, 0.0, 0.0], {"plan": 1})
+        self.assertEqual(cache.get(SCOPE, [0.99, 0.05, 0.0]), {"plan": 1})
+        self.assertIsNone(cache.get(SCOPE, [0.0, 1.0, 0.0]))
+        self.assertIsNone(cache.get(OTHER_SCOPE, [1.0, 0.0, 0.0]))
+
+    def test_values_are_copied(self):
+        cache = SemanticCache()
+        value = {"activities": [1]}
+        cache.put(SCOPE, [1.0, 0.0], value)
+        value["activities"].append(2)
+        cache.get(SCOPE, [1.0, 0.0])["activities"].append(3)
+        self.assertEqual(cache.get(SCOPE, [1.0, 0.0]), {"activities": [1]})
+
+    def test_ttl_expiry(self):
+        cache = SemanticCache(ttl_seconds=60)
+        cache.put(SCOPE, [1.0, 0.0], {"plan": 1})
+        self.now += 59
+        self.assertIsNotNone(cache.get(SCOPE, [1.0, 0.0]))
+        self.now += 2
+        self.assertIsNone(cache.get(SCOPE, [1.0, 0.0]))
+
+    def test_ring_wraps_around(self):
+        cache = SemanticCache(max_entries=3)
+        vectors = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+        for i, vector in enumerate(vectors):
+            cache.put(SCOPE, vector, {"plan": i})
+        # The fourth entry replaced the oldest one
+        self.assertIsNone(cache.get(SCOPE, vectors[0]))
+        for i, vector in enumerate(vectors[1:], start=1):
+            self.assertEqual(cache.get(SCOPE, vector), {"plan": i})
+
+    def test_dimension_mismatch_misses(self):
+        cache = SemanticCache()
+        cache.put(SCOPE, [1.0, 0.0, 0.0], {"plan": 1})
+        self.assertIsNone(cache.get(SCOPE, [1.0, 0.0]))
+        # Storing a vector of the new dimension replaces the old entries
+        cache.put(SCOPE, [1.0, 0.0], {"plan": 2})
+        self.assertEqual(cache.get(SCOPE, [1.0, 0.0]), {"plan": 2})
+        self.assertIsNone(cache.get(SCOPE, [1.0, 0.0, 0.0]))
+
+    def test_round_trip_through_disk(self):
+        cache = SemanticCache(ttl_seconds=60, max_entries=4, path=self.path)
+        cache.put(SCOPE, [1.0, 0.0], {"plan": "a"})
+        cache.put(OTHER_SCOPE, [0.0, 1.0], {"plan": "b"})
+        cache.flush()
+
+        reopened = SemanticCache(ttl_seconds=60, max_entries=4, path=self.path)
+        self.assertEqual(reopened.get(SCOPE, [1.0, 0.0]), {"plan": "a"})
+        self.assertEqual(reopened.get(OTHER_SCOPE, [0.0, 1.0]), {"plan": "b"})
+
+    def test_reopen_drops_expired_entries(self):
+        cache = SemanticCache(ttl_seconds=60, max_entries=4, path=self.path)
+        cache.put(SCOPE, [1.0, 0.0], {"plan": "old"})
+        self.now += 30
+        cache.put(OTHER_SCOPE, [0.0, 1.0], {"plan": "new"})
+        cache.flush()
+
+        self.now += 45
+        reopened = SemanticCache(ttl_seconds=60, max_entries=4, path=self.path)
+        self.assertIsNone(reopened.get(SCOPE, [1.0, 0.0]))
+        self.assertEqual(reopened.get(OTHER_SCOPE, [0.0, 1.0]), {"plan": "new"})
+
+    def test_reopen_continues_ring_after_wrap(self):
+        cache = SemanticCache(max_entries=2, path=self.path)
+        vectors = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+        for i, vector in enumerate(vectors):
+            cache.put(SCOPE, vector, {"plan": i})
+        cache.flush()
+
+        reopened = SemanticCache(max_entries=2, path=self.path)
+        self.assertIsNone(reopened.get(SCOPE, vectors[0]))
+        self.assertEqual(reopened.get(SCOPE, vectors[1]), {"plan": 1})
+        self.assertEqual(reopened.get(SCOPE, vectors[2]), {"plan": 2})
+        # The next put overwrites the oldest surviving slot, not the newest
+        reopened.put(SCOPE, [1.0, 1.0, 0.0], {"plan": 3})
+        self.assertIsNone(reopened.get(SCOPE, vectors[1]))
+        self.assertEqual(reopened.get(SCOPE, vectors[2]), {"plan": 2})
+
+    def test_reopen_with_other_layout_starts_empty(self):
+        cache = SemanticCache(max_entries=4, path=self.path)
+        cache.put(SCOPE, [1.0, 0.0], {"plan": "a"})
+        cache.flush()
+
+        reopened = SemanticCache(max_entries=8, path=self.path)
+        self.assertIsNone(reopened.get(SCOPE, [1.0, 0.0]))
+
+if __name__ == "__main__":
+    unittest.main()
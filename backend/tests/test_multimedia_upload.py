@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# backend/tests/test_multimedia_upload.py
+
+"""
+Unit tests for validating and uploading multimedia content to Azure AI Search.
+These use an in-memory stand-in for the search client; no Azure services are called.
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Add the project root to the path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.insert(0, backend_dir)
+
+from azure.core.exceptions import HttpResponseError
+from utils.multimedia_content_processor import MultimediaContentProcessor, _validate_search_document
+
+EMBEDDING_DIMENSION = 3
+
+class AsyncioTestCase(unittest.TestCase):
+    """Base class for tests that need async/await support."""
+
+    def run_async(self, coro):
+        """Run a coroutine to completion."""
+        return asyncio.run(coro)
+
+class FakeSearchClient:
+    """Accepts uploads unless a rejected document is in the request, like a 400 from the service."""
+
+    def __init__(self, rejected_ids):
+        self.rejected_ids = set(rejected_ids)
+        self.requests = []
+        self.indexed = []
+
+    async def upload_documents(self, documents):
+        self.requests.append([doc["id"] for doc in documents])
+        if any(doc["id"] in self.rejected_ids for doc in documents):
+            error = HttpResponseError(message="The request is invalid.")
+            error.status_code = 400
+            raise error
+        self.indexed.extend(doc["id"] for doc in documents)
+        return [SimpleNamespace(key=doc["id"], succeeded=True, error_message=None) for doc in documents]
+
+def _document(doc_id, **fields):
+    doc = {
+        "id": doc_id,
+        "title": f"Title {doc_id}",
+        "page_content": "Some text",
+        "embedding": [0.1, 0.2, 0.3],
+        "grade_level": [7, 8],
+    }
+    doc.update(fields)
+    return doc
+
+class ValidateSearchDocumentTest(unittest.TestCase):
+    """Test the pre-upload schema check."""
+
+    def test_valid_document(self):
+        self.assertEqual(_validate_search_document(_document("a"), EMBEDDING_DIMENSION), (True, None))
+
+    def test_missing_required_field(self):
+        ok, error = _validate_search_document(_document("a", title=None), EMBEDDING_DIMENSION)
+        self.assertFalse(ok)
+        self.assertIn("title", error)
+
+    def test_wrong_embedding_dimension(self):
+        ok, error = _validate_search_document(_document("a", embedding=[0.1, 0.2]), EMBEDDING_DIMENSION)
+        self.assertFalse(ok)
+        self.assertIn("dimensions", error)
+
+    def test_non_integer_grade_level(self):
+        ok, error = _validate_search_document(_document("a", grade_level=["7"]), EMBEDDING_DIMENSION)
+        self.assertFalse(ok)
+        self.assertIn("grade_level", error)
+
+class SaveToSearchTest(AsyncioTestCase):
+    """Test save_to_search against a fake search client."""
+
+    def setUp(self):
+        self.processor = MultimediaContentProcessor()
+        self.processor.embedding_dimension = EMBEDDING_DIMENSION
+        # save_to_search pauses between batches
+        patcher = mock.patch("utils.multimedia_content_processor.asyncio.sleep", new=mock.AsyncMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rejected_document_only_fails_itself(self):
+        self.processor.search_client = FakeSearchClient(rejected_ids={"d3"})
+        documents = [_document(f"d{i}") for i in range(6)]
+
+        with self.assertLogs("utils.multimedia_content_processor", level="INFO") as logs:
+            saved = self.run_async(self.processor.save_to_search(documents))
+
+        self.assertTrue(saved)
+        self.assertEqual(sorted(self.processor.search_client.indexed), ["d0", "d1", "d2", "d4", "d5"])
+        # The whole batch was tried first, then bisected down to the bad document
+        self.assertEqual(self.processor.search_client.requests[0], [f"d{i}" for i in range(6)])
+        self.assertIn(["d3"], self.processor.search_client.requests)
+        self.assertTrue(any("5 succeeded, 1 failed" in line for line in logs.output))
+
+    def test_invalid_documents_are_skipped_before_upload(self):
+        self.processor.search_client = FakeSearchClient(rejected_ids=())
+        documents = [_document("ok"), _document("bad", embedding=[0.1]), _document("no-title", title=None)]
+
+        saved = self.run_async(self.processor.save_to_search(documents))
+
+        self.assertTrue(saved)
+        self.assertEqual(self.processor.search_client.requests, [["ok"]])
+
+    def test_string_grade_levels_are_coerced(self):
+        self.processor.search_client = FakeSearchClient(rejected_ids=())
+        documents = [_document("a", grade_level=["7", 8]), _document("b", grade_level=["seven"])]
+
+        saved = self.run_async(self.processor.save_to_search(documents))
+
+        self.assertTrue(saved)
+        self.assertEqual(self.processor.search_client.indexed, ["a"])
+        # The caller's documents are not modified
+        self.assertEqual(documents[0]["grade_level"], ["7", 8])
+
+if __name__ == "__main__":
+    unittest.main()
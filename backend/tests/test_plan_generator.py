@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# backend/tests/test_plan_generator.py
+
+"""
+Unit tests for LearningPlanGenerator using a fake OpenAI adapter.
+No Azure services are called.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import unittest
+from unittest import mock
+
+# Add the project root to the path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.insert(0, backend_dir)
+
+from models.user import User, LearningStyle
+from models.content import Content, ContentType, DifficultyLevel
+from rag.generator import LearningPlanGenerator, CONTENT_BY_ID_KEY, settings
+
+PLAN = {
+    "title": "Fractions in a week",
+    "description": "Practice with fractions",
+    "subject": "Mathematics",
+    "topics": ["Fractions"],
+    "activities": [
+        {"title": "Watch", "description": "Intro video", "content_id": "c1", "duration_minutes": 15, "day": 1},
+        {"title": "Practice", "description": "Worksheet", "content_id": None, "duration_minutes": 20, "day": 1}
+    ]
+}
+
+class FakeOpenAIAdapter:
+    """Returns a fixed plan and counts completion calls."""
+
+    def __init__(self):
+        self.completion_calls = 0
+
+    async def create_chat_completion(self, **kwargs):
+        self.completion_calls += 1
+        return {"choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(PLAN)}}]}
+
+class AsyncioTestCase(unittest.TestCase):
+    """Base class for tests that need async/await support."""
+
+    def run_async(self, coro):
+        """Run a coroutine to completion."""
+        return asyncio.run(coro)
+
+class PlanResponseCacheTest(AsyncioTestCase):
+    """Test the chat completion response cache on the plan path."""
+
+    def setUp(self):
+        self.student = User(
+            id="student-1",
+            username="student",
+            email="student@example.com",
+            grade_level=5,
+            learning_style=LearningStyle.VISUAL
+        )
+        self.content = [
+            Content(
+                id="c1",
+                title="Fractions video",
+                subject="Mathematics",
+                content_type=ContentType.VIDEO,
+                difficulty_level=DifficultyLevel.BEGINNER,
+                url="https://example.com/fractions"
+            )
+        ]
+        self.client = FakeOpenAIAdapter()
+        self.generator = LearningPlanGenerator(self.client)
+
+    def _generate(self):
+        return self.run_async(self.generator.generate_plan(self.student, "Mathematics", self.content))
+
+    def test_repeated_plan_request_hits_cache_when_enabled(self):
+        with mock.patch.object(settings, "LLM_CACHE_ENABLED", True):
+            first = self._generate()
+            second = self._generate()
+
+        self.assertEqual(self.client.completion_calls, 1)
+        self.assertEqual(self.generator.response_cache.hits, 1)
+        self.assertEqual(first["title"], PLAN["title"])
+        self.assertEqual([a["title"] for a in second["activities"]], ["Watch", "Practice"])
+        self.assertIn(CONTENT_BY_ID_KEY, second)
+
+    def test_cache_disabled_calls_every_time(self):
+        with mock.patch.object(settings, "LLM_CACHE_ENABLED", False):
+            self._generate()
+            self._generate()
+
+        self.assertEqual(self.client.completion_calls, 2)
+        self.assertEqual(self.generator.response_cache.hits, 0)
+
+if __name__ == "__main__":
+    unittest.main()
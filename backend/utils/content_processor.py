@@ -8,9 +8,9 @@ import asyncio
 import aiohttp
 from datetime import datetime
 from models.content import Content, ContentType, DifficultyLevel
-from config.settings import Settings
+from config.settings import get_settings
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 # Initialize logger
 logger = logging.getLogger(__name__)
 class ContentProcessor:
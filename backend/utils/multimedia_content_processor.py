@@ -30,18 +30,52 @@ from azure.cognitiveservices.speech import AudioConfig, SpeechConfig, SpeechReco
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from msrest.authentication import CognitiveServicesCredentials
 from azure.search.documents.aio import SearchClient
+from pydantic import ValidationError
 
 ###############################################################################
 # Internal modules – make sure these exist in your project
 ###############################################################################
 from utils.vector_compat import Vector  # noqa: F401 – converts numpy → list when needed
-from config.settings import Settings
+from config.settings import get_settings
+from models.content import validate_http_url
 from rag.openai_adapter import get_openai_adapter
 
-settings = Settings()
+settings = get_settings()
 logger = logging.getLogger(__name__)
 ISO = lambda dt: dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")  # noqa: E731
 
+# Content index fields checked before upload; a wrong type fails the whole request
+_REQUIRED_FIELDS = ("id", "title", "page_content", "embedding")
+_DOC_SCHEMA: Dict[str, type] = {
+    "id": str,
+    "title": str,
+    "page_content": str,
+    "embedding": list,
+    "topics": list,
+    "keywords": list,
+    "grade_level": list,
+    "duration_minutes": int,
+}
+
+
+def _validate_search_document(doc: Dict[str, Any], embedding_dimension: int) -> Tuple[bool, Optional[str]]:
+    """Check a document against the index schema before upload; returns (ok, error)."""
+    for field in _REQUIRED_FIELDS:
+        if doc.get(field) is None:
+            return False, f"missing required field '{field}'"
+    for field, expected in _DOC_SCHEMA.items():
+        value = doc.get(field)
+        if value is not None and (not isinstance(value, expected) or isinstance(value, bool)):
+            return False, f"field '{field}' should be {expected.__name__}, got {type(value).__name__}"
+    if len(doc["embedding"]) != embedding_dimension:
+        return False, f"embedding has {len(doc['embedding'])} dimensions, index expects {embedding_dimension}"
+    for field in ("topics", "keywords"):
+        if not all(isinstance(item, str) for item in doc.get(field) or []):
+            return False, f"field '{field}' should only contain strings"
+    if not all(isinstance(grade, int) and not isinstance(grade, bool) for grade in doc.get("grade_level") or []):
+        return False, "field 'grade_level' should only contain integers"
+    return True, None
+
 ###############################################################################
 # Main class
 ###############################################################################
@@ -227,18 +261,8 @@ class MultimediaContentProcessor:  # noqa: C901 – cohesive but large
         """
         # If HTML content is already provided, use it
         if 'metadata' in content_info and 'content_html' in content_info['metadata']:
-            from bs4 import BeautifulSoup
-            
-            # Extract text from HTML
-            soup = BeautifulSoup(content_info['metadata']['content_html'], 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.extract()
-                
-            # Get text
-            text = soup.get_text(separator='\n', strip=True)
-            return text
+            # Parse off the event loop; HTML parsing is CPU-bound
+            return await asyncio.to_thread(self._html_to_text, content_info['metadata']['content_html'])
         
         # Otherwise, try to extract text using Form Recognizer for structured documents
         if self.document_client and (content_url.endswith('.pdf') or 
@@ -260,29 +284,34 @@ class MultimediaContentProcessor:  # noqa: C901 – cohesive but large
         if content_url.startswith(('http://', 'https://')):
             try:
                 import aiohttp
-                from bs4 import BeautifulSoup
                 
                 async with aiohttp.ClientSession() as session:
                     async with session.get(content_url) as response:
                         if response.status == 200:
                             html = await response.text()
                             
-                            # Parse HTML
-                            soup = BeautifulSoup(html, 'html.parser')
-                            
-                            # Remove script and style elements
-                            for script in soup(["script", "style"]):
-                                script.extract()
-                                
-                            # Get text
-                            text = soup.get_text(separator='\n', strip=True)
-                            return text
+                            # Parse off the event loop; HTML parsing is CPU-bound
+                            return await asyncio.to_thread(self._html_to_text, html)
             except Exception as e:
                 logger.error(f"Error fetching and parsing web content: {e}")
         
         # Return empty string if nothing could be extracted
         return ""
     
+    @staticmethod
+    def _html_to_text(html: str) -> str:
+        """Extract visible text from HTML (blocking; run via asyncio.to_thread)."""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.extract()
+            
+        # Get text
+        return soup.get_text(separator='\n', strip=True)
+    
     async def _process_audio_content(self, audio_url: str) -> Tuple[str, Optional[int]]:
         """
         Process audio content using Azure Speech Services.
@@ -844,12 +873,15 @@ class MultimediaContentProcessor:  # noqa: C901 – cohesive but large
             success_count = 0
             error_count = 0
             
+            # Fallback timestamp for dates that can't be parsed; items saved together share it
+            now_iso = datetime.utcnow().isoformat(timespec='seconds') + 'Z'
+            
             for i in range(0, len(content_items), batch_size):
                 batch = content_items[i:i+batch_size]
                 
                 # Make a deep copy to avoid modifying originals
-                import copy
                 processed_batch = copy.deepcopy(batch)
+                valid_batch = []
                 
                 # Process each item in the batch
                 for item in processed_batch:
@@ -865,32 +897,36 @@ class MultimediaContentProcessor:  # noqa: C901 – cohesive but large
                                     item[date_field] = item[date_field].isoformat(timespec='seconds') + 'Z'
                             except (ValueError, TypeError):
                                 # If conversion fails, set to current time
-                                item[date_field] = datetime.utcnow().isoformat(timespec='seconds') + 'Z'
+                                item[date_field] = now_iso
                     
                     # Make sure embedding is formatted as expected by Azure Search
                     if "embedding" in item:
                         if item["embedding"] is None:
                             # Initialize with empty vector if None
                             item["embedding"] = [0.0] * self.embedding_dimension
-                
-                try:
-                    # Upload batch
-                    result = await self.search_client.upload_documents(documents=processed_batch)
                     
-                    # Count successes and failures
-                    for idx, item in enumerate(result):
-                        if item.succeeded:
-                            success_count += 1
-                        else:
-                            error_count += 1
-                            logger.error(f"Failed to upload document: {item.key}, {item.error_message}")
+                    # Grade levels scraped from pages often arrive as strings ("7"); the index stores integers
+                    if isinstance(item.get("grade_level"), list):
+                        try:
+                            item["grade_level"] = [int(grade) for grade in item["grade_level"]]
+                        except (TypeError, ValueError):
+                            pass  # Left as-is so validation reports it
+                    
+                    # One malformed document would otherwise fail the whole request
+                    valid, error = _validate_search_document(item, self.embedding_dimension)
+                    if valid:
+                        valid_batch.append(item)
+                    else:
+                        logger.warning(f"Skipping document {item.get('id')}: {error}")
+                        error_count += 1
+                
+                if valid_batch:
+                    succeeded, failed = await self._upload_batch(valid_batch)
+                    success_count += succeeded
+                    error_count += failed
                     
                     # Wait a bit between batches
                     await asyncio.sleep(1)
-                    
-                except Exception as batch_error:
-                    logger.error(f"Error uploading batch: {batch_error}")
-                    error_count += len(processed_batch)
             
             logger.info(f"Upload complete: {success_count} succeeded, {error_count} failed")
             return success_count > 0
@@ -899,6 +935,37 @@ class MultimediaContentProcessor:  # noqa: C901 – cohesive but large
             logger.error(f"Error saving to search: {e}")
             return False
     
+    async def _upload_batch(self, batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Upload a batch of documents, returning (succeeded, failed) counts.
+        
+        A request rejected as a whole with a 4xx is split in half and each half
+        retried, so a bad document only fails itself.
+        """
+        try:
+            result = await self.search_client.upload_documents(documents=batch)
+        except HttpResponseError as batch_error:
+            status_code = batch_error.status_code or 0
+            if len(batch) > 1 and 400 <= status_code < 500 and status_code != 429:
+                middle = len(batch) // 2
+                first = await self._upload_batch(batch[:middle])
+                second = await self._upload_batch(batch[middle:])
+                return first[0] + second[0], first[1] + second[1]
+            logger.error(f"Error uploading batch: {batch_error}")
+            return 0, len(batch)
+        except Exception as batch_error:
+            logger.error(f"Error uploading batch: {batch_error}")
+            return 0, len(batch)
+        
+        # Count successes and failures
+        succeeded = 0
+        for item in result:
+            if item.succeeded:
+                succeeded += 1
+            else:
+                logger.error(f"Failed to upload document: {item.key}, {item.error_message}")
+        return succeeded, len(result) - succeeded
+    
     def _get_file_extension(self, url: str) -> str:
         """Get file extension from URL."""
         parsed_url = urlparse(url)
@@ -924,7 +991,7 @@ async def get_content_processor():
         await content_processor.initialize()
     return content_processor
 
-async def process_and_index_content(content_url: str, content_info: Dict[str, Any], owner_id: Optional[str] = None) -> Dict[str, Any]:
+async def process_and_index_content(content_url: str, content_info: Dict[str, Any], owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Process content and index it in the search service.
     
@@ -934,8 +1001,15 @@ async def process_and_index_content(content_url: str, content_info: Dict[str, An
         owner_id: Owner ID for access control (optional)
         
     Returns:
-        Processed content item
+        Processed content item, or None if the URL is invalid
     """
+    # Validate the URL once at ingest; Content keeps it as a plain string afterwards
+    try:
+        validate_http_url(content_url)
+    except ValidationError as e:
+        logger.warning(f"Skipping content with invalid URL {content_url}: {e}")
+        return None
+    
     processor = await get_content_processor()
     
     # Process the content
@@ -17,11 +17,11 @@ from azure.ai.formrecognizer import DocumentAnalysisClient
 from azure.storage.blob import BlobServiceClient, ContentSettings
 from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
 
-from config.settings import Settings
-from models.student_report import StudentReport, Subject, ReportType
+from config.settings import get_settings
+from models.student_report import StudentReport, StudentReportWithEmbedding, Subject, ReportType
 from rag.openai_adapter import get_openai_adapter
 
-settings = Settings()
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 class StudentReportProcessor:
@@ -536,12 +536,14 @@ class StudentReportProcessor:
             )
             
             # Create StudentReportWithEmbedding object
-            report_with_embedding = {
-                **report.dict(),
-                "embedding": embedding
-            }
+            report_with_embedding = StudentReportWithEmbedding(
+                **report.model_dump(),
+                embedding=embedding,
+                embedding_model=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+            )
             
-            return report_with_embedding
+            # The reports index only has the vector itself, not its storage metadata
+            return report_with_embedding.model_dump(exclude={"embedding_dtype", "embedding_model"})
             
         except Exception as e:
             logger.error(f"Error processing student report document: {e}")
@@ -0,0 +1,15 @@
+# backend/utils/sse.py
+
+"""
+Helpers for streaming responses as server-sent events.
+"""
+
+import json
+from typing import Any
+
+# Response headers for event streams; proxies must not buffer or cache them
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -14,11 +14,11 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 from services.search_service import get_search_service
-from config.settings import Settings
+from config.settings import get_settings
 from rag.openai_adapter import get_openai_adapter
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -122,26 +122,25 @@ class StudentProfileManager:
             subjects = report_data.get("subjects", [])
             general_comments = report_data.get("general_comments", "")
             
-            # Prepare subject data for the prompt
-            subject_text = ""
+            # Prepare subject data for the prompt; pieces are joined once at the end
+            subject_parts = []
             for subject in subjects:
-                subject_text += f"Subject: {subject.get('name', '')}\n"
-                subject_text += f"Achievement: {subject.get('achievement_level', '')}\n"
-                subject_text += f"Comments: {subject.get('comments', '')}\n"
+                subject_parts.append(f"Subject: {subject.get('name', '')}\n")
+                subject_parts.append(f"Achievement: {subject.get('achievement_level', '')}\n")
+                subject_parts.append(f"Comments: {subject.get('comments', '')}\n")
                 
                 strengths = subject.get('strengths', [])
                 if strengths:
-                    subject_text += "Strengths:\n"
-                    for strength in strengths:
-                        subject_text += f"- {strength}\n"
+                    subject_parts.append("Strengths:\n")
+                    subject_parts.extend(f"- {strength}\n" for strength in strengths)
                 
                 areas_for_improvement = subject.get('areas_for_improvement', [])
                 if areas_for_improvement:
-                    subject_text += "Areas for Improvement:\n"
-                    for area in areas_for_improvement:
-                        subject_text += f"- {area}\n"
+                    subject_parts.append("Areas for Improvement:\n")
+                    subject_parts.extend(f"- {area}\n" for area in areas_for_improvement)
                 
-                subject_text += "\n"
+                subject_parts.append("\n")
+            subject_text = "".join(subject_parts)
             
             # Build the prompt
             prompt = f"""
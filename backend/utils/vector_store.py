@@ -12,6 +12,7 @@ import sys
 import uuid
 import json
 import traceback
+import aiohttp
 import requests
 
 # Fix import paths for relative imports
@@ -21,10 +22,10 @@ project_root = os.path.dirname(backend_dir)
 sys.path.insert(0, project_root)  # Add project root to path
 
 # Now import using absolute imports
-from backend.config.settings import Settings
+from backend.config.settings import get_settings
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -36,7 +37,25 @@ class AzureSearchVectorStore:
     """
     def __init__(self):
         """Initialize the vector store wrapper."""
-        pass
+        # Shared HTTP session, created on first use so it binds to the running loop
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._http_lock = asyncio.Lock()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled keep-alive session used for Azure Search REST calls."""
+        if self._http is None or self._http.closed:
+            async with self._http_lock:
+                if self._http is None or self._http.closed:
+                    self._http = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+                    )
+        return self._http
+    
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
     
     async def get_content(self, content_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -51,8 +70,8 @@ class AzureSearchVectorStore:
         try:
             # Use direct Azure Search API approach
             # Get Azure Search settings
-            from backend.config.settings import Settings
-            settings = Settings()
+            from backend.config.settings import get_settings
+            settings = get_settings()
             
             if (settings.AZURE_SEARCH_ENDPOINT and 
                 settings.AZURE_SEARCH_KEY and 
@@ -70,7 +89,7 @@ class AzureSearchVectorStore:
                 }
                 
                 # Make the request
-                response = requests.get(url, headers=headers)
+                response = await asyncio.to_thread(requests.get, url, headers=headers)
                 
                 # Check response
                 if response.status_code == 200:
@@ -122,8 +141,8 @@ class AzureSearchVectorStore:
         try:
             # Use direct Azure Search API approach
             # Get Azure Search settings
-            from backend.config.settings import Settings
-            settings = Settings()
+            from backend.config.settings import get_settings
+            settings = get_settings()
             
             if (settings.AZURE_SEARCH_ENDPOINT and 
                 settings.AZURE_SEARCH_KEY and 
@@ -180,34 +199,34 @@ class AzureSearchVectorStore:
                     search_payload["filter"] = filter_expression
                     
                 # Use aiohttp for async request
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, headers=headers, json=search_payload) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            
-                            # Convert to standard format
-                            results = []
-                            if "value" in result:
-                                for doc in result["value"]:
-                                    # Create result with consistent field naming
-                                    item = {}
-                                    
-                                    # Copy all fields except for special handling of page_content
-                                    for key, value in doc.items():
-                                        if key not in ["@search.score", "@search.rerankerScore", "@search.vectorSearchScore"]:
-                                            if key == "page_content":
-                                                item["content"] = value
-                                            else:
-                                                item[key] = value
-                                                
-                                    results.append(item)
-                            
-                            logger.info(f"Vector search succeeded, found {len(results)} results")
-                            return results
-                        else:
-                            error_text = await response.text()
-                            logger.warning(f"Vector search failed: {response.status}, {error_text}")
-                            return []
+                session = await self._get_session()
+                async with session.post(url, headers=headers, json=search_payload) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        
+                        # Convert to standard format
+                        results = []
+                        if "value" in result:
+                            for doc in result["value"]:
+                                # Create result with consistent field naming
+                                item = {}
+                                
+                                # Copy all fields except for special handling of page_content
+                                for key, value in doc.items():
+                                    if key not in ["@search.score", "@search.rerankerScore", "@search.vectorSearchScore"]:
+                                        if key == "page_content":
+                                            item["content"] = value
+                                        else:
+                                            item[key] = value
+                                            
+                                results.append(item)
+                        
+                        logger.info(f"Vector search succeeded, found {len(results)} results")
+                        return results
+                    else:
+                        error_text = await response.text()
+                        logger.warning(f"Vector search failed: {response.status}, {error_text}")
+                        return []
             else:
                 logger.error("Azure Search settings not available")
                 return []
@@ -297,8 +316,8 @@ class AzureSearchVectorStore:
             
             # Use direct Azure Search API approach
             # Get Azure Search settings
-            from backend.config.settings import Settings
-            settings = Settings()
+            from backend.config.settings import get_settings
+            settings = get_settings()
             
             # Check if Azure Search settings are available
             if (settings.AZURE_SEARCH_ENDPOINT and 
@@ -432,7 +451,7 @@ class AzureSearchVectorStore:
                 }
                         
                 # Make the request
-                response = requests.post(url, headers=headers, json=payload)
+                response = await asyncio.to_thread(requests.post, url, headers=headers, json=payload)
                 
                 # Check response
                 if response.status_code in [200, 201, 202, 204]:
@@ -475,7 +494,7 @@ class AzureSearchVectorStore:
                                         
                                         # Retry the request
                                         logger.info("Retrying with fixed document")
-                                        retry_response = requests.post(url, headers=headers, json=payload)
+                                        retry_response = await asyncio.to_thread(requests.post, url, headers=headers, json=payload)
                                         
                                         if retry_response.status_code in [200, 201, 202, 204]:
                                             logger.info(f"Document successfully added to Azure Search after fixing schema issue: {minimal_doc.get('id')}")
@@ -536,8 +555,8 @@ class AzureSearchVectorStore:
         try:
             # Use direct Azure Search API approach
             # Get Azure Search settings
-            from backend.config.settings import Settings
-            settings = Settings()
+            from backend.config.settings import get_settings
+            settings = get_settings()
             
             if (settings.AZURE_SEARCH_ENDPOINT and 
                 settings.AZURE_SEARCH_KEY and 
@@ -565,7 +584,7 @@ class AzureSearchVectorStore:
                 }
                 
                 # Make the request
-                response = requests.post(url, headers=headers, json=payload)
+                response = await asyncio.to_thread(requests.post, url, headers=headers, json=payload)
                 
                 # Check response
                 if response.status_code in [200, 201, 202, 204]:
@@ -600,8 +619,8 @@ class AzureSearchVectorStore:
         try:
             # Use direct Azure Search API approach
             # Get Azure Search settings
-            from backend.config.settings import Settings
-            settings = Settings()
+            from backend.config.settings import get_settings
+            settings = get_settings()
             
             if (settings.AZURE_SEARCH_ENDPOINT and 
                 settings.AZURE_SEARCH_KEY and 
@@ -627,34 +646,34 @@ class AzureSearchVectorStore:
                 }
                 
                 # Use aiohttp for async request
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, headers=headers, json=search_payload) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            
-                            # Convert to standard format
-                            results = []
-                            if "value" in result:
-                                for doc in result["value"]:
-                                    # Create result with consistent field naming
-                                    item = {}
-                                    
-                                    # Copy all fields except for special handling of page_content
-                                    for key, value in doc.items():
-                                        if key not in ["@search.score", "@search.rerankerScore"]:
-                                            if key == "page_content":
-                                                item["content"] = value
-                                            else:
-                                                item[key] = value
-                                                
-                                    results.append(item)
-                            
-                            logger.info(f"Filter search succeeded, found {len(results)} results")
-                            return results
-                        else:
-                            error_text = await response.text()
-                            logger.warning(f"Filter search failed: {response.status}, {error_text}")
-                            return []
+                session = await self._get_session()
+                async with session.post(url, headers=headers, json=search_payload) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        
+                        # Convert to standard format
+                        results = []
+                        if "value" in result:
+                            for doc in result["value"]:
+                                # Create result with consistent field naming
+                                item = {}
+                                
+                                # Copy all fields except for special handling of page_content
+                                for key, value in doc.items():
+                                    if key not in ["@search.score", "@search.rerankerScore"]:
+                                        if key == "page_content":
+                                            item["content"] = value
+                                        else:
+                                            item[key] = value
+                                            
+                                results.append(item)
+                        
+                        logger.info(f"Filter search succeeded, found {len(results)} results")
+                        return results
+                    else:
+                        error_text = await response.text()
+                        logger.warning(f"Filter search failed: {response.status}, {error_text}")
+                        return []
             else:
                 logger.error("Azure Search settings not available")
                 return []